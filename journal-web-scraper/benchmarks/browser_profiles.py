@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Browser Profile Benchmark
+
+Loads the same journal pages with every browser profile of src/helperFunctions/browserFactory.py and reports, per
+profile, the launch time, the page load time (until the page's required selectors exist, as the scrapers wait for
+them) and the resident memory of one browser: geckodriver plus every Firefox process it started. The memory figure
+decides how many parallel browsers (num_workers) fit on one scraping machine.
+
+Run from the journal-web-scraper folder:
+    python -m benchmarks.browser_profiles
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import statistics
+import time
+import psutil
+from src.helperFunctions.browserFactory import BROWSER_PROFILES, create_firefox
+from src.helperFunctions.pageReadiness import load_page
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# (url, publisher, page_type) of the pages loaded by every profile, in this order, built like the runners build them
+PAGES = [
+    ('https://www.sciencedirect.com/journal/journal-of-health-economics/issues', 'elsevier', 'latest_volume'),
+    ('https://www.sciencedirect.com/journal/journal-of-economic-theory/issues', 'elsevier', 'latest_volume'),
+    ('https://www.journals.uchicago.edu/toc/jpe/current', 'uchicago', 'latest_volume'),
+    ('https://www.journals.uchicago.edu/toc/jole/current', 'uchicago', 'latest_volume'),
+    ('https://www.aeaweb.org/journals/aer/issues', 'aea', 'volume_index'),
+    ('https://www.aeaweb.org/journals/jep/issues', 'aea', 'volume_index'),
+]
+
+# Number of times every page is loaded by each profile
+ROUNDS = 2
+
+PROFILES = ['visible', 'lean']
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+def browser_rss(browser):
+    """
+    Returns the resident memory of geckodriver and every process it started, in MB.
+    """
+
+    driver = psutil.Process(browser.service.process.pid)
+    processes = [driver] + driver.children(recursive=True)
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total / 1024 ** 2
+
+
+def benchmark_profile(name):
+    start = time.perf_counter()
+    browser = create_firefox(BROWSER_PROFILES[name])
+    launch_time = time.perf_counter() - start
+
+    load_times, rss = [], []
+    try:
+        for _ in range(ROUNDS):
+            for url, publisher, page_type in PAGES:
+                start = time.perf_counter()
+                load_page(browser, url, publisher, page_type)
+                load_times.append(time.perf_counter() - start)
+                rss.append(browser_rss(browser))
+    finally:
+        browser.quit()
+
+    return {
+        'launch_s': launch_time,
+        'median_load_s': statistics.median(load_times),
+        'max_load_s': max(load_times),
+        'median_rss_mb': statistics.median(rss),
+        'peak_rss_mb': max(rss),
+    }
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+if __name__ == "__main__":
+    results = {name: benchmark_profile(name) for name in PROFILES}
+
+    print(f"{'profile':<10}{'launch s':>10}{'median load s':>15}{'max load s':>12}{'median RSS MB':>15}"
+          f"{'peak RSS MB':>13}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['launch_s']:>10.2f}{result['median_load_s']:>15.2f}{result['max_load_s']:>12.2f}"
+              f"{result['median_rss_mb']:>15.0f}{result['peak_rss_mb']:>13.0f}")
+
+    baseline, lean = results['visible'], results['lean']
+    print(f"lean vs visible: {lean['median_load_s'] / baseline['median_load_s']:.2f}x median load time, "
+          f"{lean['peak_rss_mb'] / baseline['peak_rss_mb']:.2f}x peak RSS per browser")
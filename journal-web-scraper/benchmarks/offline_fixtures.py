@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Offline Scraper Fixtures
+
+Writes the hand-written fixture pages of the offline scraper benchmark (see offline_scrapers.py) to
+fixtures/offline/page_cache, in the page cache format the benchmark serves them from. For every journal of
+fixtures/offline/journals.json there is an issue archive listing two volumes, the issue pages of the newest volume and
+ARTICLES_PER_ISSUE article pages per issue, each holding the elements the publisher's readiness spec, get_papers_link_*
+function and article field spec select, under the URLs the runners build. The pages are much smaller than the real
+ones, so the benchmark measures the scrapers' own overhead rather than the parsing of large pages; pages recorded with
+'python -m benchmarks.offline_scrapers record' replace them when network access is available.
+
+Run from the journal-web-scraper folder, then run the benchmark with --update-baseline and commit both:
+    python -m benchmarks.offline_fixtures
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import os
+import shutil
+import tempfile
+import config
+
+# Every module of src computes its file locations from DATA_PATH when imported, so the temporary data folder is set
+# before any of them is imported
+DATA_DIR = tempfile.mkdtemp(prefix='scraper_fixtures_')
+config.DATA_PATH = DATA_DIR
+
+from src.helperFunctions.pageCache import CACHE_PATH, store_page  # noqa: E402
+
+# =============================================================================
+# Parameters
+# =============================================================================
+FIXTURE_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'offline', 'page_cache')
+
+ISSUES = (1, 2)
+
+ARTICLES_PER_ISSUE = 25
+
+AUTHORS = ["Ada Lovelace", "Alfred Marshall", "Joan Robinson"]
+
+ABSTRACT = ("We study how {topic} responds to changes in policy, using administrative data and a structural model. "
+            "The estimates imply sizeable effects that persist over several years and differ across regions.")
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/about">About</a></nav></header>
+<main>
+{body}
+</main>
+<footer><p>Hand-written fixture page for the offline scraper benchmark.</p></footer>
+</body>
+</html>
+"""
+
+
+def _page(title, body):
+    return _PAGE.format(title=title, body=body)
+
+
+def _article_title(publisher, volume, issue, number):
+    return f"Essay {number} on {publisher.capitalize()} Markets, Volume {volume} Issue {issue}"
+
+
+def _abstract(volume, issue, number):
+    return ABSTRACT.format(topic=f"labour supply in sample {volume}.{issue}.{number}")
+
+
+# =============================================================================
+# Publishers
+# =============================================================================
+def springer_pages(int_paper, volume):
+    host = "https://link.springer.com"
+    archive = f"/journal/{int_paper}/volumes-and-issues"
+    listing = "".join(
+        f'<li class="app-vol-and-issues-item"><h2><span>Volume {vol}</span></h2>'
+        + "".join(f'<a href="{archive}/{vol}-{issue}">Issue {issue}</a>' for issue in ISSUES) + '</li>'
+        for vol in (volume, volume - 1))
+    pages = {host + archive: _page("Volumes and issues", f'<ul>{listing}</ul>')}
+
+    for issue in ISSUES:
+        cards, articles = [], {}
+        for number in range(1, ARTICLES_PER_ISSUE + 1):
+            path = f"/article/10.1007/s{int_paper}-{volume:03d}-{issue:02d}{number:03d}-x"
+            title = _article_title('springer', volume, issue, number)
+            cards.append(f'<article class="c-card-open"><h3 class="c-card-open__heading"><a href="{path}">{title}</a>'
+                         f'</h3></article>')
+            authors = "".join(f'<li><a data-test="author-name" href="#">{author}</a></li>' for author in AUTHORS)
+            articles[host + path] = _page(title, (
+                f'<h1 class="c-article-title">{title}</h1><ul class="c-article-author-list">{authors}</ul>'
+                f'<section><div class="c-article-section__content"><p>{_abstract(volume, issue, number)}</p></div>'
+                f'</section><p><span data-test="journal-volume">Volume {volume}</span>, pages 1-30</p>'))
+        pages[f"{host}{archive}/{volume}-{issue}"] = _page(f"Volume {volume}, Issue {issue}", "".join(cards))
+        pages.update(articles)
+    return pages
+
+
+def elsevier_pages(name, volume):
+    host = "https://www.sciencedirect.com"
+    links = "".join(f'<a class="js-issue-item-link" href="/journal/{name}/vol/{vol}/suppl/C">Volume {vol}</a>'
+                    for vol in (volume, volume - 1))
+    pages = {f"{host}/journal/{name}/issues": _page("All issues", links)}
+
+    items, articles = [], {}
+    for number in range(1, 2 * ARTICLES_PER_ISSUE + 1):
+        path = f"/science/article/pii/S01676296{volume:04d}{number:05d}"
+        title = _article_title('elsevier', volume, 1, number)
+        items.append(f'<li><h3><a href="{path}">{title}</a></h3></li>')
+        authors = "".join(f'<span class="author">{author}<sup>{i + 1}</sup></span>' for i, author in enumerate(AUTHORS))
+        articles[host + path] = _page(title, (
+            f'<div class="publication-volume"><div class="text-xs">Volume {volume}, March 2025, 10{number:04d}</div>'
+            f'</div><h1 id="screen-reader-main-title">{title}</h1><div id="author-group">{authors}</div>'
+            f'<div id="abstracts"><h2>Abstract</h2><p>{_abstract(volume, 1, number)}</p></div>'))
+    pages[f"{host}/journal/{name}/vol/{volume}/suppl/C"] = _page(f"Volume {volume}", f'<ol>{"".join(items)}</ol>')
+    pages.update(articles)
+    return pages
+
+
+def wiley_pages(int_paper, volume):
+    host = "https://onlinelibrary.wiley.com"
+    links = "".join(f'<a href="/toc/{int_paper}/2025/{vol}/{issue}">Volume {vol}, Issue {issue}</a>'
+                    for vol in (volume, volume - 1) for issue in ISSUES)
+    pages = {f"{host}/loi/{int_paper}": _page("List of issues", links)}
+
+    for issue in ISSUES:
+        items, articles = [], {}
+        for number in range(1, ARTICLES_PER_ISSUE + 1):
+            path = f"/doi/10.1111/jofi.{volume}{issue}{number:03d}"
+            title = _article_title('wiley', volume, issue, number)
+            items.append(f'<div class="issue-item"><a class="issue-item__title visitable" href="{path}"><h2>{title}'
+                         f'</h2></a></div>')
+            authors = "".join(f'<div><span><a href="#"><span>{author}</span></a></span></div>' for author in AUTHORS)
+            articles[host + path] = _page(title, (
+                f'<a class="volume-issue" href="/toc/{int_paper}/2025/{volume}/{issue}">Volume {volume}, Issue '
+                f'{issue}</a><h1 class="citation__title">{title}</h1><div id="sb-1"><div>{authors}</div></div>'
+                f'<section><div class="article-section__content"><p>{_abstract(volume, issue, number)}</p></div>'
+                f'</section>'))
+        pages[f"{host}/toc/{int_paper}/{volume}/{issue}"] = _page(f"Volume {volume}, Issue {issue}", "".join(items))
+        pages.update(articles)
+    return pages
+
+
+def oxford_pages(name, volume):
+    host = "https://academic.oup.com"
+    links = "".join(f'<a href="/{name}/issue/{vol}/{issue}">Volume {vol}, Issue {issue}</a>'
+                    for vol in (volume, volume - 1) for issue in ISSUES)
+    pages = {f"{host}/{name}/issue-archive": _page("Issue archive", links)}
+
+    for issue in ISSUES:
+        items, articles = [], {}
+        for number in range(1, ARTICLES_PER_ISSUE + 1):
+            path = f"/{name}/article/{volume}/{issue}/{number}/77{volume}{issue}{number:03d}"
+            title = _article_title('oxford', volume, issue, number)
+            items.append(f'<div class="al-article-item"><h5 class="customLink item-title"><a href="{path}">{title}'
+                         f'</a></h5></div>')
+            authors = "".join(f'<span class="al-author-name-more"><button class="linked-name">{author}</button>'
+                              f'</span>' for author in AUTHORS)
+            articles[host + path] = _page(title, (
+                f'<div class="volume-issue__wrap"><span class="volume">Volume {volume}</span>, '
+                f'<span class="issue">Issue {issue}</span></div><h1 class="wi-article-title">{title}</h1>'
+                f'<div class="wi-authors">{authors}</div><section class="abstract">'
+                f'<p>{_abstract(volume, issue, number)}</p></section>'))
+        pages[f"{host}/{name}/issue/{volume}/{issue}"] = _page(f"Volume {volume}, Issue {issue}", "".join(items))
+        pages.update(articles)
+    return pages
+
+
+def uchicago_pages(name, volume):
+    host = "https://www.journals.uchicago.edu"
+    links = "".join(f'<a href="/toc/{name}/{vol}/{issue}">Volume {vol}, Number {issue}</a>'
+                    for vol in (volume, volume - 1) for issue in ISSUES)
+    pages = {f"{host}/loi/{name}": _page("List of issues", links)}
+
+    for issue in ISSUES:
+        items, articles = [], {}
+        for number in range(1, ARTICLES_PER_ISSUE + 1):
+            path = f"/doi/10.1086/7{volume}{issue}{number:03d}"
+            title = _article_title('uchicago', volume, issue, number)
+            items.append(f'<div class="issue-item"><h4 class="issue-item__title"><a href="{path}">{title}</a></h4>'
+                         f'</div>')
+            authors = "".join(f'<a class="author-name" href="#"><span>{author}</span></a>' for author in AUTHORS)
+            articles[host + path] = _page(title, (
+                f'<div class="current-issue__meta">Volume {volume}, Number {issue} | January 2025</div>'
+                f'<h1 class="citation__title">{title}</h1><div class="authors">{authors}</div>'
+                f'<div class="abstractSection abstractInFull"><p>{_abstract(volume, issue, number)}</p></div>'))
+        pages[f"{host}/toc/{name}/{volume}/{issue}"] = _page(f"Volume {volume}, Number {issue}", "".join(items))
+        pages.update(articles)
+    return pages
+
+
+def aea_pages(name, volume):
+    host = "https://www.aeaweb.org"
+    # Every volume lists its issues newest first
+    containers = "".join(
+        f'<div class="volume-container"><div class="volume-label">Volume — {vol}</div>'
+        + "".join(f'<div class="issue-item"><a href="/issues/{vol}{issue}">Issue {issue}</a></div>'
+                  for issue in reversed(ISSUES)) + '</div>'
+        for vol in (volume, volume - 1))
+    pages = {f"{host}/journals/{name}/issues": _page("Issues", containers)}
+
+    for issue in ISSUES:
+        items, articles = [], {}
+        for number in range(1, ARTICLES_PER_ISSUE + 1):
+            path = f"/articles?id=10.1257/{name}.{volume}.{issue}.{number}"
+            title = _article_title('aea', volume, issue, number)
+            items.append(f'<article class="journal-article"><h3 class="title"><a href="{path}">{title}</a></h3>'
+                         f'</article>')
+            authors = "".join(f'<li class="author">{author}</li>' for author in AUTHORS)
+            articles[host + path] = _page(title, (
+                f'<h1 class="title">{title}</h1><div style="margin-top:25px;"><div class="journal">Journal of Economic '
+                f'Perspectives</div><div class="journal">vol. {volume}, no. {issue}, Winter 2025, (pp. 3-26)</div>'
+                f'</div><ul class="attribution">{"".join(authors)}</ul><section class="article-information abstract">'
+                f'<h2>Abstract</h2><p>{_abstract(volume, issue, number)}</p></section>'))
+        pages[f"{host}/issues/{volume}{issue}"] = _page(f"Volume {volume}, Issue {issue}", "".join(items))
+        pages.update(articles)
+    return pages
+
+
+FIXTURES = {
+    'elsevier': lambda: elsevier_pages('journal-of-health-economics', 100),
+    'wiley': lambda: wiley_pages(15406261, 80),
+    'oxford': lambda: oxford_pages('restud', 92),
+    'springer': lambda: springer_pages(10887, 30),
+    'uchicago': lambda: uchicago_pages('jole', 43),
+    'aea': lambda: aea_pages('jep', 39),
+}
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+def write_fixtures():
+    """
+    Writes the pages of every publisher to the page cache and copies it to FIXTURE_CACHE.
+
+    Returns:
+        int: Number of pages written.
+    """
+
+    count = 0
+    for make_pages in FIXTURES.values():
+        for url, html in make_pages().items():
+            store_page(url, url, html)
+            count += 1
+    shutil.rmtree(FIXTURE_CACHE, ignore_errors=True)
+    shutil.copytree(CACHE_PATH, FIXTURE_CACHE)
+    return count
+
+
+if __name__ == "__main__":
+    try:
+        print(f"{write_fixtures()} fixture pages saved to {FIXTURE_CACHE}")
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
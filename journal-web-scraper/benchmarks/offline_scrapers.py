@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Offline Scraper Benchmark
+
+Runs the real automatic_scrape_* runners of every publisher (and with them the get_papers_link_* functions and the
+article parsers) against recorded issue and article pages served from a local HTTP server, so scraper performance can
+be measured and compared between changes without any request reaching a publisher. Every publisher host gets its own
+local port, and helperFunctions/hostOverride.py sends the scrapers' requests for that host, over HTTP and in the
+browsers, to it. Served pages have their scripts removed, since the recorded HTML is already rendered.
+
+For each publisher the benchmark reports articles per second, browser launches and the peak resident memory of this
+process and its children (geckodriver and Firefox), and compares them with the stored baseline. The run exits with
+status 1 when a publisher is more than TOLERANCE slower, or launches more browsers or uses more memory than that.
+
+The fixtures are a page cache (see helperFunctions/pageCache.py) with the pages of one volume per journal of
+fixtures/offline/journals.json. The committed fixtures (fixtures/offline/page_cache) are hand-written pages that hold
+the elements the scrapers select, written by offline_fixtures.py; with network access they can instead be recorded
+from the real sites by running the same journals in 'record' mode. The fixtures and the baseline
+(baselines/offline_scrapers.json) are committed, so every checkout benchmarks against the same pages and numbers;
+write or record them, and update the baseline, again when journals.json changes. --update-baseline only replaces the
+baseline of the publishers that were run. Springer's pages are all served over HTTP, while the other publishers'
+pages are loaded in Firefox, so their baseline has to be measured on a machine with Firefox and geckodriver. Every run,
+recording included, works in a temporary data folder, so the article store, job journals and caches of the real data
+folder are never touched.
+
+Run from the journal-web-scraper folder:
+    python -m benchmarks.offline_fixtures                     (or: python -m benchmarks.offline_scrapers record)
+    python -m benchmarks.offline_scrapers run --update-baseline
+    python -m benchmarks.offline_scrapers run
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import psutil
+import config
+
+# Every module of src computes its file locations from DATA_PATH when imported, so the temporary data folder is set
+# before any of them is imported
+DATA_DIR = tempfile.mkdtemp(prefix='scraper_benchmark_')
+config.DATA_PATH = DATA_DIR
+
+from src.americanEconomicAssociation.aea_runner import automatic_scrape_aea_journal  # noqa: E402
+from src.elsevier.elsevier_runner import automatic_scrape_elsevier_journal  # noqa: E402
+from src.oxford.oxford_runner import automatic_scrape_oxford_journal  # noqa: E402
+from src.springer.springer_runner import automatic_scrape_springer_journal  # noqa: E402
+from src.uchicago.uchicago_runner import automatic_scrape_uchicago_journal  # noqa: E402
+from src.wiley.wiley_runner import automatic_scrape_wiley_journal  # noqa: E402
+from src.helperFunctions.browserPool import get_browser_pool, shutdown_browser_pool  # noqa: E402
+from src.helperFunctions.hostOverride import configure_host_overrides  # noqa: E402
+from src.helperFunctions.metrics import get_metrics_snapshot, reset_metrics  # noqa: E402
+from src.helperFunctions.pageCache import CACHE_PATH, configure_page_cache, get_cached_page  # noqa: E402
+from src.helperFunctions.parallelAbstracts import shutdown_parse_pool  # noqa: E402
+from src.helperFunctions.rateLimit import PUBLISHER_HOSTS, configure_host_rate  # noqa: E402
+
+# =============================================================================
+# Parameters
+# =============================================================================
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, 'fixtures', 'offline')
+FIXTURE_CACHE = os.path.join(FIXTURE_DIR, 'page_cache')
+JOURNALS_PATH = os.path.join(FIXTURE_DIR, 'journals.json')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baselines', 'offline_scrapers.json')
+
+RUNNERS = {
+    'elsevier': automatic_scrape_elsevier_journal,
+    'wiley': automatic_scrape_wiley_journal,
+    'oxford': automatic_scrape_oxford_journal,
+    'springer': automatic_scrape_springer_journal,
+    'uchicago': automatic_scrape_uchicago_journal,
+    'aea': automatic_scrape_aea_journal,
+}
+
+# Relative change against the baseline reported as a regression
+TOLERANCE = 0.10
+
+# Seconds between two memory samples
+RSS_INTERVAL = 0.2
+
+_SCRIPT_TAG = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+
+# =============================================================================
+# Fixture Server
+# =============================================================================
+def _make_handler(host):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            cached = get_cached_page(f"https://{host}{self.path}")
+            if cached is None:
+                self.send_error(404, f"https://{host}{self.path} is not in the fixtures")
+                return
+            body = _SCRIPT_TAG.sub("", cached[1]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_fixture_servers(hosts):
+    """
+    Starts one local HTTP server per publisher host, serving the fixture pages of that host.
+
+    Returns:
+        list: The running servers, to be stopped with shutdown().
+    """
+
+    servers, overrides = [], {}
+    for host in hosts:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(host))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        overrides[host] = f"http://127.0.0.1:{server.server_address[1]}"
+    configure_host_overrides(overrides)
+    return servers
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+class PeakRss:
+    """
+    Samples the resident memory of this process and its children in the background and keeps the peak, in MB.
+    """
+
+    def __init__(self):
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        process = psutil.Process()
+        while not self._stop.is_set():
+            total = 0
+            for member in [process] + process.children(recursive=True):
+                try:
+                    total += member.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            self.peak_mb = max(self.peak_mb, total / 1024 ** 2)
+            self._stop.wait(RSS_INTERVAL)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._stop.set()
+        self._thread.join()
+
+
+def _counter(snapshot, name, **labels):
+    return sum(counter['value'] for counter in snapshot['counters']
+               if counter['name'] == name and all(counter['labels'].get(k) == v for k, v in labels.items()))
+
+
+def benchmark_publisher(publisher, job, num_workers):
+    reset_metrics()
+    launches = get_browser_pool().stats['launches']
+    start = time.perf_counter()
+    with PeakRss() as rss:
+        RUNNERS[publisher](job['journal'], job['num_prev_vols'], job.get('wait_time', 15), num_workers)
+    elapsed = time.perf_counter() - start
+
+    snapshot = get_metrics_snapshot()
+    articles = _counter(snapshot, 'scrape_articles_total', publisher=publisher, outcome='ok')
+    return {
+        'articles': articles,
+        'failed_articles': _counter(snapshot, 'scrape_articles_total', publisher=publisher) - articles,
+        'seconds': elapsed,
+        'articles_per_s': articles / elapsed if elapsed else 0.0,
+        'browser_launches': get_browser_pool().stats['launches'] - launches,
+        'peak_rss_mb': rss.peak_mb,
+    }
+
+
+def compare_with_baseline(results, baseline):
+    """
+    Returns the regressions of the results against the baseline, as printable lines.
+    """
+
+    regressions = []
+    for publisher, result in results.items():
+        base = baseline.get(publisher)
+        if base is None:
+            continue
+        if result['articles_per_s'] < base['articles_per_s'] * (1 - TOLERANCE):
+            regressions.append(f"{publisher}: {result['articles_per_s']:.2f} articles/s, baseline "
+                               f"{base['articles_per_s']:.2f}")
+        if result['browser_launches'] > base['browser_launches'] * (1 + TOLERANCE):
+            regressions.append(f"{publisher}: {result['browser_launches']} browser launches, baseline "
+                               f"{base['browser_launches']}")
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + TOLERANCE):
+            regressions.append(f"{publisher}: {result['peak_rss_mb']:.0f} MB peak RSS, baseline "
+                               f"{base['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+# =============================================================================
+# Commands
+# =============================================================================
+def record(jobs, num_workers):
+    # The real sites, with the same runners, storing every page they fetch in the fixture page cache
+    configure_page_cache('record')
+    for publisher, job in jobs.items():
+        print(f"Recording {publisher} {job['journal']}")
+        RUNNERS[publisher](job['journal'], job['num_prev_vols'], job.get('wait_time', 15), num_workers)
+    shutdown_browser_pool()
+    shutdown_parse_pool()
+    shutil.rmtree(FIXTURE_CACHE, ignore_errors=True)
+    shutil.copytree(CACHE_PATH, FIXTURE_CACHE)
+    print(f"Fixtures saved to {FIXTURE_CACHE}; commit them together with a new baseline")
+
+
+def run(jobs, num_workers, update_baseline):
+    if not os.path.isdir(FIXTURE_CACHE):
+        sys.exit(f"No fixtures in {FIXTURE_CACHE}; write them first with: python -m benchmarks.offline_fixtures")
+    shutil.copytree(FIXTURE_CACHE, CACHE_PATH)
+
+    hosts = {PUBLISHER_HOSTS[publisher] for publisher in jobs}
+    servers = start_fixture_servers(hosts)
+    # The local servers can take every request at once
+    for host in hosts:
+        configure_host_rate(host, 1000, 1000, max_rate=1000)
+
+    results = {}
+    try:
+        for publisher, job in jobs.items():
+            results[publisher] = benchmark_publisher(publisher, job, num_workers)
+    finally:
+        shutdown_browser_pool()
+        shutdown_parse_pool()
+        for server in servers:
+            server.shutdown()
+
+    print(f"{'publisher':<10}{'articles':>10}{'failed':>8}{'seconds':>10}{'articles/s':>12}{'launches':>10}"
+          f"{'peak RSS MB':>13}")
+    for publisher, result in results.items():
+        print(f"{publisher:<10}{result['articles']:>10}{result['failed_articles']:>8}{result['seconds']:>10.1f}"
+              f"{result['articles_per_s']:>12.2f}{result['browser_launches']:>10}{result['peak_rss_mb']:>13.0f}")
+
+    if update_baseline:
+        # Publishers left out of this run keep their stored baseline
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, 'r') as baseline_file:
+                baseline = json.load(baseline_file)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=1)
+        print(f"Baseline saved to {BASELINE_PATH}; commit it so later runs compare against it")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline to compare with; store one with --update-baseline")
+        return 0
+    with open(BASELINE_PATH, 'r') as baseline_file:
+        regressions = compare_with_baseline(results, json.load(baseline_file))
+    for line in regressions:
+        print(f"Regression: {line}")
+    if not regressions:
+        print(f"No regression beyond {TOLERANCE:.0%} of the baseline")
+    return 1 if regressions else 0
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against recorded pages.")
+    parser.add_argument('command', choices=['record', 'run'])
+    parser.add_argument('--publishers', nargs='+', choices=sorted(RUNNERS), help="Defaults to every publisher")
+    parser.add_argument('--num-workers', type=int, default=1)
+    parser.add_argument('--update-baseline', action='store_true', help="Store the results as the new baseline")
+    args = parser.parse_args()
+
+    with open(JOURNALS_PATH, 'r') as journals_file:
+        jobs = json.load(journals_file)
+    if args.publishers:
+        jobs = {publisher: jobs[publisher] for publisher in args.publishers}
+
+    try:
+        if args.command == 'record':
+            record(jobs, args.num_workers)
+            status = 0
+        else:
+            status = run(jobs, args.num_workers, args.update_baseline)
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+    sys.exit(status)
@@ -27,14 +27,20 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from config import GECKO_PATH
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.articleParser import ArticleParser
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_AEA = {
+    'abstract': ('block_text', 'section.article-information.abstract'),
+    'title': ('text', 'h1.title'),
+    'authors': ('texts', 'ul.attribution li.author'),
+    'volume_issue': ('text', "div[style='margin-top:25px;'] > div.journal:nth-of-type(2)"),
+}
 
 # =============================================================================
 # Functions
@@ -50,35 +56,29 @@ def get_volume_and_issue_data_aea(url):
         volume_dict (dict): A dictionary mapping each volume to its issues and corresponding URLs.
     """
 
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
     base_url = "https://www.aeaweb.org"
-    browser.get(url)
 
     # Dictionary to store volume: [(issue_number, link)]
     volume_dict = {}
 
-    # Find all volume elements
-    volume_elements = browser.find_elements(By.CLASS_NAME, "volume-container")
+    page = fetch_page(url, 'aea', 'volume_index')
 
-    for volume_element in volume_elements:
-        volume_label = volume_element.find_element(By.CLASS_NAME, "volume-label").text
+    # Find all volume elements
+    for volume_element in page.select(".volume-container"):
+        volume_label = " ".join(volume_element.select_one(".volume-label").get_text().split())
         volume = volume_label.split('—')[1].strip()  # Extract volume number
 
-        issue_elements = volume_element.find_elements(By.CLASS_NAME, "issue-item")
-
         issue_list = []
         issue_num = 4  # Start with the highest issue number (All journals follow 4, 3, 2, 1) pattern
-        for issue in issue_elements:
-            issue_link_element = issue.find_element(By.TAG_NAME, "a")
-            link = issue_link_element.get_attribute('href')
+        for issue in volume_element.select(".issue-item"):
+            link = issue.select_one("a").get('href')
             full_link = base_url + link if not link.startswith('http') else link
 
             issue_list.append((str(issue_num), full_link))
             issue_num -= 1  # Decrease the issue number for the next issue
 
         volume_dict[volume] = issue_list
-    browser.close()
+
     return volume_dict
 
 
@@ -89,73 +89,64 @@ def get_papers_link_aea(url, html_list, wait_time):
     Args:
         url (str): The URL of the webpage to scrape.
         html_list (list): A list to store the retrieved paper URLs.
-        wait_time (int): Wait time in seconds before scraping.
+        wait_time (int): Longest time in seconds to wait for the page to render.
 
     Returns:
         html_list (list): Updated list with URLs of papers.
     """
 
-    time.sleep(wait_time)
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
-    browser.get(url)
-    time.sleep(wait_time)
+    page = fetch_page(url, 'aea', 'issue', wait_time)
 
     # Find all article links based on the updated structure
-    articles = browser.find_elements(By.CSS_SELECTOR, "article.journal-article h3.title a")
-    for article in articles:
-        html_list.append(article.get_attribute('href'))
+    html_list.extend(page.links("article.journal-article h3.title a"))
 
-    browser.close()
     return html_list
 
 
-def get_abstract_info_aea(url_paper_list, paper_number, wait_time, journal_name):
+def build_paper_aea(fields, journal_name):
     """
-    Retrieves the abstract, title, authors, and issue/volume information of a paper.
+    Builds the paper of an AEA article from the fields read with ARTICLE_FIELDS_AEA.
 
     Args:
-        url_paper_list (list): List of URLs to academic papers.
-        paper_number (int): Index of the paper in url_paper_list to scrape.
-        wait_time (int): Wait time in seconds before scraping.
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
 
     Returns:
-        paper (list): A list containing paper details or an empty list in case of an error.
+        paper (list): A list containing paper details.
     """
 
-    try:
-        time.sleep(wait_time)
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
-        time.sleep(wait_time)
+    abstract = fields['abstract']
+    abstract = abstract.replace('Abstract', '')
+    abstract = abstract.replace('\n', '')
 
-        abstract = browser.find_element(By.CSS_SELECTOR, "section.article-information.abstract").text
-        abstract = abstract.replace('Abstract', '')
-        abstract = abstract.replace('\n', '')
+    authors = ', '.join(fields['authors'])
 
-        title = browser.find_element(By.CSS_SELECTOR, "h1.title").text
+    # Format the text to extract volume and issue
+    volume_issue = " ".join(fields['volume_issue'].split(",")[0:2])
+    volume_issue = _reformat_volume_issue(volume_issue)
 
-        author_elements = browser.find_elements(By.CSS_SELECTOR, "ul.attribution li.author")
-        authors = ', '.join([author.text for author in author_elements])
+    return [volume_issue, [fields['title'], authors, abstract]]
 
-        issue_volume_element = browser.find_element(By.CSS_SELECTOR,
-                                                    "div[style='margin-top:25px;'] > div.journal:nth-of-type(2)")
-        issue_volume_text = issue_volume_element.text
 
-        # Format the text to extract volume and issue
-        volume_issue = " ".join(issue_volume_text.split(",")[0:2])
-        volume_issue = _reformat_volume_issue(volume_issue)
+def get_abstract_info_aea(url_paper_list, paper_number, wait_time, journal_name):
+    """
+    Retrieves the abstract, title, authors, and issue/volume information of a paper.
 
-        # key = generate_key('AEA', journal_name, volume_issue.split(" ")[1].replace(',', ''), volume_issue.split(" ")[-1])
-        # paper = [key, volume_issue, [title, authors, abstract]]
-        paper = [volume_issue, [title, authors, abstract]]
+    Args:
+        url_paper_list (list): List of URLs to academic papers.
+        paper_number (int): Index of the paper in url_paper_list to scrape.
+        wait_time (int): Longest time in seconds to wait for the page to render.
 
+    Returns:
+        paper (list): A list containing paper details or an empty list in case of an error.
+    """
+
+    try:
+        page = AEA_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = AEA_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         paper = []
 
-    finally:
-        browser.close()
     return paper
 
 
@@ -184,3 +175,6 @@ def _reformat_volume_issue(volume_issue):
         return f"Volume {volume}, Issue 1"
     else:
         return volume_issue
+
+
+AEA_ARTICLE_PARSER = ArticleParser('aea', ARTICLE_FIELDS_AEA, build_paper_aea)
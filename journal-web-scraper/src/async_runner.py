@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent Publisher Runner
+
+This script runs the enabled publishers at the same time instead of one after another. sciencedirect.com,
+onlinelibrary.wiley.com, academic.oup.com, link.springer.com, journals.uchicago.edu, aeaweb.org and jstor.org are
+independent hosts, so each publisher gets its own asyncio task. Every host has a semaphore limiting how many of its
+journals are scraped at once, and every request to the host goes through that host's token bucket (see
+helperFunctions/rateLimit.py), so throughput grows with the number of publishers without overloading any single site.
+
+Functions:
+    scrape_publishers_concurrently(publisher_jobs, num_prev_vols, num_workers, journals_per_host, incremental,
+        retry_failures): Scrapes every publisher's journals, with the publishers running at the same time.
+
+Usage:
+    publisher_jobs = {'elsevier': (['energy-policy'], 15), 'aea': (['jel'], 15)}
+    scrape_publishers_concurrently(publisher_jobs, num_prev_vols=1)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.webscraper import webscrape_journal
+from src.helperFunctions.browserPool import get_browser_pool
+from src.helperFunctions.rateLimit import PUBLISHER_HOSTS
+
+
+# =============================================================================
+# Orchestrator
+# =============================================================================
+async def _scrape_journal(executor, semaphore, publisher, journal_name, num_prev_vols, wait_time, num_workers,
+                          incremental, retry_failures):
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, webscrape_journal, publisher, journal_name, num_prev_vols, wait_time,
+                                   num_workers, incremental, retry_failures)
+
+
+async def _scrape_publishers(publisher_jobs, num_prev_vols, num_workers, journals_per_host, incremental,
+                             retry_failures):
+    # Publishers on the same host (e.g. 'aea' and 'americaneconomicjournal') share one semaphore
+    host_semaphores = {}
+    semaphores = {}
+    for publisher in publisher_jobs:
+        host = PUBLISHER_HOSTS.get(publisher, publisher)
+        if host not in host_semaphores:
+            host_semaphores[host] = asyncio.Semaphore(journals_per_host)
+        semaphores[publisher] = host_semaphores[host]
+
+    num_threads = len(host_semaphores) * journals_per_host
+    get_browser_pool().ensure_capacity(num_threads * num_workers)
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        tasks = [
+            _scrape_journal(executor, semaphores[publisher], publisher, journal_name, num_prev_vols, wait_time,
+                            num_workers, incremental, retry_failures)
+            for publisher, (journal_list, wait_time) in publisher_jobs.items()
+            for journal_name in journal_list
+        ]
+        await asyncio.gather(*tasks)
+
+
+def scrape_publishers_concurrently(publisher_jobs, num_prev_vols, num_workers=1, journals_per_host=1,
+                                   incremental=False, retry_failures=False):
+    """
+    Scrapes every publisher's journals, with the publishers running at the same time.
+
+    Args:
+        publisher_jobs (dict): Maps a publisher name understood by webscrape_journal (e.g. 'elsevier') to a tuple of
+            (list of journal names, wait_time).
+        num_prev_vols (int): Number of previous volumes to scrape for each journal.
+        num_workers (int): Number of articles fetched at the same time per journal.
+        journals_per_host (int): Number of journals of the same host scraped at the same time.
+        incremental (bool): Only scrape the articles not harvested by an earlier run.
+        retry_failures (bool): Only scrape the issue pages and articles recorded in each journal's failure ledger.
+
+    Returns:
+        None: Each journal is saved by its publisher's runner.
+    """
+
+    asyncio.run(_scrape_publishers(publisher_jobs, num_prev_vols, num_workers, journals_per_host, incremental,
+                                   retry_failures))
+
+
+# =============================================================================
+# Main
+# =============================================================================
+def main():
+    publisher_jobs = {
+        'elsevier': (['journal-of-empirical-finance'], 15),
+        'aea': (['jel'], 15),
+        'uchicago': (['jole'], 15),
+        'oxford': (['restud'], 15),
+        'springer': (['IMF Economic Review'], 15),
+    }
+
+    scrape_publishers_concurrently(publisher_jobs, num_prev_vols=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 """
 Main Runner for Academic Journal Web Scrapers
 
-This script is designed to facilitate web scraping tasks for a wide range of academic journals from multiple publishers including Elsevier, Econometrica, the American Economic Association (AEA), the University of Chicago, Oxford, Springer, and Wiley. Each module within the script is tailored to scrape specific journals from these publishers, extracting article details like titles, authors, abstracts, and more, utilizing Selenium and appropriate web drivers.
+This script is designed to facilitate web scraping tasks for a wide range of academic journals from multiple publishers including Elsevier, Econometrica, the American Economic Association (AEA), the University of Chicago, Oxford, Springer, Wiley, and JSTOR. Each module within the script is tailored to scrape specific journals from these publishers, extracting article details like titles, authors, abstracts, and more, utilizing Selenium and appropriate web drivers.
 
 The script is flexible, allowing selective execution of scraping tasks for different journals from various publishers. This is managed through predefined flags that can be set for each publisher's set of journals.
 
@@ -14,10 +14,14 @@ Modules:
     scrape_multiple_oxford_journals: Handles scraping of multiple journals from Oxford.
     scrape_multiple_springer_journals: Handles scraping of multiple journals from Springer.
     scrape_multiple_wiley_journals: Handles scraping of multiple journals from Wiley.
+    scrape_multiple_jstor_journals: Handles scraping of multiple journals from JSTOR.
 
 Usage:
-    Set the respective flags for Elsevier, AEA, UChicago, Oxford, Springer, and Wiley journals to True to enable their scraping.
+    Set the respective flags for Elsevier, AEA, UChicago, Oxford, Springer, Wiley, and JSTOR journals to True to enable their scraping.
+    The enabled publishers are scraped at the same time (see async_runner.py); set run_publishers_concurrently to False to scrape them one after the other.
     Configure the # of previous volumes wanted
+    Set incremental to True to only scrape articles that earlier runs have not harvested.
+    Set retry_failures to True to only scrape the issue pages and articles that failed in earlier runs.
     Run this script to initiate the scraping process for the enabled journals.
 
 Note:
@@ -25,31 +29,91 @@ Note:
 """
 
 
+import os
 from src.elsevier.elsevier_runner import scrape_multiple_elsevier_journals
 from src.uchicago.uchicago_runner import scrape_multiple_uchicago_journals
 from src.americanEconomicAssociation.aea_runner import scrape_multiple_aea_journals
 from src.oxford.oxford_runner import scrape_multiple_oxford_journals
 from src.springer.springer_runner import scrape_multiple_springer_journals
 from src.wiley.wiley_runner import scrape_multiple_wiley_journals
+from src.jstor.jstor_runner import scrape_multiple_jstor_journals
+from src.helperFunctions.browserPool import get_browser_pool, shutdown_browser_pool
+from src.helperFunctions.browserFactory import configure_browser
+from src.helperFunctions.pageReadiness import format_wait_telemetry
+from src.helperFunctions.fetchBackend import format_fetch_stats
+from src.async_runner import scrape_publishers_concurrently
+from src.helperFunctions.articleStore import export_csv
+from src.helperFunctions.journalMetadata import load_all_metadata
+from src.helperFunctions.pageCache import configure_page_cache
+from src.helperFunctions.parallelAbstracts import configure_parse_workers, shutdown_parse_pool
+from src.helperFunctions.articleParser import configure_extraction
+from src.helperFunctions.recordSink import configure_record_sinks
+from src.helperFunctions.rateLimit import configure_rate_control, format_rate_stats
+from src.helperFunctions.metrics import export_metrics, format_metrics_summary
+from config import DATA_PATH
+
+
 def main():
+    # Report a malformed journal metadata file before any scraping starts
+    load_all_metadata()
+
     run_elsevier = True
     run_aea = True
     run_uchicago = True
     run_oxford = True
     run_springer = True
     run_wiley = False
+    run_jstor = False
 
     num_prev_vols = 1
 
+    # 'lean' runs headless browsers that skip images, stylesheets, fonts and media; 'visible' shows a stock Firefox
+    browser_profile = 'lean'
+    configure_browser(browser_profile)
+
+    # Number of articles fetched at the same time per journal, each with its own browser
+    num_workers = 1
+
+    # Number of processes extracting fields from the fetched article pages, shared by every journal
+    parse_workers = 1
+    configure_parse_workers(parse_workers)
+
+    # 'script' extracts the fields of browser-rendered articles with one script call, 'snapshot' parses their source
+    extraction_mode = 'script'
+    configure_extraction(extraction_mode)
+
+    # Only open the article pages of papers not harvested by an earlier run
+    incremental = False
+
+    # Only revisit the issue pages and articles recorded in the failure ledger by earlier runs
+    retry_failures = False
+
+    # 'record' stores every fetched page on disk, 'replay' re-parses stored pages without any network access
+    page_cache_mode = 'off'
+    configure_page_cache(page_cache_mode)
+
+    # Raise each host's request rate while its pages load fast, and cut it after slow pages, errors and CAPTCHAs
+    adaptive_rate = True
+    configure_rate_control(adaptive_rate)
+
+    # Formats every article is written to as soon as it is extracted: 'jsonl', 'csv', 'parquet', 'store' and 'catalog'
+    record_formats = ('jsonl', 'store', 'catalog')
+    configure_record_sinks(record_formats)
+
     elsevier_wait_time = 15
     aea_wait_time = 15
     uchicago_wait_time = 15
     oxford_wait_time = 15
     springer_wait_time = 15
     wiley_wait_time = 15
+    jstor_wait_time = 30
 
+    # Scrape the enabled publishers at the same time, each host limited to journals_per_host journals at once; set to
+    # False to scrape the publishers one after the other
+    run_publishers_concurrently = True
+    journals_per_host = 1
 
-
+    publisher_jobs = {}
 
     if run_elsevier:
         elsevier_journals = ['journal-of-empirical-finance', 'journal-of-economic-behavior-and-organization',
@@ -72,7 +136,7 @@ def main():
 
         # elsevier_journals = ['journal-of-empirical-finance']
 
-        scrape_multiple_elsevier_journals(journal_list=elsevier_journals, num_prev_vols=num_prev_vols, wait_time=elsevier_wait_time)
+        publisher_jobs['elsevier'] = (elsevier_journals, elsevier_wait_time)
 
 
 
@@ -81,7 +145,7 @@ def main():
 
         # aea_journals = ['jel']
 
-        scrape_multiple_aea_journals(journal_list=aea_journals, num_prev_vols=num_prev_vols, wait_time=aea_wait_time)
+        publisher_jobs['aea'] = (aea_journals, aea_wait_time)
 
     if run_uchicago:
         uchicago_journals = ['edcc', 'jole', 'jle', 'jpe', 'ntj', 'reep']
@@ -89,7 +153,7 @@ def main():
         # uchicago_journals = ['jole']
 
 
-        scrape_multiple_uchicago_journals(journal_list=uchicago_journals, num_prev_vols=num_prev_vols, wait_time=uchicago_wait_time)
+        publisher_jobs['uchicago'] = (uchicago_journals, uchicago_wait_time)
 
     if run_oxford:
         oxford_journals = ["restud", "rfs", "jeea", "wber", "jleo", "rof", "jcr", "ectj", "joeg", "rcfs", "oep", "jfec",
@@ -97,7 +161,7 @@ def main():
 
         # oxford_journals = ['restud']
 
-        scrape_multiple_oxford_journals(journal_list=oxford_journals, num_prev_vols=num_prev_vols, wait_time=oxford_wait_time)
+        publisher_jobs['oxford'] = (oxford_journals, oxford_wait_time)
 
 
     if run_springer:
@@ -106,7 +170,7 @@ def main():
 
         # springer_journals = ['IMF Economic Review']
 
-        scrape_multiple_springer_journals(journal_list=springer_journals, num_prev_vols=num_prev_vols, wait_time=springer_wait_time)
+        publisher_jobs['springer'] = (springer_journals, springer_wait_time)
 
     if run_wiley:
         wiley_journals = ['The Journal of Finance',
@@ -130,8 +194,43 @@ def main():
 
         # wiley_journals = ['The Journal of Finance']
 
-        scrape_multiple_wiley_journals(journal_list=wiley_journals, num_prev_vols=num_prev_vols, wait_time=wiley_wait_time)
-
+        publisher_jobs['wiley'] = (wiley_journals, wiley_wait_time)
+
+    if run_jstor:
+        jstor_journals = ['jecongrowth']
+
+        publisher_jobs['jstor'] = (jstor_journals, jstor_wait_time)
+
+    if run_publishers_concurrently:
+        scrape_publishers_concurrently(publisher_jobs, num_prev_vols=num_prev_vols, num_workers=num_workers,
+                                       journals_per_host=journals_per_host, incremental=incremental,
+                                       retry_failures=retry_failures)
+    else:
+        scrape_multiple_journals = {
+            'elsevier': scrape_multiple_elsevier_journals,
+            'aea': scrape_multiple_aea_journals,
+            'uchicago': scrape_multiple_uchicago_journals,
+            'oxford': scrape_multiple_oxford_journals,
+            'springer': scrape_multiple_springer_journals,
+            'wiley': scrape_multiple_wiley_journals,
+            'jstor': scrape_multiple_jstor_journals,
+        }
+        for publisher, (journal_list, wait_time) in publisher_jobs.items():
+            scrape_multiple_journals[publisher](journal_list=journal_list, num_prev_vols=num_prev_vols,
+                                                wait_time=wait_time, num_workers=num_workers, incremental=incremental,
+                                                retry_failures=retry_failures)
+
+    # Refresh the combined CSV from the article store once per run
+    export_csv(os.path.join(DATA_PATH, 'all_df.csv'))
+
+    print(get_browser_pool().format_stats())
+    print(format_wait_telemetry())
+    print(format_fetch_stats())
+    print(format_rate_stats())
+    print(format_metrics_summary())
+    print(f"Metrics snapshot saved to {export_metrics('combined_runner')}.json/.prom")
+    shutdown_browser_pool()
+    shutdown_parse_pool()
 
 
 if __name__ == "__main__":
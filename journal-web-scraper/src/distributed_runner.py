@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""
+Distributed Runner
+
+This script spreads a scrape over any number of worker processes, on one machine or several, through a shared work
+queue (see helperFunctions/workQueue.py). The coordinator enqueues one task per journal; workers pull tasks and run the
+existing scraper functions, each completed task adding the next level of work:
+    'journal': lists the journal's issue pages with get_issue_urls_* and enqueues one 'issue' task per page.
+    'issue': collects the paper links of the issue page with get_papers_link_* and enqueues one 'article' task each.
+    'article': fetches and parses the article's page with the publisher's ArticleParser and stores the paper.
+Deeper tasks are leased first, so papers start flowing as soon as the first issue is listed. A worker that crashes
+only loses its lease: the task is retried by another worker once the lease expires. When the queue is drained the
+coordinator collects the papers into the article store and catalog, journal by journal, exactly like the runners do.
+
+Journal and issue tasks are keyed by run, so every run lists the latest issues again; article tasks are keyed by URL
+only, so an article scraped by an earlier run on the same queue is not fetched again. Each worker process has its own
+browser pool and rate limiter (see helperFunctions/rateLimit.py), so per-host rates apply per worker.
+
+Functions:
+    load_publisher_jobs(path): Reads the journals to scrape from a JSON file.
+    enqueue_journals(queue, publisher_jobs, num_prev_vols, run_id): Enqueues one task per journal.
+    run_task(task): Runs one leased task and returns its result and follow-up tasks.
+    run_worker(queue_path, worker_id, poll_interval, stop_when_drained): Leases and runs tasks until the queue is
+        drained.
+    run_local_workers(queue_path, num_workers, stop_when_drained): Runs several worker processes on this machine.
+    collect_results(queue): Saves the papers of every completed article task to the article store and catalog.
+
+Usage:
+    Coordinator:    python -m src.distributed_runner coordinate --jobs journals.json --num-prev-vols 1
+    Each worker:    python -m src.distributed_runner work --workers 4
+    Coordinator:    python -m src.distributed_runner collect
+    journals.json maps a publisher to its journals, e.g. {"wiley": ["The Journal of Finance"], "aea": ["jel"]}.
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+from src.elsevier.elsevier_runner import get_issue_urls_elsevier
+from src.elsevier.web_scrapper_elsevier import get_papers_link_elsevier, convert_elsevier_name, \
+    ELSEVIER_ARTICLE_PARSER
+from src.americanEconomicAssociation.aea_runner import get_issue_urls_aea
+from src.americanEconomicAssociation.web_scraper_aea import get_papers_link_aea, AEA_ARTICLE_PARSER
+from src.uchicago.uchicago_runner import get_issue_urls_uchicago
+from src.uchicago.web_scrapper_uchicago import get_papers_link_uchicago, get_full_name_uchicago, \
+    UCHICAGO_ARTICLE_PARSER
+from src.oxford.oxford_runner import get_issue_urls_oxford
+from src.oxford.web_scraper_oxford import get_papers_link_oxford, OXFORD_ARTICLE_PARSER
+from src.springer.springer_runner import get_issue_urls_springer
+from src.springer.web_scraper_springer import get_papers_link_springer, SPRINGER_ARTICLE_PARSER
+from src.wiley.wiley_runner import get_issue_urls_wiley
+from src.wiley.web_scrapper_wiley import get_papers_link_wiley, WILEY_ARTICLE_PARSER
+from src.jstor.jstor_runner import get_issue_urls_jstor
+from src.jstor.web_scraper_jstor import get_papers_link_jstor, JSTOR_ARTICLE_PARSER
+from src.helperFunctions.articleStore import export_csv
+from src.helperFunctions.browserPool import shutdown_browser_pool
+from src.helperFunctions.harvestIndex import HarvestIndex
+from src.helperFunctions.journalMetadata import load_all_metadata
+from src.helperFunctions.metrics import export_metrics
+from src.helperFunctions.recordSink import open_journal_sink
+from src.helperFunctions.workQueue import QUEUE_PATH, WorkQueue, keep_lease
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# What the workers run for each publisher, and how its papers are labelled in the article store
+PUBLISHERS = {
+    'elsevier': {'website': 'Elsevier', 'display_name': convert_elsevier_name, 'issue_urls': get_issue_urls_elsevier,
+                 'papers_link': get_papers_link_elsevier, 'parser': ELSEVIER_ARTICLE_PARSER},
+    'aea': {'website': 'American Economic Association', 'display_name': None, 'issue_urls': get_issue_urls_aea,
+            'papers_link': get_papers_link_aea, 'parser': AEA_ARTICLE_PARSER},
+    'uchicago': {'website': 'UChicago', 'display_name': get_full_name_uchicago, 'issue_urls': get_issue_urls_uchicago,
+                 'papers_link': get_papers_link_uchicago, 'parser': UCHICAGO_ARTICLE_PARSER},
+    'oxford': {'website': 'Oxford', 'display_name': None, 'issue_urls': get_issue_urls_oxford,
+               'papers_link': get_papers_link_oxford, 'parser': OXFORD_ARTICLE_PARSER},
+    'springer': {'website': 'Springer', 'display_name': None, 'issue_urls': get_issue_urls_springer,
+                 'papers_link': get_papers_link_springer, 'parser': SPRINGER_ARTICLE_PARSER},
+    'wiley': {'website': 'Wiley', 'display_name': None, 'issue_urls': get_issue_urls_wiley,
+              'papers_link': get_papers_link_wiley, 'parser': WILEY_ARTICLE_PARSER},
+    'jstor': {'website': 'JSTOR', 'display_name': None, 'issue_urls': get_issue_urls_jstor,
+              'papers_link': get_papers_link_jstor, 'parser': JSTOR_ARTICLE_PARSER},
+}
+
+# Deeper tasks first, so articles are scraped while other journals are still being listed
+TASK_PRIORITIES = {'journal': 0, 'issue': 1, 'article': 2}
+
+# Shared destinations the collected papers are written to (see recordSink.py)
+COLLECT_FORMATS = ('store', 'catalog')
+
+
+# =============================================================================
+# Coordinator
+# =============================================================================
+def load_publisher_jobs(path):
+    """
+    Reads the journals to scrape from a JSON file mapping a publisher to a list of journal names.
+
+    Args:
+        path (str): Location of the JSON file.
+
+    Returns:
+        dict: Maps publisher to its list of journal names.
+
+    Raises:
+        ValueError: If the file names a publisher not in PUBLISHERS.
+    """
+
+    with open(path, 'r', encoding='utf-8') as file:
+        publisher_jobs = json.load(file)
+    unknown = set(publisher_jobs) - set(PUBLISHERS)
+    if unknown:
+        raise ValueError(f"Unknown publishers in {path}: {', '.join(sorted(unknown))}")
+    return publisher_jobs
+
+
+def enqueue_journals(queue, publisher_jobs, num_prev_vols, wait_time=15, run_id=None):
+    """
+    Enqueues one task per journal.
+
+    Args:
+        queue (WorkQueue): The work queue.
+        publisher_jobs (dict): Maps publisher to its list of journal names.
+        num_prev_vols (int): Number of previous volumes to scrape for each journal.
+        wait_time (int): Longest time to wait for a page to render before scraping.
+        run_id (str): Identifies the run. Defaults to today's date, so a journal is listed at most once a day.
+
+    Returns:
+        int: Number of journal tasks added.
+    """
+
+    if run_id is None:
+        run_id = time.strftime('%Y-%m-%d')
+    added = 0
+    for publisher, journal_list in publisher_jobs.items():
+        for journal_name in journal_list:
+            payload = {'run_id': run_id, 'publisher': publisher, 'journal': journal_name,
+                       'num_prev_vols': num_prev_vols, 'wait_time': wait_time}
+            added += queue.enqueue('journal', f"{run_id}/{publisher}/{journal_name}", payload,
+                                   TASK_PRIORITIES['journal'])
+    return added
+
+
+def collect_results(queue):
+    """
+    Saves the papers of every completed article task to the article store and catalog, one journal at a time, and
+    marks the tasks as collected.
+
+    Args:
+        queue (WorkQueue): The work queue.
+
+    Returns:
+        int: Number of article tasks collected.
+    """
+
+    by_journal = {}
+    for task_id, payload, paper in queue.get_done('article'):
+        by_journal.setdefault((payload['publisher'], payload['journal']), []).append((task_id, payload['url'], paper))
+
+    for (publisher, journal_name), tasks in by_journal.items():
+        display_name = PUBLISHERS[publisher]['display_name']
+        with open_journal_sink(f'{publisher}_{journal_name}', PUBLISHERS[publisher]['website'],
+                               display_name(journal_name) if display_name else journal_name,
+                               formats=COLLECT_FORMATS) as journal_sink:
+            for _, _, paper in tasks:
+                if paper:
+                    journal_sink.write(paper)
+
+        harvest_index = HarvestIndex(f'{publisher}_{journal_name}')
+        harvest_index.add([url for _, url, _ in tasks])
+        harvest_index.close()
+        queue.mark_collected([task_id for task_id, _, _ in tasks])
+
+    queue.mark_collected([task_id for kind in ('journal', 'issue') for task_id, _, _ in queue.get_done(kind)])
+    return sum(len(tasks) for tasks in by_journal.values())
+
+
+# =============================================================================
+# Workers
+# =============================================================================
+def run_task(task):
+    """
+    Runs one leased task.
+
+    Args:
+        task (dict): The task returned by WorkQueue.lease().
+
+    Returns:
+        tuple: (result, children), the task's result and its follow-up tasks as (kind, key, payload, priority).
+    """
+
+    payload = task['payload']
+    publisher = PUBLISHERS[payload['publisher']]
+    base = {name: payload[name] for name in ('run_id', 'publisher', 'journal', 'wait_time')}
+
+    if task['kind'] == 'journal':
+        issue_urls = publisher['issue_urls'](payload['journal'], payload['num_prev_vols'], payload['wait_time'])
+        children = [('issue', f"{payload['run_id']}/{url}", dict(base, url=url), TASK_PRIORITIES['issue'])
+                    for url in issue_urls]
+        return len(children), children
+
+    if task['kind'] == 'issue':
+        links = list(dict.fromkeys(publisher['papers_link'](payload['url'], [], payload['wait_time'])))
+        children = [('article', url, dict(base, url=url), TASK_PRIORITIES['article']) for url in links]
+        return len(children), children
+
+    if task['kind'] == 'article':
+        # A page that loads but lacks a field gives an empty paper, as get_abstract_info_* does; fetch errors retry
+        parser = publisher['parser']
+        page = parser.fetch(payload['url'], payload['wait_time'])
+        try:
+            paper = parser.parse_page(page, payload['journal'])
+        except Exception:
+            paper = []
+        return paper, []
+
+    raise ValueError(f"Unknown task kind '{task['kind']}'")
+
+
+def run_worker(queue_path=QUEUE_PATH, worker_id=None, poll_interval=5, stop_when_drained=True):
+    """
+    Leases and runs tasks until the queue is drained.
+
+    Args:
+        queue_path (str): Location of the work queue database.
+        worker_id (str): Identifies the worker in the queue. Defaults to host name and process id.
+        poll_interval (int): Seconds to wait before asking again when no task is available.
+        stop_when_drained (bool): Stop once no task is pending or leased, instead of waiting for new tasks.
+
+    Returns:
+        int: Number of tasks this worker completed.
+    """
+
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    completed = 0
+    try:
+        while True:
+            task = queue.lease(worker_id)
+            if task is None:
+                if stop_when_drained and queue.is_drained():
+                    break
+                time.sleep(poll_interval)
+                continue
+            try:
+                # The lease is renewed while the task runs, so a slow journal or issue is not taken over and run twice
+                with keep_lease(queue, task):
+                    result, children = run_task(task)
+            except Exception as e:
+                print(f"{worker_id}: {task['kind']} task {task['key']} failed (attempt {task['attempts']}): "
+                      f"{type(e).__name__}: {e}")
+                queue.fail(task, f"{type(e).__name__}: {e}")
+                continue
+            if queue.complete(task, result, children):
+                completed += 1
+    finally:
+        queue.close()
+        shutdown_browser_pool()
+        # Every worker exports the metrics of its own process
+        export_metrics(f"worker_{worker_id}")
+    return completed
+
+
+def run_local_workers(queue_path=QUEUE_PATH, num_workers=1, stop_when_drained=True):
+    """
+    Runs several worker processes on this machine and waits for all of them to finish.
+
+    Args:
+        queue_path (str): Location of the work queue database.
+        num_workers (int): Number of worker processes, each with its own browser.
+        stop_when_drained (bool): Stop each worker once no task is pending or leased, instead of waiting for new tasks.
+    """
+
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_worker, args=(queue_path,),
+                                 kwargs={'stop_when_drained': stop_when_drained}) for _ in range(num_workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def format_queue_status(queue):
+    """
+    Formats the number of tasks of each kind in each status.
+
+    Returns:
+        str: One line per task kind.
+    """
+
+    lines = []
+    for kind, counts in sorted(queue.counts().items(), key=lambda item: TASK_PRIORITIES.get(item[0], 0)):
+        lines.append(f"{kind}: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Scrape journals with workers pulling from a shared work queue.")
+    parser.add_argument('command', choices=['coordinate', 'work', 'collect', 'status', 'retry-failed'])
+    parser.add_argument('--queue', default=QUEUE_PATH, help="Location of the work queue database")
+    parser.add_argument('--jobs', help="JSON file mapping publishers to journal names (coordinate)")
+    parser.add_argument('--num-prev-vols', type=int, default=1)
+    parser.add_argument('--wait-time', type=int, default=15)
+    parser.add_argument('--run-id', help="Identifies the run (coordinate). Defaults to today's date")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes to run on this machine (work)")
+    parser.add_argument('--keep-polling', action='store_true',
+                        help="Keep waiting for new tasks once the queue is drained (work)")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue)
+    if args.command == 'coordinate':
+        load_all_metadata()
+        added = enqueue_journals(queue, load_publisher_jobs(args.jobs), args.num_prev_vols, args.wait_time,
+                                 args.run_id)
+        print(f"Enqueued {added} journals")
+    elif args.command == 'work':
+        queue.close()
+        if args.workers > 1:
+            run_local_workers(args.queue, args.workers, stop_when_drained=not args.keep_polling)
+        else:
+            run_worker(args.queue, stop_when_drained=not args.keep_polling)
+        queue = WorkQueue(args.queue)
+    elif args.command == 'collect':
+        print(f"Collected {collect_results(queue)} articles")
+        export_csv(os.path.join(DATA_PATH, 'all_df.csv'))
+    elif args.command == 'retry-failed':
+        print(f"Requeued {queue.retry_failed()} failed tasks")
+    print(format_queue_status(queue))
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
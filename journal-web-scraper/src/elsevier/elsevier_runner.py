@@ -31,51 +31,59 @@ Usage:
 # General Modules
 import os.path
 import sys
-import pandas as pd
-import json
-from tqdm import tqdm
 
 # Developed Modules
-from config import USER_PATH, DATA_PATH
+from config import USER_PATH
 sys.path.append(os.path.join(USER_PATH, 'src'))
-from src.elsevier.web_scrapper_elsevier import get_papers_link_elsevier, get_abstract_info_elsevier, \
-    get_num_issues_elsevier, get_latest_volume_elsevier, convert_elsevier_name
-from src.helperFunctions.saving_to_dfs import process_file
+from src.elsevier.web_scrapper_elsevier import get_papers_link_elsevier, ELSEVIER_ARTICLE_PARSER, \
+    get_num_issues_elsevier, get_latest_volume_elsevier, convert_elsevier_name, \
+    get_volume_and_issue_data_elsevier
+from src.helperFunctions.recordSink import open_journal_sink
+from src.helperFunctions.parallelAbstracts import get_abstracts
+from src.helperFunctions.linkDiscovery import discover_links
+from src.helperFunctions.jobJournal import JobJournal
+from src.helperFunctions.failureLedger import FailureLedger, ISSUE_STAGES, ARTICLE_STAGES
+from src.helperFunctions.metrics import timed
+from src.helperFunctions.harvestIndex import HarvestIndex, seed_from_store
+from src.helperFunctions.latestVolumeCache import get_latest_volume
+from src.helperFunctions.issueArchive import get_issue_archive, select_issue_urls
 
 # =============================================================================
 # Scraper/Savers
 # =============================================================================
 
-def automatic_scrape_elsevier_journal(name, num_prev_vols, wait_time):
+def get_issue_urls_elsevier(name, num_prev_vols, wait_time):
     """
-    Automatically scrapes articles from a specified Elsevier journal.
+    Lists the issue pages of the latest volumes of a specified Elsevier journal.
 
     Args:
         name (str): The name of the Elsevier journal.
         num_prev_vols (int): The number of previous volumes to scrape.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
-        None: Saves the scraped data as a JSON file.
+        url (list): URLs of the issue pages.
     """
 
-    output_path = os.path.join(DATA_PATH, f'elsevier_{name}.csv')
-    output_path_solo_df = os.path.join(DATA_PATH, f'elsevier_df.csv')
-    output_path_total_df = os.path.join(DATA_PATH, f'all_df.csv')
-
     journal_url = 'https://www.sciencedirect.com/journal/{}/vol/{{}}/suppl/C'.format(name)
     journal_multiple_issue_url = 'https://www.sciencedirect.com/journal/{}/vol/{{}}/issue/{{}}'.format(name)
 
-    html_list = []
-    abstract_list = []
+    # Only list the issues that exist, falling back to the journal's usual issue count if the archive cannot be read
+    try:
+        volume_dict = get_issue_archive('elsevier', name,
+                                        lambda: get_volume_and_issue_data_elsevier(name, wait_time))
+        return select_issue_urls(volume_dict, num_prev_vols)
+    except Exception as e:
+        print(f"Could not read the issue archive of {name} ({e}), listing issues from the journal metadata")
+
     url = []
 
-    latest_vol = int(get_latest_volume_elsevier(name))
+    latest_vol = get_latest_volume('elsevier', name, lambda: get_latest_volume_elsevier(name))
     starting_vol = max(1, latest_vol - num_prev_vols + 1)
     volumes = [vol for vol in range(starting_vol, latest_vol + 1)]
 
-    if get_num_issues_elsevier(name) != "No Issues":
-        num_issues = get_num_issues_elsevier(name)
+    num_issues = get_num_issues_elsevier(name)
+    if num_issues != "No Issues":
         issues = [i for i in range(1, num_issues + 1)]
     else:
         issues = None
@@ -91,48 +99,73 @@ def automatic_scrape_elsevier_journal(name, num_prev_vols, wait_time):
     except Exception as e:
         raise RuntimeError(f"URL generation failed: {e}")
 
-    # Get links for each paper with progress bar
-    for site in tqdm(url, desc="Getting paper links"):
-        try:
-            html_list = get_papers_link_elsevier(site, html_list, wait_time)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get links for each paper: {e}")
-    # Get Abstracts with progress bar
-    for i in tqdm(range(len(html_list)), desc="Getting abstracts"):
-        try:
-            abstract = get_abstract_info_elsevier(url_paper_list=html_list, paper_number=i, wait_time=wait_time, journal_name=name)
-            if abstract:
-                abstract_list.append(abstract)
-
-        except Exception as e:
-            pass
-
-    # Write data to JSON file
-    with open(output_path, 'w') as json_file:
-        json.dump(abstract_list, json_file)
-
-    #ToDo add UNIQUE KEY
-
-    # Convert to DataFrame
-    # df = pd.DataFrame(abstract_list, columns=['Key', 'Volume_Issue', 'Details'])
-    df = pd.DataFrame(abstract_list, columns=['Volume_Issue', 'Details'])
-    df[['Title', 'Authors', 'Abstract']] = pd.DataFrame(df['Details'].tolist(), index=df.index)
-    df.drop(columns=['Details'], inplace=True)
-
-    df.insert(0, 'Journal_Website', 'Elsevier')
+    return url
 
-    #ToDo reformat name
 
-    df.insert(1, 'Journal_Name', convert_elsevier_name(name))
-
-    # columns = ['Journal_Website', 'Journal_Name', 'Key', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
-    columns = ['Journal_Website', 'Journal_Name', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
+@timed('scrape_journal_seconds', publisher='elsevier')
+def automatic_scrape_elsevier_journal(name, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                      retry_failures=False):
+    """
+    Automatically scrapes articles from a specified Elsevier journal.
 
-    process_file(output_path_solo_df, df, columns)
-    process_file(output_path_total_df, df, columns)
+    Args:
+        name (str): The name of the Elsevier journal.
+        num_prev_vols (int): The number of previous volumes to scrape.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        num_workers (int): Number of articles fetched at the same time.
+        incremental (bool): Only scrape the articles not harvested by an earlier run.
+        retry_failures (bool): Only scrape the issue pages and articles recorded in the journal's failure ledger.
 
+    Returns:
+        None: Writes the scraped articles to the record sinks.
+    """
 
-def manual_scrape_elsevier_journal(name, volumes, issues, wait_time):
+    # Open the journal's checkpoints, failure ledger and harvest index; they are closed even if the scrape fails,
+    # and the checkpoints are kept so the next run resumes
+    failure_ledger = FailureLedger('elsevier', name)
+    job_journal = JobJournal(f'elsevier_{name}')
+    harvest_index = HarvestIndex(f'elsevier_{name}')
+    try:
+        # Retry runs only revisit the issue pages and articles that failed in earlier runs
+        if retry_failures:
+            url = failure_ledger.get_urls(ISSUE_STAGES)
+        else:
+            url = get_issue_urls_elsevier(name, num_prev_vols, wait_time)
+
+        # Get links for each paper in one browser session, skipping issues already recorded by an interrupted run
+        html_list = discover_links(get_papers_link_elsevier, url, wait_time, job_journal, failure_ledger)
+
+        # Only open the article pages of papers not harvested by an earlier run
+        if incremental:
+            # A journal scraped before the harvest index existed starts from the issues already in the article store
+            seed_from_store(harvest_index, job_journal.get_issue_links(),
+                            'elsevier', name, 'Elsevier', convert_elsevier_name(name))
+            html_list = harvest_index.filter_new(html_list)
+        if retry_failures:
+            # Articles that failed to parse are in the harvest index too, so the ledger's are added after the filter
+            html_list = list(dict.fromkeys(html_list + failure_ledger.get_urls(ARTICLE_STAGES)))
+        if not html_list:
+            print(f"No new articles for {name}")
+            job_journal.finish()
+            return
+
+        # Write every article to the record sinks as soon as it is extracted; articleStore.main() exports all_df.csv
+        with open_journal_sink(f'elsevier_{name}', 'Elsevier', convert_elsevier_name(name),
+                               append=incremental or retry_failures) as journal_sink:
+            get_abstracts(ELSEVIER_ARTICLE_PARSER, html_list, wait_time, name, num_workers, job_journal, failure_ledger,
+                          journal_sink)
+
+        harvest_index.add(job_journal.get_recorded_urls())
+
+        # Results are saved, the checkpoints are no longer needed
+        job_journal.finish()
+    finally:
+        harvest_index.close()
+        failure_ledger.close()
+        job_journal.close()
+
+
+def manual_scrape_elsevier_journal(name, volumes, issues, wait_time, num_workers=1):
     """
     Manually scrapes articles from a specified Elsevier journal based on provided volumes and issues.
 
@@ -140,17 +173,15 @@ def manual_scrape_elsevier_journal(name, volumes, issues, wait_time):
         name (str): The name of the Elsevier journal.
         volumes (list of int): Volumes to scrape.
         issues (list of int): Issues to scrape within each volume.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        num_workers (int): Number of articles fetched at the same time.
 
     Returns:
-        None: Saves the scraped data as a JSON file.
+        None: Writes the scraped articles to a JSON Lines file.
     """
 
-    output_path = os.path.join(DATA_PATH, f'elsevier_{name}.json')
     journal_url = 'https://www.sciencedirect.com/journal/{}/vol/{{}}/suppl/C'.format(name)
 
-    html_list = []
-    abstract_list = []
     url = []
 
     # Generate URLs
@@ -164,25 +195,13 @@ def manual_scrape_elsevier_journal(name, volumes, issues, wait_time):
     except Exception as e:
         raise RuntimeError(f"URL generation failed: {e}")
 
-    # Get links for each paper with progress bar
-    for site in tqdm(url, desc="Getting paper links"):
-        try:
-            html_list = get_papers_link_elsevier(site, html_list, wait_time)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get links for each paper: {e}")
-
-    # Get Abstracts with progress bar
-    for i in tqdm(range(len(html_list)), desc="Getting abstracts"):
-        try:
-            abstract = get_abstract_info_elsevier(url_paper_list=html_list, paper_number=i, wait_time=wait_time)
-            if abstract:
-                abstract_list.append(abstract)
-        except Exception as e:
-            pass
+    # Get links for each paper in one browser session
+    html_list = discover_links(get_papers_link_elsevier, url, wait_time)
 
-    # Write data to JSON file
-    with open(output_path, 'w') as json_file:
-        json.dump(abstract_list, json_file)
+    # Write every article to a JSON Lines file as soon as it is extracted
+    with open_journal_sink(f'elsevier_{name}', 'Elsevier', convert_elsevier_name(name),
+                           formats=('jsonl',)) as journal_sink:
+        get_abstracts(ELSEVIER_ARTICLE_PARSER, html_list, wait_time, name, num_workers, sink=journal_sink)
 
     #ToDo add saving in XLSX
 
@@ -190,7 +209,8 @@ def manual_scrape_elsevier_journal(name, volumes, issues, wait_time):
 # =============================================================================
 # Run Multiple
 # =============================================================================
-def scrape_multiple_elsevier_journals(journal_list, num_prev_vols, wait_time):
+def scrape_multiple_elsevier_journals(journal_list, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                      retry_failures=False):
     """
     Scrapes multiple Elsevier journals for academic articles.
 
@@ -198,6 +218,9 @@ def scrape_multiple_elsevier_journals(journal_list, num_prev_vols, wait_time):
         journal_list (list of str): List of journal names to scrape.
         volumes (list of int): Volumes to scrape in each journal.
         issues (list of int): Issues to scrape within each volume.
+        num_workers (int): Number of articles fetched at the same time.
+        incremental (bool): Only scrape the articles not harvested by an earlier run.
+        retry_failures (bool): Only scrape the issue pages and articles recorded in each journal's failure ledger.
 
     Returns:
         None: Saves the scraped data as JSON files for each journal.
@@ -205,7 +228,7 @@ def scrape_multiple_elsevier_journals(journal_list, num_prev_vols, wait_time):
     for journal_name in journal_list:
         print(f"Starting {journal_name}")
         try:
-            automatic_scrape_elsevier_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_elsevier_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental, retry_failures)
         except Exception as e:
             print(f"Journal {journal_name} error")
             print(e)
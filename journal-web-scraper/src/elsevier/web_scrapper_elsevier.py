@@ -11,6 +11,7 @@ The tool is designed to assist in gathering data for academic research and analy
 Functions:
     get_num_issues_elsevier(journal_name): Retrieves the number of issues available for a specified Elsevier journal.
     get_latest_volume_elsevier(journal_name): Retrieves the latest volume for a specified Elsevier journal.
+    get_volume_and_issue_data_elsevier(journal_name, wait_time): Retrieves the existing volumes and issues of an Elsevier journal.
     get_papers_link_elsevier(url, html_list, wait_time): Retrieves URLs of papers from a specified Elsevier journal webpage.
     get_abstract_info_elsevier(url_paper_list, paper_number, wait_time): Extracts detailed information from an Elsevier paper's webpage,
         including abstract, title, authors, and issue/volume information.
@@ -32,14 +33,23 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from config import GECKO_PATH
 import re
-import json
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.journalMetadata import get_journal_metadata
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.articleParser import ArticleParser
+from src.helperFunctions.issueArchive import parse_issue_links
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_ELSEVIER = {
+    'abstract': ('block_text', '#abstracts'),
+    'title': ('text', '#screen-reader-main-title'),
+    'authors': ('block_text', '#author-group'),
+    'volume_issue': ('text', '.publication-volume .text-xs'),
+}
 
 
 # =============================================================================
@@ -67,12 +77,7 @@ def get_num_issues_elsevier(name):
         int or str: Number of issues if available, else 'No Issues'.
     """
 
-    try:
-        with open('elsevier_journals_with_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('elsevier/elsevier_journals_with_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('elsevier')
 
     try:
         return name_dict[name]
@@ -88,26 +93,47 @@ def get_latest_volume_elsevier(journal_name):
         journal_name (str): The name of the Elsevier journal.
 
     Returns:
-        str: The latest volume number, or None if not found.
+        int: The latest volume number.
+
+    Raises:
+        ValueError: If no issue link on the page names a volume.
     """
 
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
     journal_url = f'https://www.sciencedirect.com/journal/{journal_name}/issues'
-    time.sleep(5)
-    browser.get(journal_url)
+    page = fetch_page(journal_url, 'elsevier', 'latest_volume', 5)
 
     # Find all issue link elements
-    issue_link_elements = browser.find_elements(By.CLASS_NAME, "js-issue-item-link")
-    for issue_link_element in issue_link_elements:
-        volume_text = issue_link_element.text
+    for volume_text in page.texts(".js-issue-item-link"):
         volume_match = re.search(r"Volume (\d+)", volume_text)
         if volume_match:
-            volume = volume_match.group(1)
-            browser.close()
-            return volume
+            return int(volume_match.group(1))
+
+    raise ValueError(f"No volume number in the issue links of {journal_url}")
+
+
+def get_volume_and_issue_data_elsevier(journal_name, wait_time=None):
+    """
+    Retrieves volume and issue data from the issues page of an Elsevier journal. Volumes published as one
+    supplement, without issues, map to a single issue ''.
 
-    browser.close()
+    Args:
+        journal_name (str): The name of the journal, as in its URL.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        volume_dict (dict): A dictionary mapping each volume, newest first, to its issues and corresponding URLs.
+    """
+
+    archive_url = f'https://www.sciencedirect.com/journal/{journal_name}/issues'
+    journal_url = 'https://www.sciencedirect.com/journal/{}/vol/{{}}/suppl/C'.format(journal_name)
+    journal_multiple_issue_url = 'https://www.sciencedirect.com/journal/{}/vol/{{}}/issue/{{}}'.format(journal_name)
+
+    def build_url(volume, issue):
+        return journal_multiple_issue_url.format(volume, issue) if issue else journal_url.format(volume)
+
+    page = fetch_page(archive_url, 'elsevier', 'issue_archive', wait_time)
+    return parse_issue_links([page], rf"/journal/{journal_name}/vol/(\d+)(?:/issue/([\w-]+))?", build_url,
+                             ".js-issue-item-link")
 
 
 def get_papers_link_elsevier(url, html_list, wait_time):
@@ -117,23 +143,56 @@ def get_papers_link_elsevier(url, html_list, wait_time):
     Args:
         url (str): URL of the journal's webpage.
         html_list (list): List to store the paper URLs.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         html_list (list): Updated list with URLs of papers.
     """
 
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
-    browser.get(url)
-    time.sleep(wait_time)
-    links = browser.find_elements(By.XPATH, "//h3/a")
-    for i in links:
-        html_list.append(i.get_attribute('href'))
-    browser.close()
+    page = fetch_page(url, 'elsevier', 'issue', wait_time)
+    html_list.extend(page.links("h3 > a"))
     return html_list
 
 
+def build_paper_elsevier(fields, journal_name):
+    """
+    Builds the paper of an Elsevier article from the fields read with ARTICLE_FIELDS_ELSEVIER.
+
+    Args:
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
+
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
+
+    abstract = fields['abstract']
+    abstract = abstract.replace('Highlights\n', '')
+    abstract = abstract.replace('Abstract ', '')
+    abstract = abstract.replace('\n', ' ')
+    abstract = abstract.replace('•', '')
+
+    title = re.sub(r'[^A-Za-z0-9 ]+', '', fields['title'])
+
+    authors = fields['authors']
+    authors = authors.replace('Author links open overlay panel', '')
+    authors = authors.replace('\n', '')
+    authors = re.sub(r'\s*\d+\s*', '', authors)
+
+    volume_issue_text = fields['volume_issue'].split(",")[0:2]
+
+    # Check if the second part starts with 'I' (indicating 'Issue')
+    if len(volume_issue_text) > 1 and volume_issue_text[1].strip().startswith('I'):
+        volume_issue = " ".join(volume_issue_text)
+    else:
+        volume_issue = volume_issue_text[0] + ", Issue 1"
+
+    return [volume_issue, [title, authors, abstract]]
+
+
+ELSEVIER_ARTICLE_PARSER = ArticleParser('elsevier', ARTICLE_FIELDS_ELSEVIER, build_paper_elsevier)
+
+
 def get_abstract_info_elsevier(url_paper_list, paper_number, wait_time, journal_name):
     """
     Retrieves detailed information of a specific paper from Elsevier.
@@ -141,49 +200,16 @@ def get_abstract_info_elsevier(url_paper_list, paper_number, wait_time, journal_
     Args:
         url_paper_list (list): List of paper URLs.
         paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
 
     try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
-        time.sleep(wait_time)
-
-        abstract = browser.find_element(By.ID, 'abstracts').text
-        abstract = abstract.replace('Highlights\n', '')
-        abstract = abstract.replace('Abstract ', '')
-        abstract = abstract.replace('\n', ' ')
-        abstract = abstract.replace('•', '')
-
-        title = browser.find_element(By.ID, 'screen-reader-main-title').text
-        title = re.sub(r'[^A-Za-z0-9 ]+', '', title)
-
-        authors = browser.find_element(By.ID, 'author-group').text
-        authors = authors.replace('Author links open overlay panel', '')
-        authors = authors.replace('\n', '')
-        authors = re.sub(r'\s*\d+\s*', '', authors)
-
-        # Locate the element that contains the volume and issue information
-        volume_issue_info = browser.find_element(By.CSS_SELECTOR, ".publication-volume .text-xs")
-        volume_issue_text = volume_issue_info.text.split(",")[0:2]
-
-        # Check if the second part starts with 'I' (indicating 'Issue')
-        if len(volume_issue_text) > 1 and volume_issue_text[1].strip().startswith('I'):
-            volume_issue = " ".join(volume_issue_text)
-        else:
-            volume_issue = volume_issue_text[0] + ", Issue 1"
-
-        # key = generate_key('Elsevier', journal_name, volume_issue.split(" ")[1].replace(',', ''), volume_issue.split(" ")[-1])
-        # paper = [key, volume_issue, [title, authors, abstract]]
-        paper = [volume_issue, [title, authors, abstract]]
-
+        page = ELSEVIER_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = ELSEVIER_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
-
         paper = []
-    finally:
-        browser.close()
+
     return paper
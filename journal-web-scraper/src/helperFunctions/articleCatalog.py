@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+"""
+Article Catalog
+
+This module keeps every scraped article in one SQLite database under DATA_PATH, so questions about the corpus, such as
+how many Wiley articles volume 78 holds, are answered by an indexed query instead of loading all_df.csv into pandas.
+The database runs in WAL mode, so the suggestion and generation pipelines can read it while a scrape is writing to it.
+Articles are indexed by publisher, journal, volume and issue, and their titles and abstracts by an FTS5 full-text
+index kept up to date by triggers. The runners write to it through the 'catalog' record sink (see recordSink.py), one
+transaction per batch; an article whose Key is already catalogued is skipped. Query results are streamed in batches,
+so a pipeline never holds more than one batch of the corpus.
+
+Classes:
+    ArticleCatalog(path): The catalogued articles, with batched writes and query helpers.
+
+Functions:
+    import_store(catalog): Catalogs every article of the article store, e.g. those scraped before the catalog existed.
+    export_text(file_path, catalog): Writes the title and abstract of every article to a text file, as the generation
+        models read them.
+
+Usage:
+    catalog = ArticleCatalog()
+    catalog.count(publisher='Wiley', volume=78)
+    for article in catalog.iter_articles(journal='The Journal of Finance', columns=['Title', 'Abstract']):
+        ...
+    catalog.search('monetary policy', limit=10)
+    catalog.close()
+
+    python -m src.helperFunctions.articleCatalog    (catalogs the article store and prints the articles per journal)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import os.path
+import re
+import sqlite3
+import threading
+import time
+from config import DATA_PATH
+from src.helperFunctions.articleStore import iter_store
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+CATALOG_PATH = os.path.join(DATA_PATH, 'articles.sqlite')
+
+CATALOG_COLUMNS = ['Key', 'Journal_Website', 'Journal_Name', 'Volume_Issue', 'Volume', 'Issue', 'Title', 'Authors',
+                   'Abstract']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    Key TEXT NOT NULL UNIQUE,
+    Journal_Website TEXT NOT NULL,
+    Journal_Name TEXT NOT NULL,
+    Volume_Issue TEXT,
+    Volume INTEGER,
+    Issue INTEGER,
+    Title TEXT,
+    Authors TEXT,
+    Abstract TEXT,
+    added REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_publisher ON articles (Journal_Website, Journal_Name, Volume, Issue);
+CREATE INDEX IF NOT EXISTS articles_journal ON articles (Journal_Name, Volume, Issue);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(Title, Abstract, content='articles', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, Title, Abstract) VALUES (new.id, new.Title, new.Abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, Title, Abstract) VALUES ('delete', old.id, old.Title, old.Abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, Title, Abstract) VALUES ('delete', old.id, old.Title, old.Abstract);
+    INSERT INTO articles_fts (rowid, Title, Abstract) VALUES (new.id, new.Title, new.Abstract);
+END;
+"""
+
+
+# =============================================================================
+# Article Catalog
+# =============================================================================
+def _volume_and_issue(volume_issue):
+    # The first two numbers of e.g. 'Volume 75, Issue 3' or 'VOL. 61 NO. 4'; missing ones are stored as NULL
+    numbers = re.findall(r'\d+', str(volume_issue))
+    return (int(numbers[0]) if numbers else None), (int(numbers[1]) if len(numbers) > 1 else None)
+
+
+def _where(publisher=None, journal=None, volume=None, issue=None):
+    clauses, parameters = [], []
+    for column, value in (('Journal_Website', publisher), ('Journal_Name', journal), ('Volume', volume),
+                          ('Issue', issue)):
+        if value is not None:
+            clauses.append(f"articles.{column} = ?")
+            parameters.append(value)
+    return clauses, parameters
+
+
+class ArticleCatalog:
+    """
+    The catalogued articles, with batched writes and query helpers.
+
+    Args:
+        path (str): Location of the SQLite database. Defaults to CATALOG_PATH.
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def add_records(self, records):
+        """
+        Catalogs a batch of articles in one transaction, skipping those whose Key is already catalogued.
+
+        Args:
+            records (iterable): Articles as dicts with the Key, Journal_Website, Journal_Name, Volume_Issue, Title,
+                Authors and Abstract fields, e.g. from recordSink.paper_to_record.
+
+        Returns:
+            int: Number of articles added.
+        """
+
+        now = time.time()
+        rows = []
+        for record in records:
+            volume, issue = _volume_and_issue(record['Volume_Issue'])
+            rows.append((record['Key'], record['Journal_Website'], record['Journal_Name'], record['Volume_Issue'],
+                         volume, issue, record['Title'], record['Authors'], record['Abstract'], now))
+
+        with self._lock, self._connection:
+            cursor = self._connection.executemany(
+                "INSERT INTO articles (Key, Journal_Website, Journal_Name, Volume_Issue, Volume, Issue, Title, "
+                "Authors, Abstract, added) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (Key) DO NOTHING",
+                rows
+            )
+            return cursor.rowcount
+
+    def count(self, publisher=None, journal=None, volume=None, issue=None):
+        """
+        Returns the number of catalogued articles, optionally of one publisher, journal, volume or issue.
+
+        Args:
+            publisher (str): The publisher, as stored in Journal_Website, e.g. 'Wiley'.
+            journal (str): The journal, as stored in Journal_Name.
+            volume (int): The volume number.
+            issue (int): The issue number.
+
+        Returns:
+            int: Number of articles.
+        """
+
+        clauses, parameters = _where(publisher, journal, volume, issue)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM articles{where}", parameters).fetchone()[0]
+
+    def iter_articles(self, publisher=None, journal=None, volume=None, issue=None, columns=None, batch_size=1000):
+        """
+        Yields the catalogued articles in the order they were added, optionally of one publisher, journal, volume or
+        issue, loading batch_size of them at a time.
+
+        Args:
+            publisher (str): The publisher, as stored in Journal_Website, e.g. 'Wiley'.
+            journal (str): The journal, as stored in Journal_Name.
+            volume (int): The volume number.
+            issue (int): The issue number.
+            columns (list): Columns to read, from CATALOG_COLUMNS. Defaults to every column.
+            batch_size (int): Articles read per query.
+
+        Yields:
+            dict: One article, mapping column to value.
+        """
+
+        columns = list(columns or CATALOG_COLUMNS)
+        for column in columns:
+            if column not in CATALOG_COLUMNS:
+                raise ValueError(f"Unknown catalog column '{column}', expected one of {CATALOG_COLUMNS}")
+        clauses, parameters = _where(publisher, journal, volume, issue)
+        query = (f"SELECT id, {', '.join(columns)} FROM articles WHERE {' AND '.join(clauses + ['id > ?'])} "
+                 f"ORDER BY id LIMIT ?")
+
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(query, parameters + [last_id, batch_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                last_id = row[0]
+                yield dict(zip(columns, row[1:]))
+
+    def search(self, query, limit=20, publisher=None, journal=None):
+        """
+        Returns the articles whose title or abstract best match a full-text query.
+
+        Args:
+            query (str): An FTS5 query, e.g. 'monetary policy' or 'Title: inflation'.
+            limit (int): Most articles returned.
+            publisher (str): Only search the articles of this publisher.
+            journal (str): Only search the articles of this journal.
+
+        Returns:
+            list: Articles as dicts mapping column to value, best match first.
+        """
+
+        clauses, parameters = _where(publisher, journal)
+        columns = ', '.join(f"articles.{column}" for column in CATALOG_COLUMNS)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {columns} FROM articles_fts JOIN articles ON articles.id = articles_fts.rowid "
+                f"WHERE {' AND '.join(['articles_fts MATCH ?'] + clauses)} ORDER BY bm25(articles_fts) LIMIT ?",
+                [query] + parameters + [limit]
+            ).fetchall()
+        return [dict(zip(CATALOG_COLUMNS, row)) for row in rows]
+
+    def get_journal_counts(self):
+        """
+        Returns the number of catalogued articles per journal.
+
+        Returns:
+            list: (publisher, journal, articles) tuples, ordered by publisher and journal.
+        """
+
+        with self._lock:
+            return self._connection.execute(
+                "SELECT Journal_Website, Journal_Name, COUNT(*) FROM articles GROUP BY Journal_Website, Journal_Name "
+                "ORDER BY Journal_Website, Journal_Name"
+            ).fetchall()
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# =============================================================================
+# Import and Export
+# =============================================================================
+def import_store(catalog):
+    """
+    Catalogs every article of the article store, e.g. those scraped before the catalog existed, one part file per
+    transaction.
+
+    Args:
+        catalog (ArticleCatalog): The catalog to write to.
+
+    Returns:
+        int: Number of articles added.
+    """
+
+    columns = ['Key', 'Journal_Website', 'Journal_Name', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
+    return sum(catalog.add_records(df.to_dict('records')) for df in iter_store(columns))
+
+
+def export_text(file_path, catalog, publisher=None, journal=None):
+    """
+    Writes the title and abstract of every catalogued article to a text file, one article per paragraph, as the
+    generation models read journal_text.txt.
+
+    Args:
+        file_path (str): Path of the text file.
+        catalog (ArticleCatalog): The catalog to read.
+        publisher (str): Only export the articles of this publisher.
+        journal (str): Only export the articles of this journal.
+
+    Returns:
+        int: Number of articles written.
+    """
+
+    written = 0
+    with open(file_path, 'w', encoding='utf-8') as text_file:
+        for article in catalog.iter_articles(publisher, journal, columns=['Title', 'Abstract']):
+            text_file.write(f"{article['Title'] or ''}\n{article['Abstract'] or ''}\n\n")
+            written += 1
+    return written
+
+
+# =============================================================================
+# Main
+# =============================================================================
+def main():
+    catalog = ArticleCatalog()
+    print(f"Catalogued {import_store(catalog)} articles from the article store")
+    for publisher, journal, articles in catalog.get_journal_counts():
+        print(f"{publisher} {journal}: {articles} articles")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+Article Parser
+
+This module separates fetching an article's page from extracting its fields. Each publisher describes the fields of
+its article pages once, as a dict mapping a field name to how it is read from the page (see FIELD_KINDS) and the CSS
+selector it is read from, together with a build_paper function that turns the extracted fields into the
+[volume_issue, [title, authors, abstract]] list the runners store. The selectors are compiled once per process (see
+fetchBackend.PageSnapshot), and extraction only works on a snapshot of the page, so it does not need a browser and can
+run in a separate process from the fetching.
+
+Article pages that have to be rendered in a browser are handled according to the extraction mode:
+    'script': the same field spec is evaluated in the browser by one execute_script call, which returns every field
+        as a single JSON object, so neither the page source nor one WebDriver round trip per element has to cross to
+        Python (default).
+    'snapshot': the page source is taken from the browser and parsed like any other page.
+Pages served over HTTP or from the page cache are always parsed from their snapshot, and the page cache modes that
+store pages need the page source, so they also use snapshots.
+
+Functions:
+    configure_extraction(mode): Sets how fields are extracted from browser-rendered article pages.
+    extract_fields(page, fields): Reads every field of a field spec from a PageSnapshot.
+    extract_fields_in_browser(url, publisher, fields, wait_time): Loads a page in a pooled browser and reads every
+        field of a field spec with a single script.
+
+Classes:
+    ArticleParser(publisher, fields, build_paper): The fetch and parse stages of one publisher's article pages.
+
+Usage:
+    page = SPRINGER_ARTICLE_PARSER.fetch(url, wait_time)
+    paper = SPRINGER_ARTICLE_PARSER.parse(page.url, page.html, journal_name)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+from src.helperFunctions.fetchBackend import STATIC_PAGES, ElementNotFound, PageSnapshot, fetch_page, run_page_script
+from src.helperFunctions.pageCache import get_page_cache_mode
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# How a field is read from the page, by PageSnapshot method:
+#     'text': whitespace-normalised text of the first match
+#     'texts': list with the text of every match
+#     'block_text': text of the first match with one line per text block
+#     'outer_html': HTML of the first match
+FIELD_KINDS = ('text', 'texts', 'block_text', 'outer_html')
+
+EXTRACTION_MODES = ('script', 'snapshot')
+
+# Reads a field spec in the browser. Text is gathered from text nodes the way BeautifulSoup's get_text does, so both
+# extraction paths give the same values.
+_EXTRACT_FIELDS_SCRIPT = """
+var fields = arguments[0], values = {}, missing = [];
+function textNodes(element) {
+    var walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT, {acceptNode: function (node) {
+        var tag = node.parentNode.nodeName;
+        return (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'TEMPLATE') ? NodeFilter.FILTER_REJECT
+                                                                           : NodeFilter.FILTER_ACCEPT;
+    }});
+    var parts = [], node;
+    while ((node = walker.nextNode())) parts.push(node.nodeValue);
+    return parts;
+}
+function text(element) {
+    return textNodes(element).join('').split(/\\s+/).filter(Boolean).join(' ');
+}
+function blockText(element) {
+    return textNodes(element).join('\\n').split('\\n').map(function (line) {
+        return line.split(/\\s+/).filter(Boolean).join(' ');
+    }).filter(Boolean).join('\\n');
+}
+for (var name in fields) {
+    var kind = fields[name][0], selector = fields[name][1];
+    if (kind === 'texts') {
+        values[name] = Array.prototype.map.call(document.querySelectorAll(selector), text);
+        continue;
+    }
+    var element = document.querySelector(selector);
+    if (element === null) {
+        missing.push(selector);
+    } else if (kind === 'text') {
+        values[name] = text(element);
+    } else if (kind === 'block_text') {
+        values[name] = blockText(element);
+    } else {
+        values[name] = element.outerHTML;
+    }
+}
+return JSON.stringify({values: values, missing: missing});
+"""
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+_config = {'mode': 'script'}
+
+
+def configure_extraction(mode):
+    """
+    Sets how fields are extracted from article pages rendered in a browser.
+
+    Args:
+        mode (str): 'script' or 'snapshot'.
+    """
+
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Extraction mode must be one of {', '.join(EXTRACTION_MODES)}, not '{mode}'")
+    _config['mode'] = mode
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+def extract_fields(page, fields):
+    """
+    Reads every field of a field spec from a page.
+
+    Args:
+        page (PageSnapshot): The page.
+        fields (dict): Maps field name to (kind, selector), with kind one of FIELD_KINDS.
+
+    Returns:
+        dict: Maps field name to the value read from the page.
+
+    Raises:
+        ElementNotFound: If a 'text', 'block_text' or 'outer_html' field has no matching element.
+    """
+
+    return {name: getattr(page, kind)(selector) for name, (kind, selector) in fields.items()}
+
+
+def extract_fields_in_browser(url, publisher, fields, wait_time=None):
+    """
+    Loads an article's page in a pooled browser and reads every field of a field spec with a single execute_script call.
+
+    Args:
+        url (str): URL of the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        fields (dict): Maps field name to (kind, selector), with kind one of FIELD_KINDS.
+        wait_time (int): Longest time to wait for the page. Defaults to the readiness spec's timeout.
+
+    Returns:
+        ExtractedPage: The page's final URL and fields.
+    """
+
+    final_url, result = run_page_script(url, publisher, 'article', _EXTRACT_FIELDS_SCRIPT, (fields,), wait_time)
+    result = json.loads(result)
+    return ExtractedPage(final_url, result['values'], result['missing'])
+
+
+class ExtractedPage:
+    """
+    The fields of a page that were extracted in the browser. It has no HTML, so it is never sent to a parse process.
+
+    Args:
+        url (str): Final URL of the page.
+        fields (dict): Maps field name to the value read from the page.
+        missing (list): Selectors of the required fields that matched no element.
+    """
+
+    html = None
+
+    def __init__(self, url, fields, missing=()):
+        self.url = url
+        self.fields = fields
+        self.missing = list(missing)
+
+    def get_fields(self):
+        """
+        Returns the extracted fields.
+
+        Raises:
+            ElementNotFound: If a required field matched no element, as reading it from a PageSnapshot would.
+        """
+
+        if self.missing:
+            raise ElementNotFound(f"No element matches '{self.missing[0]}' on {self.url}")
+        return self.fields
+
+
+class ArticleParser:
+    """
+    The fetch and parse stages of one publisher's article pages.
+
+    Args:
+        publisher (str): Key of the publisher in READINESS_SPECS, e.g. 'springer'.
+        fields (dict): Maps field name to (kind, selector), with kind one of FIELD_KINDS.
+        build_paper (callable): Called with the extracted fields and the journal name, returns the paper list.
+    """
+
+    def __init__(self, publisher, fields, build_paper):
+        for name, (kind, selector) in fields.items():
+            if kind not in FIELD_KINDS:
+                raise ValueError(f"Field '{name}' of {publisher} has unknown kind '{kind}'")
+        self.publisher = publisher
+        self.fields = fields
+        self.build_paper = build_paper
+
+    def fetch(self, url, wait_time):
+        """
+        Fetches an article's page. A page that needs a browser has its fields extracted in the browser when the
+        extraction mode is 'script' and the page cache does not need its source.
+
+        Returns:
+            PageSnapshot or ExtractedPage: The page, not parsed yet, or its extracted fields.
+        """
+
+        if (_config['mode'] == 'script' and (self.publisher, 'article') not in STATIC_PAGES
+                and get_page_cache_mode() == 'off'):
+            return extract_fields_in_browser(url, self.publisher, self.fields, wait_time)
+        return fetch_page(url, self.publisher, 'article', wait_time)
+
+    def parse(self, url, html, journal_name):
+        """
+        Extracts the paper from the HTML of an article's page.
+
+        Returns:
+            paper (list): [volume_issue, [title, authors, abstract]].
+
+        Raises:
+            ElementNotFound: If a required field is missing from the page.
+        """
+
+        return self.parse_page(PageSnapshot(url, html, 'snapshot'), journal_name)
+
+    def parse_page(self, page, journal_name):
+        """
+        Extracts the paper from an article's PageSnapshot, or builds it from the fields of an ExtractedPage.
+        """
+
+        fields = page.get_fields() if isinstance(page, ExtractedPage) else extract_fields(page, self.fields)
+        return self.build_paper(fields, journal_name)
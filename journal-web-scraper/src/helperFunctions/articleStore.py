@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+Article Store
+
+This module stores the scraped articles as append-only Parquet files under DATA_PATH, partitioned by publisher and
+journal. Every article carries its stable Key (see generateKey.generate_key), and each partition keeps a KeyIndex of
+the keys it holds. Appending a journal's results only loads that journal's key index, drops the articles already
+stored and writes the rest as a new part file, so the cost of a write grows with the number of new rows rather than
+with the size of the corpus. Compaction merges each partition's part files into one and exports the combined CSV.
+
+Functions:
+    append_articles(df, columns): Appends the articles not yet stored to their publisher/journal partitions.
+    read_store(columns): Reads every stored article into one DataFrame.
+    iter_store(columns): Yields the stored articles one part file at a time.
+    compact_store(): Merges the part files of every partition into one file.
+    export_csv(file_path, columns): Writes every stored article to a CSV file.
+    import_csv(file_path): Appends the articles of a CSV file written by earlier scraper versions, e.g. all_df.csv.
+    get_stored_issues(journal_website, journal_name): Returns the volume and issue numbers a journal's partition holds.
+
+Usage:
+    append_articles(df, columns)
+    ...
+    compact_store()
+    export_csv(os.path.join(DATA_PATH, 'all_df.csv'))
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import glob
+import os
+import re
+import threading
+import time
+import uuid
+from urllib.parse import quote
+import pandas as pd
+from config import DATA_PATH
+from src.helperFunctions.generateKey import generate_keys, KeyIndex
+from src.helperFunctions.metrics import increment, timer
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+STORE_PATH = os.path.join(DATA_PATH, 'article_store')
+
+STORE_COLUMNS = ['Key', 'Journal_Website', 'Journal_Name', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
+
+_store_lock = threading.Lock()
+_partition_indexes = {}
+
+
+# =============================================================================
+# Keys and Partitions
+# =============================================================================
+def _partition_dir(journal_website, journal_name):
+    return os.path.join(STORE_PATH, quote(str(journal_website), safe=''), quote(str(journal_name), safe=''))
+
+
+def _part_files(partition_dir):
+    return sorted(glob.glob(os.path.join(partition_dir, 'part-*.parquet')))
+
+
+def _new_part_path(partition_dir):
+    return os.path.join(partition_dir, f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+
+
+def _write_part(df, part_path):
+    # Written under a temporary name first so readers never see a partial file
+    tmp_path = part_path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+
+
+def _key_index(partition_dir):
+    if partition_dir not in _partition_indexes:
+        key_index = KeyIndex(os.path.join(partition_dir, 'keys.txt'))
+        if not os.path.exists(key_index.path):
+            # Partition written before it had a key index
+            for part_file in _part_files(partition_dir):
+                key_index.add(pd.read_parquet(part_file, columns=['Key'])['Key'])
+        _partition_indexes[partition_dir] = key_index
+    return _partition_indexes[partition_dir]
+
+
+# =============================================================================
+# Store
+# =============================================================================
+def append_articles(df, columns=None):
+    """
+    Appends the articles not yet stored to their publisher/journal partitions.
+
+    Args:
+        df (pd.DataFrame): Articles with at least the Journal_Website, Journal_Name, Volume_Issue and Title columns.
+        columns (list): Columns to store. Defaults to STORE_COLUMNS. A Key column is computed when missing.
+
+    Returns:
+        int: Number of articles written.
+    """
+
+    if df.empty:
+        return 0
+
+    columns = list(columns or STORE_COLUMNS)
+    if 'Key' not in columns:
+        columns.insert(0, 'Key')
+    df = df.copy()
+    if 'Key' not in df.columns:
+        df['Key'] = generate_keys(df)
+    df = df.drop_duplicates(subset='Key')[columns]
+
+    written = 0
+    with _store_lock:
+        for (journal_website, journal_name), group in df.groupby(['Journal_Website', 'Journal_Name'], sort=False):
+            partition_dir = _partition_dir(journal_website, journal_name)
+            key_index = _key_index(partition_dir)
+            new_rows = group[~group['Key'].isin(key_index.keys)]
+            if new_rows.empty:
+                continue
+
+            os.makedirs(partition_dir, exist_ok=True)
+            with timer('scrape_stage_seconds', stage='save', publisher=journal_website):
+                _write_part(new_rows, _new_part_path(partition_dir))
+            key_index.add(new_rows['Key'])
+            written += len(new_rows)
+            increment('scrape_saved_articles_total', len(new_rows), publisher=journal_website)
+    return written
+
+
+def read_store(columns=None):
+    """
+    Reads every stored article into one DataFrame.
+
+    Args:
+        columns (list): Columns to read. Defaults to every stored column.
+
+    Returns:
+        pd.DataFrame: The stored articles, partition by partition in the order they were written.
+    """
+
+    part_files = sorted(glob.glob(os.path.join(STORE_PATH, '*', '*', 'part-*.parquet')))
+    if not part_files:
+        return pd.DataFrame(columns=columns or STORE_COLUMNS)
+    return pd.concat([pd.read_parquet(part_file, columns=columns) for part_file in part_files], ignore_index=True)
+
+
+def iter_store(columns=None):
+    """
+    Yields the stored articles one part file at a time, so the whole store is never in memory at once.
+
+    Args:
+        columns (list): Columns to read. Defaults to every stored column.
+
+    Yields:
+        pd.DataFrame: The articles of one part file.
+    """
+
+    for part_file in sorted(glob.glob(os.path.join(STORE_PATH, '*', '*', 'part-*.parquet'))):
+        yield pd.read_parquet(part_file, columns=columns)
+
+
+def compact_store():
+    """
+    Merges the part files of every partition into one file, dropping any duplicated Key.
+
+    Returns:
+        int: Number of partitions compacted.
+    """
+
+    compacted = 0
+    with _store_lock:
+        for partition_dir in sorted(glob.glob(os.path.join(STORE_PATH, '*', '*'))):
+            part_files = _part_files(partition_dir)
+            if len(part_files) < 2:
+                continue
+
+            df = pd.concat([pd.read_parquet(part_file) for part_file in part_files], ignore_index=True)
+            df = df.drop_duplicates(subset='Key')
+            _write_part(df, _new_part_path(partition_dir))
+            for part_file in part_files:
+                os.remove(part_file)
+            compacted += 1
+    return compacted
+
+
+def export_csv(file_path, columns=None):
+    """
+    Writes every stored article to a CSV file.
+
+    Args:
+        file_path (str): Path of the CSV file, e.g. DATA_PATH/all_df.csv.
+        columns (list): Columns to export. Defaults to every stored column.
+    """
+
+    read_store(columns).to_csv(file_path, index=False)
+
+
+def import_csv(file_path):
+    """
+    Appends the articles of a CSV file written by earlier scraper versions, e.g. all_df.csv.
+
+    Args:
+        file_path (str): Path of the CSV file.
+
+    Returns:
+        int: Number of articles written.
+    """
+
+    df = pd.read_csv(file_path)
+    return append_articles(df, [column for column in STORE_COLUMNS if column in df.columns or column == 'Key'])
+
+
+def get_stored_issues(journal_website, journal_name):
+    """
+    Returns the volume and issue numbers of the articles stored for a journal.
+
+    Args:
+        journal_website (str): The publisher, e.g. 'Wiley'.
+        journal_name (str): The name of the journal, as in its records.
+
+    Returns:
+        set: (volume, issue) as ints, with issue None for articles whose Volume_Issue gives no issue number, e.g.
+            Springer's 'Volume 12, Issue X'. Articles without a volume number are left out.
+    """
+
+    issues = set()
+    for part_file in _part_files(_partition_dir(journal_website, journal_name)):
+        for volume_issue in pd.read_parquet(part_file, columns=['Volume_Issue'])['Volume_Issue'].dropna().unique():
+            numbers = [int(number) for number in re.findall(r'\d+', volume_issue)]
+            if numbers:
+                issues.add((numbers[0], numbers[1] if len(numbers) > 1 else None))
+    return issues
+
+
+# =============================================================================
+# Main
+# =============================================================================
+def main():
+    compacted = compact_store()
+    print(f"Compacted {compacted} partitions")
+    export_csv(os.path.join(DATA_PATH, 'all_df.csv'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+Browser Factory
+
+This module builds the Firefox drivers the browser pool lends to the scrapers. The scrapers only need the DOM of a
+page, so the default 'lean' profile runs Firefox headless with images, stylesheets, web fonts, media and known
+trackers blocked, extensions and background services disabled, the eager page load strategy (the readiness waits in
+pageReadiness.py take over once the DOM is parsed) and caps on the memory caches, session history and number of
+content processes. That makes every page load cheaper and lets more browsers share one machine. The 'visible' profile
+launches a stock, visible Firefox, for watching a scraper or debugging a selector.
+
+Functions:
+    build_firefox_options(profile): Builds the Firefox options of a profile.
+    configure_browser(profile, **overrides): Sets the profile used for every browser launched afterwards.
+    create_firefox(profile): Launches a new Firefox driver with a profile.
+
+Usage:
+    configure_browser('lean', headless=False)
+    browser = create_firefox()
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import threading
+from selenium import webdriver
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+from config import GECKO_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+BROWSER_PROFILES = {
+    'lean': {
+        'headless': True,
+        'block_images': True,
+        'block_css': True,
+        'block_fonts': True,
+        'block_media': True,
+        'block_trackers': True,
+        'disable_extensions': True,
+        'page_load_strategy': 'eager',
+        # Memory cache of each browser, in KB
+        'memory_cache_kb': 32 * 1024,
+        'content_processes': 1,
+        'window_size': (1366, 768),
+    },
+    'visible': {
+        'headless': False,
+        'block_images': False,
+        'block_css': False,
+        'block_fonts': False,
+        'block_media': False,
+        'block_trackers': False,
+        'disable_extensions': False,
+        'page_load_strategy': 'normal',
+        'memory_cache_kb': None,
+        'content_processes': None,
+        'window_size': None,
+    },
+}
+
+# Background services a scraping session never needs
+_QUIET_PREFS = {
+    'app.update.auto': False,
+    'browser.shell.checkDefaultBrowser': False,
+    'browser.startup.homepage_override.mstone': 'ignore',
+    'datareporting.healthreport.uploadEnabled': False,
+    'datareporting.policy.dataSubmissionEnabled': False,
+    'toolkit.telemetry.enabled': False,
+    'browser.safebrowsing.malware.enabled': False,
+    'browser.safebrowsing.phishing.enabled': False,
+    'browser.newtabpage.enabled': False,
+    'extensions.pocket.enabled': False,
+    'dom.webnotifications.enabled': False,
+    'geo.enabled': False,
+}
+
+
+# =============================================================================
+# Options
+# =============================================================================
+def build_firefox_options(profile):
+    """
+    Builds the Firefox options of a profile.
+
+    Args:
+        profile (dict): Settings with the keys of BROWSER_PROFILES['lean'].
+
+    Returns:
+        Options: The options to launch Firefox with.
+    """
+
+    options = Options()
+    options.page_load_strategy = profile['page_load_strategy']
+    if profile['headless']:
+        options.add_argument('-headless')
+    if profile['window_size'] is not None:
+        options.add_argument(f"--width={profile['window_size'][0]}")
+        options.add_argument(f"--height={profile['window_size'][1]}")
+
+    prefs = {}
+    if profile['block_images']:
+        prefs['permissions.default.image'] = 2
+    if profile['block_css']:
+        prefs['permissions.default.stylesheet'] = 2
+    if profile['block_fonts']:
+        prefs['gfx.downloadable_fonts.enabled'] = False
+    if profile['block_media']:
+        prefs['media.autoplay.default'] = 5
+        prefs['media.play-stand-alone'] = False
+        prefs['media.peerconnection.enabled'] = False
+    if profile['block_trackers']:
+        prefs['privacy.trackingprotection.enabled'] = True
+        prefs['privacy.trackingprotection.socialtracking.enabled'] = True
+    if profile['disable_extensions']:
+        prefs['extensions.autoDisableScopes'] = 15
+        prefs['extensions.enabledScopes'] = 0
+        prefs['xpinstall.enabled'] = False
+        prefs.update(_QUIET_PREFS)
+    if profile['memory_cache_kb'] is not None:
+        prefs['browser.cache.memory.capacity'] = profile['memory_cache_kb']
+        prefs['browser.cache.disk.enable'] = False
+        prefs['browser.sessionhistory.max_entries'] = 2
+        prefs['browser.sessionhistory.max_total_viewers'] = 0
+    if profile['content_processes'] is not None:
+        prefs['dom.ipc.processCount'] = profile['content_processes']
+        prefs['fission.autostart'] = False
+
+    for name, value in prefs.items():
+        options.set_preference(name, value)
+    return options
+
+
+# =============================================================================
+# Factory
+# =============================================================================
+_config = {'profile': dict(BROWSER_PROFILES['lean'])}
+_config_lock = threading.Lock()
+
+
+def configure_browser(profile='lean', **overrides):
+    """
+    Sets the profile used for every browser launched afterwards. Browsers already open keep their settings until the
+    browser pool recycles them.
+
+    Args:
+        profile (str): Key of BROWSER_PROFILES.
+        **overrides: Settings replacing the profile's, e.g. headless=False.
+    """
+
+    unknown = set(overrides) - set(BROWSER_PROFILES[profile])
+    if unknown:
+        raise ValueError(f"Unknown browser settings: {', '.join(sorted(unknown))}")
+    with _config_lock:
+        _config['profile'] = dict(BROWSER_PROFILES[profile], **overrides)
+
+
+def create_firefox(profile=None):
+    """
+    Launches a new Firefox driver using the configured GeckoDriver.
+
+    Args:
+        profile (dict): Settings with the keys of BROWSER_PROFILES['lean']. Defaults to the configured profile.
+
+    Returns:
+        webdriver.Firefox: A freshly started browser.
+    """
+
+    if profile is None:
+        with _config_lock:
+            profile = dict(_config['profile'])
+    return webdriver.Firefox(service=Service(GECKO_PATH), options=build_firefox_options(profile))
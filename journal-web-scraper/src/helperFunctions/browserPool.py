@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+"""
+Browser Pool
+
+This module keeps a bounded pool of Selenium Firefox drivers that the web_scraper_* modules borrow from instead of
+launching and closing a new browser for every page. Browsers are health checked before they are lent out, recycled
+after serving a fixed number of pages and quit when the interpreter exits, so a crashed run does not leave
+geckodriver processes behind.
+
+Functions:
+    launch_firefox(): Launches a new Firefox driver with the configured browser profile (see browserFactory.py).
+    get_browser_pool(): Returns the shared browser pool, creating it on first use.
+    configure_browser_pool(max_size, max_pages_per_browser): Replaces the shared pool with one using new limits.
+    borrow_browser(): Context manager lending a browser from the shared pool.
+    pin_browser(): Context manager keeping one pooled browser for every page the current thread loads in the block.
+    shutdown_browser_pool(): Quits every browser held by the shared pool.
+
+Usage:
+    1. Borrow a browser for one page:
+        with borrow_browser() as browser:
+            browser.get(url)
+
+    2. Load every issue page of a journal in one browser session:
+        with pin_browser():
+            for issue_url in issue_urls:
+                get_papers_link_wiley(issue_url, [], wait_time)
+
+    3. Print the pool statistics at the end of a run:
+        print(get_browser_pool().format_stats())
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import atexit
+import threading
+from contextlib import contextmanager
+from src.helperFunctions.browserFactory import create_firefox
+from src.helperFunctions.metrics import increment, timer
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+def launch_firefox():
+    """
+    Launches a new Firefox driver with the configured browser profile.
+
+    Returns:
+        webdriver.Firefox: A freshly started browser.
+    """
+
+    return create_firefox()
+
+
+class _PoolEntry:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+
+
+class BrowserPool:
+    """
+    A bounded, thread-safe pool of Selenium browsers.
+
+    Args:
+        max_size (int): Maximum number of browsers open at the same time.
+        max_pages_per_browser (int): Number of pages a browser serves before it is quit and replaced.
+        launch_browser (callable): Function returning a new browser.
+    """
+
+    def __init__(self, max_size=1, max_pages_per_browser=50, launch_browser=launch_firefox):
+        self.max_size = max_size
+        self.max_pages_per_browser = max_pages_per_browser
+        self._launch_browser = launch_browser
+        self._condition = threading.Condition()
+        self._idle = []
+        self._num_open = 0
+        self._closed = False
+        self.reset_stats()
+
+    def ensure_capacity(self, max_size):
+        """
+        Raises the size limit so that at least max_size browsers can be open at the same time.
+
+        Args:
+            max_size (int): The minimum number of browsers the pool must allow.
+        """
+
+        with self._condition:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self._condition.notify_all()
+
+    def reset_stats(self):
+        """
+        Resets the per-run statistics.
+        """
+
+        with self._condition:
+            self.stats = {'launches': 0, 'pages_served': 0, 'recycled': 0, 'discarded_unhealthy': 0}
+
+    def acquire(self):
+        """
+        Lends a healthy browser, launching one if the pool is below its size limit or waiting for a free one otherwise.
+
+        Returns:
+            _PoolEntry: The borrowed browser entry. Must be handed back with release().
+        """
+
+        while True:
+            entry = None
+            with self._condition:
+                while not self._idle and self._num_open >= self.max_size and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    raise RuntimeError("The browser pool has been shut down")
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    self._num_open += 1
+
+            if entry is None:
+                try:
+                    with timer('scrape_stage_seconds', stage='browser_launch'):
+                        browser = self._launch_browser()
+                except Exception:
+                    with self._condition:
+                        self._num_open -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self.stats['launches'] += 1
+                increment('scrape_browser_launches_total')
+                return _PoolEntry(browser)
+
+            if _is_healthy(entry.browser):
+                return entry
+
+            with self._condition:
+                self.stats['discarded_unhealthy'] += 1
+            self._discard(entry)
+
+    def release(self, entry, healthy=True, pages=1):
+        """
+        Hands a borrowed browser back, quitting it if it is unhealthy or has served its page quota.
+
+        Args:
+            entry (_PoolEntry): The entry returned by acquire().
+            healthy (bool): False if the borrower saw the browser crash.
+            pages (int): Number of pages the browser served while borrowed.
+        """
+
+        entry.pages_served += pages
+        with self._condition:
+            self.stats['pages_served'] += pages
+            if not healthy:
+                self.stats['discarded_unhealthy'] += 1
+            elif entry.pages_served >= self.max_pages_per_browser:
+                self.stats['recycled'] += 1
+            elif not self._closed:
+                self._idle.append(entry)
+                self._condition.notify()
+                return
+
+        self._discard(entry)
+
+    def shutdown(self):
+        """
+        Quits every idle browser and refuses further borrowing. Browsers still on loan are quit when released.
+        """
+
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for entry in idle:
+            self._discard(entry)
+
+    def format_stats(self):
+        """
+        Formats the launches saved versus pages served for the current run.
+
+        Returns:
+            str: A one line summary of the pool statistics.
+        """
+
+        with self._condition:
+            stats = dict(self.stats)
+        launches_saved = max(0, stats['pages_served'] - stats['launches'])
+        return (f"Browser pool: {stats['launches']} launches for {stats['pages_served']} pages served "
+                f"({launches_saved} launches saved, {stats['recycled']} recycled, "
+                f"{stats['discarded_unhealthy']} discarded as unhealthy)")
+
+    def _discard(self, entry):
+        try:
+            entry.browser.quit()
+        except Exception:
+            pass
+        with self._condition:
+            self._num_open -= 1
+            self._condition.notify()
+
+
+def _is_healthy(browser):
+    """
+    Checks that a browser session is still alive and has an open window.
+
+    Args:
+        browser (webdriver.Firefox): The browser to check.
+
+    Returns:
+        bool: True if the browser answers and has at least one window.
+    """
+
+    try:
+        return len(browser.window_handles) > 0
+    except Exception:
+        return False
+
+
+# =============================================================================
+# Shared Pool
+# =============================================================================
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+# Browser pinned to the current thread by pin_browser, once a page has needed one
+_pinned = threading.local()
+
+
+def get_browser_pool():
+    """
+    Returns the shared browser pool, creating it on first use.
+
+    Returns:
+        BrowserPool: The pool used by every web_scraper_* module.
+    """
+
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+        return _shared_pool
+
+
+def configure_browser_pool(max_size=1, max_pages_per_browser=50):
+    """
+    Replaces the shared pool with one using new limits, shutting the previous pool down.
+
+    Args:
+        max_size (int): Maximum number of browsers open at the same time.
+        max_pages_per_browser (int): Number of pages a browser serves before it is replaced.
+
+    Returns:
+        BrowserPool: The new shared pool.
+    """
+
+    global _shared_pool
+    with _shared_pool_lock:
+        previous, _shared_pool = _shared_pool, BrowserPool(max_size, max_pages_per_browser)
+    if previous is not None:
+        previous.shutdown()
+    return _shared_pool
+
+
+@contextmanager
+def borrow_browser():
+    """
+    Lends a browser from the shared pool for the duration of a with block.
+
+    If the block raises, the browser is health checked and discarded when it no longer responds, so one crashed
+    session does not poison later pages.
+
+    Yields:
+        webdriver.Firefox: The borrowed browser.
+    """
+
+    pin = getattr(_pinned, 'pin', None)
+    if pin is not None:
+        with _borrow_pinned(pin) as browser:
+            yield browser
+        return
+
+    pool = get_browser_pool()
+    entry = pool.acquire()
+    healthy = True
+    try:
+        yield entry.browser
+    except BaseException:
+        healthy = _is_healthy(entry.browser)
+        raise
+    finally:
+        pool.release(entry, healthy)
+
+
+class _Pin:
+    def __init__(self, pool):
+        self.pool = pool
+        self.entry = None
+        self.pages = 0
+
+    def release(self, healthy=True):
+        if self.entry is not None:
+            self.pool.release(self.entry, healthy, max(1, self.pages))
+            self.entry = None
+            self.pages = 0
+
+
+@contextmanager
+def _borrow_pinned(pin):
+    if pin.entry is None:
+        pin.entry = pin.pool.acquire()
+    pin.pages += 1
+    try:
+        yield pin.entry.browser
+    except BaseException:
+        # A crashed session is handed back now, so the next page of the block gets a fresh browser
+        if not _is_healthy(pin.entry.browser):
+            pin.release(healthy=False)
+        raise
+
+
+@contextmanager
+def pin_browser():
+    """
+    Keeps one pooled browser for every borrow_browser call the current thread makes inside the block, so consecutive
+    pages (e.g. the issue pages of one journal) reuse one session, with its cookies, instead of going back to the pool
+    for each page. The browser is only borrowed once a page needs one, so a block whose pages are all served over HTTP
+    never takes a browser from the pool. Nested blocks share the outer block's browser.
+    """
+
+    if getattr(_pinned, 'pin', None) is not None:
+        yield
+        return
+
+    pin = _Pin(get_browser_pool())
+    _pinned.pin = pin
+    try:
+        yield
+    finally:
+        _pinned.pin = None
+        pin.release()
+
+
+def shutdown_browser_pool():
+    """
+    Quits every browser held by the shared pool.
+    """
+
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_browser_pool)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+Failure Ledger
+
+This module records every issue page and article that could not be scraped, so failures are no longer dropped with the
+run that hit them. Within a run, each page is first retried a bounded number of times with a jittered exponential
+backoff (call_with_retries). A page that still fails is written to a SQLite ledger under DATA_PATH with the stage it
+failed in, the exception class and message, and how many runs it has failed in. A later run with retry_failures=True
+scrapes just the ledger's entries of a journal, and every page that succeeds is removed from the ledger. Pages that
+have failed in max_runs runs are given up and only reported.
+
+Stages:
+    'issue': collecting the paper links of an issue page
+    'fetch': loading an article's page
+    'parse': extracting an article's fields from its page
+
+Classes:
+    FailureLedger(publisher, journal_name): The failed issue pages and articles of one journal.
+
+Functions:
+    configure_retries(max_attempts, backoff_base, backoff_max, max_runs): Sets the retry limits and backoff.
+    call_with_retries(func, *args, no_retry): Calls a function, retrying it with backoff when it raises.
+    get_failure_summary(): Returns the number of open failures per journal and stage.
+
+Usage:
+    failure_ledger = FailureLedger('wiley', name)
+    html_list = discover_links(get_papers_link_wiley, url, wait_time, job_journal, failure_ledger)
+    abstract_list = get_abstracts(WILEY_ARTICLE_PARSER, html_list, wait_time, name, num_workers, job_journal,
+                                  failure_ledger)
+    failure_ledger.close()
+
+    python -m src.helperFunctions.failureLedger    (prints the open failures per journal)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import os.path
+import random
+import sqlite3
+import threading
+import time
+from src.helperFunctions.metrics import increment
+from src.helperFunctions.rateLimit import BlockedPage
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+LEDGER_PATH = os.path.join(DATA_PATH, 'failures.sqlite')
+
+ISSUE_STAGES = ('issue',)
+ARTICLE_STAGES = ('fetch', 'parse')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS failures (
+    publisher TEXT NOT NULL,
+    journal_name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    error_type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    first_failed REAL NOT NULL,
+    last_failed REAL NOT NULL,
+    PRIMARY KEY (publisher, journal_name, url)
+);
+"""
+
+_config = {
+    # Attempts at a page within one run, the first included
+    'max_attempts': 3,
+    # Pause before the first retry, doubled for every further retry, in seconds
+    'backoff_base': 2.0,
+    'backoff_max': 60.0,
+    # Runs a page may fail in before the ledger gives up on it
+    'max_runs': 5,
+}
+
+
+# =============================================================================
+# Retries
+# =============================================================================
+def configure_retries(max_attempts=3, backoff_base=2.0, backoff_max=60.0, max_runs=5):
+    """
+    Sets the retry limits and backoff.
+
+    Args:
+        max_attempts (int): Attempts at a page within one run, the first included.
+        backoff_base (float): Pause before the first retry, doubled for every further retry, in seconds.
+        backoff_max (float): Longest pause between two attempts, in seconds.
+        max_runs (int): Runs a page may fail in before retry runs skip it.
+    """
+
+    if max_attempts < 1:
+        raise ValueError(f"max_attempts must be at least 1, not {max_attempts}")
+    _config.update(max_attempts=max_attempts, backoff_base=backoff_base, backoff_max=backoff_max, max_runs=max_runs)
+
+
+def call_with_retries(func, *args, no_retry=()):
+    """
+    Calls a function, retrying it after a jittered exponential backoff when it raises, up to max_attempts times.
+    BlockedPage is raised straight away, since fetch_page has already fetched the page again after the host's backoff.
+
+    Args:
+        func (callable): The function to call.
+        *args: Arguments passed to the function.
+        no_retry (tuple): Further exception classes raised straight away, for failures a retry cannot fix.
+
+    Returns:
+        The function's result.
+
+    Raises:
+        Exception: The exception of the last attempt.
+    """
+
+    for attempt in range(1, _config['max_attempts'] + 1):
+        try:
+            return func(*args)
+        except (BlockedPage,) + tuple(no_retry):
+            raise
+        except Exception:
+            if attempt == _config['max_attempts']:
+                raise
+            increment('scrape_retries_total', operation=func.__name__)
+            backoff = min(_config['backoff_base'] * 2 ** (attempt - 1), _config['backoff_max'])
+            time.sleep(backoff / 2 + random.uniform(0, backoff / 2))
+
+
+# =============================================================================
+# Failure Ledger
+# =============================================================================
+class FailureLedger:
+    """
+    The failed issue pages and articles of one journal.
+
+    Args:
+        publisher (str): The publisher, e.g. 'wiley'.
+        journal_name (str): The journal's name as passed to the runner.
+        path (str): Location of the SQLite database. Defaults to LEDGER_PATH.
+    """
+
+    def __init__(self, publisher, journal_name, path=LEDGER_PATH):
+        self.publisher = publisher
+        self.journal_name = journal_name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def record(self, url, stage, error_type, message):
+        """
+        Records that a page failed in this run, after its retries. A page that failed in an earlier run has its
+        stage and error updated and its run count raised.
+
+        Args:
+            url (str): URL of the issue page or article.
+            stage (str): 'issue', 'fetch' or 'parse'.
+            error_type (str): Class name of the exception.
+            message (str): The exception's message.
+        """
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO failures (publisher, journal_name, url, stage, error_type, message, attempts, "
+                "first_failed, last_failed) VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT (publisher, journal_name, url) DO UPDATE SET stage = excluded.stage, "
+                "error_type = excluded.error_type, message = excluded.message, attempts = attempts + 1, "
+                "last_failed = excluded.last_failed",
+                (self.publisher, self.journal_name, url, stage, error_type, message, now, now)
+            )
+
+    def record_exception(self, url, stage, error):
+        self.record(url, stage, type(error).__name__, str(error))
+
+    def resolve(self, urls):
+        """
+        Removes pages that have now been scraped.
+
+        Args:
+            urls (iterable): URLs of the issue pages or articles.
+        """
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM failures WHERE publisher = ? AND journal_name = ? AND url = ?",
+                [(self.publisher, self.journal_name, url) for url in urls]
+            )
+
+    def get_urls(self, stages):
+        """
+        Returns the URLs that failed in one of some stages and have not yet failed in max_runs runs.
+
+        Args:
+            stages (tuple): Stages to include, e.g. ARTICLE_STAGES.
+
+        Returns:
+            list: URLs, oldest failure first.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT url FROM failures WHERE publisher = ? AND journal_name = ? AND attempts < ? "
+                f"AND stage IN ({', '.join('?' * len(stages))}) ORDER BY first_failed",
+                [self.publisher, self.journal_name, _config['max_runs']] + list(stages)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_failures(self):
+        """
+        Returns every failure of the journal.
+
+        Returns:
+            list: One dict per page with url, stage, error_type, message and attempts.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT url, stage, error_type, message, attempts FROM failures "
+                "WHERE publisher = ? AND journal_name = ? ORDER BY first_failed",
+                (self.publisher, self.journal_name)
+            ).fetchall()
+        return [dict(zip(('url', 'stage', 'error_type', 'message', 'attempts'), row)) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM failures WHERE publisher = ? AND journal_name = ?",
+                                            (self.publisher, self.journal_name)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def get_failure_summary(path=LEDGER_PATH):
+    """
+    Returns the number of open failures per journal and stage.
+
+    Returns:
+        list: (publisher, journal_name, stage, failures, given_up) tuples, with given_up the failures retry runs
+            skip because they have failed in max_runs runs.
+    """
+
+    if not os.path.exists(path):
+        return []
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        return connection.execute(
+            "SELECT publisher, journal_name, stage, COUNT(*), SUM(attempts >= ?) FROM failures "
+            "GROUP BY publisher, journal_name, stage ORDER BY publisher, journal_name, stage", (_config['max_runs'],)
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def main():
+    summary = get_failure_summary()
+    if not summary:
+        print("No failures recorded")
+    for publisher, journal_name, stage, failures, given_up in summary:
+        print(f"{publisher} {journal_name} {stage}: {failures} failures ({given_up} given up)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fetch Backend
+
+This module lets the web_scraper_* modules fetch pages without a browser when the publisher renders them on the
+server. Pages listed in STATIC_PAGES are requested with a pooled keep-alive HTTP client and parsed with a fast HTML
+parser; when the response is missing any of the page's required selectors (see pageReadiness.READINESS_SPECS), the
+page is loaded again in a pooled Selenium browser. Either way the caller gets the same PageSnapshot, so the field
+extraction code does not depend on which backend served the page. Depending on the page cache mode (see pageCache.py),
+pages are also served from and stored in the on-disk page cache. The outcome of every request is reported to the
+host's rate controller (see rateLimit.py), a refused response (HTTP 403 or 503) counting as a failure, and a page
+answered with a CAPTCHA, challenge or HTTP 429 is fetched again, up to BLOCK_RETRIES times, once the host's backoff
+pause is over. This is the only retry of block pages: failureLedger.call_with_retries does not retry BlockedPage again.
+
+Functions:
+    fetch_page(url, publisher, page_type, wait_time): Fetches a page over HTTP or, if needed, with Selenium.
+    fetch_page_with_selenium(url, publisher, page_type, wait_time): Fetches a page with a pooled browser.
+    run_page_script(url, publisher, page_type, script, args, wait_time): Loads a page with a pooled browser and returns
+        the result of a script run on it.
+    get_fetch_stats(): Returns how many pages each backend served.
+    format_fetch_stats(): Formats the backend statistics as a printable line.
+
+Usage:
+    page = fetch_page(url, 'springer', 'article', wait_time)
+    title = page.text('h1.c-article-title')
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import functools
+import threading
+from urllib.parse import urljoin
+import requests
+import soupsieve
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from src.helperFunctions.browserPool import borrow_browser
+from src.helperFunctions.pageReadiness import READINESS_SPECS, load_page
+from src.helperFunctions.hostOverride import restore_url, rewrite_url
+from src.helperFunctions.metrics import increment, observe, timer
+from src.helperFunctions.rateLimit import BlockedPage, is_block_page, report_failure, report_success, throttle
+from src.helperFunctions.pageCache import PageNotCached, get_page_cache_mode, get_cached_page, store_page
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# (publisher, page_type) pairs whose required content is present in the server-rendered HTML
+STATIC_PAGES = {
+    ('uchicago', 'latest_volume'),
+    ('uchicago', 'issue_archive'),
+    ('uchicago', 'issue'),
+    ('oxford', 'issue_archive'),
+    ('oxford', 'issue'),
+    ('springer', 'latest_volume'),
+    ('springer', 'issue_archive'),
+    ('springer', 'issue'),
+    ('springer', 'article'),
+}
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+HTTP_POOL_SIZE = 16
+
+# Statuses a block page may be served with; other complete responses are never checked for one
+BLOCK_CHECK_STATUS_CODES = {403, 429, 503}
+
+# Times a page answered with a block page is fetched again before BlockedPage is raised to the caller
+BLOCK_RETRIES = 2
+
+
+# =============================================================================
+# Page Snapshot
+# =============================================================================
+class ElementNotFound(LookupError):
+    pass
+
+
+class PageSnapshot:
+    """
+    A parsed copy of a page, independent of the backend that fetched it. The HTML is only parsed the first time the
+    page is queried, so a page that is handed to another stage or process is not parsed twice.
+
+    Args:
+        url (str): Final URL of the page, used to resolve relative links.
+        html (str): The page's HTML.
+        source (str): 'http', 'selenium', 'cache' or 'snapshot'.
+    """
+
+    def __init__(self, url, html, source):
+        self.url = url
+        self.html = html
+        self.source = source
+        self._soup = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, HTML_PARSER)
+        return self._soup
+
+    def select(self, selector):
+        return _compile(selector).select(self.soup)
+
+    def select_one(self, selector):
+        return _compile(selector).select_one(self.soup)
+
+    def has_all(self, selectors):
+        return all(self.select_one(selector) is not None for selector in selectors)
+
+    def _first(self, selector):
+        element = self.select_one(selector)
+        if element is None:
+            raise ElementNotFound(f"No element matches '{selector}' on {self.url}")
+        return element
+
+    def text(self, selector):
+        """
+        Returns the whitespace-normalised text of the first element matching a selector.
+
+        Raises:
+            ElementNotFound: If no element matches.
+        """
+
+        element = self._first(selector)
+        return _clean_text(element)
+
+    def block_text(self, selector):
+        """
+        Returns the text of the first element matching a selector with one line per text block, like the text of a
+        Selenium element.
+
+        Raises:
+            ElementNotFound: If no element matches.
+        """
+
+        element = self._first(selector)
+        lines = (" ".join(line.split()) for line in element.get_text('\n').split('\n'))
+        return "\n".join(line for line in lines if line)
+
+    def outer_html(self, selector):
+        """
+        Returns the HTML of the first element matching a selector, including the element's own tag.
+
+        Raises:
+            ElementNotFound: If no element matches.
+        """
+
+        return str(self._first(selector))
+
+    def texts(self, selector):
+        return [_clean_text(element) for element in self.select(selector)]
+
+    def links(self, selector):
+        return [urljoin(self.url, element.get('href')) for element in self.select(selector) if element.get('href')]
+
+
+# CSS selectors are compiled once per process and reused for every page
+_compile = functools.lru_cache(maxsize=None)(soupsieve.compile)
+
+
+def _clean_text(element):
+    return " ".join(element.get_text().split())
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+_session = None
+_session_lock = threading.Lock()
+_stats = {'http': 0, 'selenium': 0, 'selenium_fallbacks': 0, 'cache': 0}
+_stats_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HTTP_HEADERS)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def fetch_page(url, publisher, page_type, wait_time=None):
+    """
+    Fetches a page over HTTP when it is server-rendered, falling back to Selenium when required selectors are missing.
+    In the 'read_write' and 'replay' page cache modes a stored copy of the page is returned instead, and in the
+    'record' and 'read_write' modes every fetched page is stored.
+
+    Args:
+        url (str): URL of the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        page_type (str): Kind of page, e.g. 'issue' or 'article'.
+        wait_time (int): Longest time to wait for the page. Defaults to the readiness spec's timeout.
+
+    Returns:
+        PageSnapshot: The parsed page.
+
+    Raises:
+        PageNotCached: In 'replay' mode, if the page is not in the page cache.
+        BlockedPage: If the host still answers with a block page after BLOCK_RETRIES retries.
+    """
+
+    cache_mode = get_page_cache_mode()
+    if cache_mode in ('read_write', 'replay'):
+        cached = get_cached_page(url)
+        if cached is not None:
+            _count('cache')
+            increment('scrape_pages_total', publisher=publisher, page_type=page_type, backend='cache')
+            return PageSnapshot(cached[0], cached[1], 'cache')
+        if cache_mode == 'replay':
+            raise PageNotCached(f"{url} is not in the page cache")
+
+    page, complete = _retry_blocked(_fetch_page, url, publisher, page_type, wait_time)
+    # Incomplete pages are not stored, so a later read does not reuse a page that failed to render
+    if complete and cache_mode in ('record', 'read_write'):
+        store_page(url, page.url, page.html)
+    return page
+
+
+def _fetch_page(url, publisher, page_type, wait_time):
+    if (publisher, page_type) in STATIC_PAGES:
+        timeout = wait_time or READINESS_SPECS[publisher]['timeout']
+        try:
+            throttle(url)
+            response = _get_session().get(rewrite_url(url), timeout=timeout)
+            page = PageSnapshot(restore_url(response.url), response.text, 'http')
+            ready = page.has_all(READINESS_SPECS[publisher][page_type])
+            # As in load_page, only a refused or incomplete response is checked, so a challenge script or CAPTCHA
+            # widget embedded in a complete page does not count as a block page
+            if ((response.status_code in BLOCK_CHECK_STATUS_CODES or not ready)
+                    and is_block_page(response.text, response.status_code)):
+                report_failure(url, blocked=True, retry_after=_retry_after(response))
+                raise BlockedPage(f"{url} answered with a block page (HTTP {response.status_code})")
+            if response.status_code in BLOCK_CHECK_STATUS_CODES:
+                # A refusal without a block page still means the host wants fewer requests
+                report_failure(url, retry_after=_retry_after(response))
+            else:
+                report_success(url, response.elapsed.total_seconds())
+            observe('scrape_stage_seconds', response.elapsed.total_seconds(), stage='navigation', publisher=publisher,
+                    page_type=page_type)
+            # A missing page will not appear in a browser either
+            if response.status_code == 404 or ready:
+                _count('http')
+                increment('scrape_pages_total', publisher=publisher, page_type=page_type, backend='http')
+                return page, response.status_code == 200
+        except requests.RequestException:
+            report_failure(url)
+        _count('selenium_fallbacks')
+
+    return _load_with_selenium(url, publisher, page_type, wait_time)
+
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After')
+    # Only the delay-seconds form; an HTTP date falls back to the exponential backoff
+    return float(value) if value and value.strip().isdigit() else None
+
+
+def _retry_blocked(fetch, *args):
+    # throttle() inside every attempt waits out the backoff pause the block page started
+    for attempt in range(BLOCK_RETRIES + 1):
+        try:
+            return fetch(*args)
+        except BlockedPage:
+            if attempt == BLOCK_RETRIES:
+                raise
+
+
+def _load_with_selenium(url, publisher, page_type, wait_time):
+    with borrow_browser() as browser:
+        ready = load_page(browser, url, publisher, page_type, wait_time)
+        page = PageSnapshot(restore_url(browser.current_url), browser.page_source, 'selenium')
+    _count('selenium')
+    increment('scrape_pages_total', publisher=publisher, page_type=page_type, backend='selenium')
+    return page, ready
+
+
+def fetch_page_with_selenium(url, publisher, page_type, wait_time=None):
+    """
+    Fetches a page with a pooled browser, waiting until it is ready.
+
+    Args:
+        url (str): URL of the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        page_type (str): Kind of page, e.g. 'issue' or 'article'.
+        wait_time (int): Longest time to wait for the page. Defaults to the readiness spec's timeout.
+
+    Returns:
+        PageSnapshot: The parsed page.
+    """
+
+    return _load_with_selenium(url, publisher, page_type, wait_time)[0]
+
+
+def run_page_script(url, publisher, page_type, script, args=(), wait_time=None):
+    """
+    Loads a page with a pooled browser, waits until it is ready and runs a script on it, so only the script's result
+    is sent back from the browser instead of the whole page source.
+
+    Args:
+        url (str): URL of the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        page_type (str): Kind of page, e.g. 'issue' or 'article'.
+        script (str): JavaScript run with execute_script.
+        args (tuple): Arguments passed to the script.
+        wait_time (int): Longest time to wait for the page. Defaults to the readiness spec's timeout.
+
+    Returns:
+        tuple: (final_url, result), with result the value returned by the script.
+
+    Raises:
+        BlockedPage: If the host still answers with a block page after BLOCK_RETRIES retries.
+    """
+
+    return _retry_blocked(_run_page_script, url, publisher, page_type, script, args, wait_time)
+
+
+def _run_page_script(url, publisher, page_type, script, args, wait_time):
+    with borrow_browser() as browser:
+        load_page(browser, url, publisher, page_type, wait_time)
+        with timer('scrape_stage_seconds', stage='extraction', publisher=publisher, page_type=page_type):
+            result = browser.execute_script(script, *args)
+        final_url = restore_url(browser.current_url)
+    _count('selenium')
+    increment('scrape_pages_total', publisher=publisher, page_type=page_type, backend='selenium')
+    return final_url, result
+
+
+# =============================================================================
+# Statistics
+# =============================================================================
+def get_fetch_stats():
+    """
+    Returns how many pages each backend served.
+
+    Returns:
+        dict: Pages served over HTTP, by Selenium, how many of those were fallbacks, and pages served from the cache.
+    """
+
+    with _stats_lock:
+        return dict(_stats)
+
+
+def format_fetch_stats():
+    """
+    Formats the backend statistics as a printable line.
+
+    Returns:
+        str: A one line summary of the backend statistics.
+    """
+
+    stats = get_fetch_stats()
+    return (f"Fetch backend: {stats['http']} pages over HTTP, {stats['selenium']} pages with Selenium "
+            f"({stats['selenium_fallbacks']} fallbacks from HTTP), {stats['cache']} pages from the page cache")
@@ -1,12 +1,138 @@
-import pandas as pd
+# -*- coding: utf-8 -*-
 
-def generate_key(Volume_issue, journal_name):
-    new_entry = (Volume_issue, journal_name)
-    return pd.factorize([new_entry])[0][0] + 1
+"""
+Article Keys
 
+This module gives every article a stable key: a SHA-1 hash of its publisher, journal, volume, issue and either its DOI
+or its normalised title. The same article always gets the same key, whichever run or scraper produced it, so duplicates
+are found by comparing keys instead of comparing whole rows of long text columns. KeyIndex keeps the keys already
+saved to a file on disk, so a membership test is a set lookup and never requires re-reading the saved data.
+
+Functions:
+    generate_key(journal_website, journal_name, volume, issue, title, doi): Returns the key of an article.
+    split_volume_issue(volume_issue): Splits a 'Volume 75, Issue 3' string into its volume and issue.
+    generate_keys(df): Returns the keys of every article in a DataFrame.
+
+Classes:
+    KeyIndex(path): Append-only set of keys persisted as one key per line.
+
+Usage:
+    df.insert(2, 'Key', generate_keys(df))
+    key_index = KeyIndex(os.path.join(partition_dir, 'keys.txt'))
+    new_rows = df[~df['Key'].isin(key_index.keys)]
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import hashlib
+import os
+import re
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+def _normalise(text):
+    return " ".join(str(text).lower().split())
+
+
+def generate_key(journal_website, journal_name, volume, issue, title=None, doi=None):
+    """
+    Returns the key of an article.
+
+    Args:
+        journal_website (str): The publisher, e.g. 'Elsevier'.
+        journal_name (str): The name of the journal.
+        volume (str): The volume number.
+        issue (str): The issue number.
+        title (str): The title of the article, used when there is no DOI.
+        doi (str): The DOI of the article.
+
+    Returns:
+        str: A 40 character hexadecimal key.
+    """
+
+    identifier = 'doi:' + _normalise(doi) if doi else 'title:' + _normalise(title)
+    content = "|".join([_normalise(journal_website), _normalise(journal_name), _normalise(volume), _normalise(issue),
+                        identifier])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def split_volume_issue(volume_issue):
+    """
+    Splits a volume/issue string into its volume and issue.
+
+    Args:
+        volume_issue (str): e.g. 'Volume 75, Issue 3' or 'VOL. 61 NO. 4'.
+
+    Returns:
+        tuple: (volume, issue). If the string has no two numbers, the whole string is the volume and the issue is ''.
+    """
+
+    numbers = re.findall(r'\d+', str(volume_issue))
+    if len(numbers) >= 2:
+        return numbers[0], numbers[1]
+    return volume_issue, ''
+
+
+def generate_keys(df):
+    """
+    Returns the keys of every article in a DataFrame.
+
+    Args:
+        df (pd.DataFrame): Articles with Journal_Website, Journal_Name, Volume_Issue and Title columns, and optionally
+            a DOI column.
+
+    Returns:
+        list: The key of each row, in row order.
+    """
+
+    dois = df['DOI'] if 'DOI' in df.columns else [None] * len(df)
+    keys = []
+    for journal_website, journal_name, volume_issue, title, doi in zip(df['Journal_Website'], df['Journal_Name'],
+                                                                       df['Volume_Issue'], df['Title'], dois):
+        volume, issue = split_volume_issue(volume_issue)
+        keys.append(generate_key(journal_website, journal_name, volume, issue, title, doi))
+    return keys
+
+
+# =============================================================================
+# Key Index
+# =============================================================================
+class KeyIndex:
+    """
+    Append-only set of keys persisted as one key per line.
+
+    Args:
+        path (str): Location of the index file. It is created on the first add.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.keys.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys):
+        """
+        Adds keys to the index, appending the unseen ones to the index file.
+
+        Args:
+            keys (iterable): Keys of articles that were saved.
+        """
+
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self.keys]
+        if not new_keys:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(key + '\n' for key in new_keys)
+        self.keys.update(new_keys)
 
-# extraction_volume_issue = 'Volume 75, Issue 3'
-# extraction_journal_name = 'Example Journal Nme'
-#
-# # Generate primary key for the new entry
-# print(generate_key(extraction_volume_issue, extraction_journal_name))
\ No newline at end of file
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Harvest Index
+
+This module keeps a per-journal index of the articles that have already been scraped, in a SQLite database under
+DATA_PATH. Articles are identified by the DOI in their URL when there is one, and by the normalised URL otherwise, so
+the same paper reached through a different link form is still recognised. In incremental mode the runners compare the
+links found on the issue pages against the index and only open the article pages of unseen papers.
+
+Articles scraped before the index existed are in the article store (see articleStore.py; all_df.csv is brought into
+it with articleStore.import_csv), which records their volume and issue but not their URL. So that the first
+incremental run of such a journal does not scrape it all again, seed_from_store marks the links of every issue page
+whose volume and issue the store already holds as harvested, using the journal's cached issue listing (see
+issueArchive.py) to tell which issue a page is. Where the records give no issue number, as for Springer, every issue
+of a volume older than the newest stored one counts as stored. A journal is only seeded while its index is empty.
+
+Functions:
+    article_key(url): Returns the identifier of an article URL in the index.
+    seed_from_store(harvest_index, issue_links, publisher, journal_name, journal_website, record_name): Marks the
+        links of issues already in the article store as harvested, once per journal.
+
+Classes:
+    HarvestIndex(journal_id): The set of articles already harvested for one journal.
+
+Usage:
+    harvest_index = HarvestIndex(f'elsevier_{name}')
+    html_list = harvest_index.filter_new(html_list)
+    ...
+    harvest_index.add(scraped_urls)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import os.path
+import re
+import sqlite3
+import threading
+from urllib.parse import unquote, urlparse
+from config import DATA_PATH
+from src.helperFunctions.articleStore import get_stored_issues
+from src.helperFunctions.issueArchive import get_issue_numbers
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+INDEX_PATH = os.path.join(DATA_PATH, 'harvested_articles.sqlite')
+
+_DOI_PATTERN = re.compile(r'(10\.\d{4,9}/[^?&#\s]+)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS harvested (
+    journal_id TEXT NOT NULL,
+    article_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (journal_id, article_key)
+);
+"""
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+def article_key(url):
+    """
+    Returns the identifier of an article URL in the index.
+
+    Args:
+        url (str): URL of the article.
+
+    Returns:
+        str: 'doi:' followed by the lower-cased DOI if the path or query contains one (AEA links carry it as
+            articles?id=10.1257/...), else the URL without scheme, fragment or trailing slash. The query is kept, since
+            it may be all that tells two articles apart.
+    """
+
+    parsed = urlparse(url)
+    path = unquote(parsed.path)
+    query = unquote(parsed.query)
+    doi = _DOI_PATTERN.search(path) or _DOI_PATTERN.search(query)
+    if doi:
+        return 'doi:' + doi.group(1).rstrip('/').lower()
+    return parsed.netloc.lower() + path.rstrip('/') + ('?' + query if query else '')
+
+
+def seed_from_store(harvest_index, issue_links, publisher, journal_name, journal_website, record_name=None):
+    """
+    Marks the paper links of the issue pages whose volume and issue the article store already holds as harvested, if
+    the journal's index is still empty.
+
+    Args:
+        harvest_index (HarvestIndex): The journal's index.
+        issue_links (dict): Maps issue URL to its paper URLs, see JobJournal.get_issue_links.
+        publisher (str): The publisher, as in the issue archive, e.g. 'wiley'.
+        journal_name (str): The name of the journal, as in the issue archive.
+        journal_website (str): The publisher, as in the records, e.g. 'Wiley'.
+        record_name (str): The name of the journal in the records. Defaults to journal_name.
+
+    Returns:
+        int: Number of links added to the index.
+    """
+
+    if len(harvest_index):
+        return 0
+    stored = get_stored_issues(journal_website, record_name or journal_name)
+    if not stored:
+        return 0
+
+    # Volumes stored without issue numbers are only complete once a newer volume has been stored
+    newest_volume = max(volume for volume, _ in stored)
+    complete_volumes = {volume for volume, issue in stored if issue is None and volume < newest_volume}
+
+    issue_numbers = get_issue_numbers(publisher, journal_name)
+    urls = []
+    for issue_url, links in issue_links.items():
+        numbers = issue_numbers.get(issue_url)
+        if numbers is not None and (numbers in stored or numbers[0] in complete_volumes):
+            urls.extend(links)
+    harvest_index.add(urls)
+    print(f"Seeded the harvest index of {journal_name} with {len(urls)} articles already in the article store")
+    return len(urls)
+
+
+# =============================================================================
+# Harvest Index
+# =============================================================================
+class HarvestIndex:
+    """
+    The set of articles already harvested for one journal.
+
+    Args:
+        journal_id (str): Identifies the journal, e.g. 'elsevier_energy-policy'.
+        path (str): Location of the SQLite database. Defaults to INDEX_PATH.
+    """
+
+    def __init__(self, journal_id, path=INDEX_PATH):
+        self.journal_id = journal_id
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def filter_new(self, urls):
+        """
+        Returns the URLs whose article is not in the index, keeping their order and dropping repeats.
+
+        Args:
+            urls (list): Article URLs found on the issue pages.
+
+        Returns:
+            list: The URLs of unseen articles.
+        """
+
+        with self._lock:
+            seen = {row[0] for row in self._connection.execute(
+                "SELECT article_key FROM harvested WHERE journal_id = ?", (self.journal_id,))}
+
+        new_urls = []
+        for url in urls:
+            key = article_key(url)
+            if key not in seen:
+                seen.add(key)
+                new_urls.append(url)
+        return new_urls
+
+    def add(self, urls):
+        """
+        Adds scraped articles to the index.
+
+        Args:
+            urls (iterable): URLs of the articles whose pages were scraped.
+        """
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO harvested (journal_id, article_key, url) VALUES (?, ?, ?)",
+                [(self.journal_id, article_key(url), url) for url in urls]
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM harvested WHERE journal_id = ?",
+                                            (self.journal_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
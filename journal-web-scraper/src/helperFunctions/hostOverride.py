@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Host Override
+
+This module redirects the requests for a publisher host to another server without changing the scrapers, e.g. to a
+local fixture server in the offline benchmark (benchmarks/offline_scrapers.py). Every page request of the fetch
+backend and of pageReadiness.load_page goes through rewrite_url, which replaces the scheme and network location of a
+URL whose host has an override and leaves the path and query untouched; restore_url maps the URL a page was served
+from back, so links found on it resolve against the publisher's host. The scrapers keep working with the publisher
+URLs, so rate limits, caches, job journals and failure ledgers are still keyed by them.
+
+Functions:
+    configure_host_overrides(overrides): Sets the hosts to redirect and where to.
+    rewrite_url(url): Returns the URL a request for url is actually sent to.
+    restore_url(url): Returns the publisher URL of a page served by an override.
+
+Usage:
+    configure_host_overrides({'link.springer.com': 'http://127.0.0.1:8001'})
+    browser.get(rewrite_url(url))
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+from urllib.parse import urlsplit, urlunsplit
+
+
+# =============================================================================
+# Overrides
+# =============================================================================
+_overrides = {}
+_restores = {}
+
+
+def configure_host_overrides(overrides):
+    """
+    Sets the hosts to redirect, replacing any earlier overrides. An empty dict turns redirection off.
+
+    Args:
+        overrides (dict): Maps a host, e.g. 'link.springer.com', to the base URL its requests are sent to instead,
+            e.g. 'http://127.0.0.1:8001'.
+    """
+
+    _overrides.clear()
+    _restores.clear()
+    for host, base_url in overrides.items():
+        parts = urlsplit(base_url)
+        _overrides[host] = (parts.scheme, parts.netloc)
+        _restores[parts.netloc] = ('https', host)
+
+
+def rewrite_url(url):
+    """
+    Returns the URL a request for url is actually sent to: url itself unless its host has an override.
+    """
+
+    return _replace_location(url, _overrides)
+
+
+def restore_url(url):
+    """
+    Returns the publisher URL of a page served by an override: url itself unless it points at an override's server.
+    """
+
+    return _replace_location(url, _restores)
+
+
+def _replace_location(url, locations):
+    if not locations:
+        return url
+    parts = urlsplit(url)
+    location = locations.get(parts.netloc)
+    if location is None:
+        return url
+    return urlunsplit((location[0], location[1], parts.path, parts.query, parts.fragment))
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+Issue Archive
+
+This module lists the issues that actually exist for a journal, so the runners stop building a URL for every issue
+number up to the journal's static issue count. A volume still in progress, or a journal that published fewer issues
+than its usual count, used to cost a page load and a full readiness wait for every issue that does not exist. Each
+publisher's scraper reads the journal's issue archive page into a volume_dict, mapping each volume, newest first, to
+its (issue, url) pairs, like get_volume_and_issue_data_aea and get_volume_and_issue_data_jstor. The listing is cached
+in issue_archives.json under DATA_PATH (see ttlCache.py) and only read again once it is older than its time-to-live.
+If that refresh fails, the last listing is used; a journal with no listing at all falls back to the static issue
+counts.
+
+Functions:
+    parse_issue_links(pages, pattern, build_url, selector): Builds a volume_dict from the issue links of archive pages.
+    get_issue_archive(publisher, journal_name, lookup, ttl, refresh): Returns a journal's volume_dict, refreshing it
+        once the cached listing has expired.
+    merge_issue_archives(volume_dict, newest): Updates a volume_dict with the volumes of a partial listing.
+    index_issue_archive(volume_dict): Maps each volume number to its issues, for constant-time lookups.
+    select_issue_urls(volume_dict, num_prev_vols): Returns the issue URLs of a journal's latest volumes.
+    get_issue_numbers(publisher, journal_name): Maps each issue URL of a journal's cached listing to its volume and
+        issue numbers.
+    invalidate_issue_archive(publisher, journal_name): Forces the next call for a journal to refresh.
+
+Usage:
+    volume_dict = get_issue_archive('springer', name, lambda: get_volume_and_issue_data_springer(int_paper, wait_time))
+    url = select_issue_urls(volume_dict, num_prev_vols)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import re
+from src.helperFunctions.ttlCache import TtlCache
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+ARCHIVE_FILE = 'issue_archives.json'
+
+# Seconds a cached listing stays valid
+DEFAULT_TTL = 3 * 24 * 60 * 60
+
+# Per-journal time-to-live overrides, keyed by 'publisher/journal_name', for journals that publish issues more often
+ISSUE_ARCHIVE_TTLS = {}
+
+
+class IncompleteArchive(LookupError):
+    """
+    Raised when a journal's listing does not reach back as many volumes as were requested.
+    """
+
+
+# =============================================================================
+# Archive Pages
+# =============================================================================
+def _number(value):
+    match = re.search(r'\d+', str(value))
+    return int(match.group()) if match else 0
+
+
+def parse_issue_links(pages, pattern, build_url=None, selector="a[href]"):
+    """
+    Builds a volume_dict from the issue links of one or more archive pages.
+
+    Args:
+        pages (list): The archive pages, as PageSnapshots.
+        pattern (str): Regular expression matched against each link's URL, with the volume as its first group and the
+            issue as its second, optional group. Links that do not match are ignored.
+        build_url (callable): Called with the volume and issue (None for volumes without issues) to give the issue
+            URL the scraper uses. Defaults to the link itself.
+        selector (str): CSS selector of the candidate links.
+
+    Returns:
+        volume_dict (dict): Maps each volume, newest first, to its (issue, url) pairs in issue order.
+    """
+
+    issues = {}
+    for page in pages:
+        for link in page.links(selector):
+            match = re.search(pattern, link)
+            if not match:
+                continue
+            volume = match.group(1)
+            issue = match.group(2) if match.lastindex and match.lastindex >= 2 else None
+            url = build_url(volume, issue) if build_url else link
+            issues.setdefault(volume, {}).setdefault(issue or '', url)
+
+    volume_dict = {}
+    for volume in sorted(issues, key=_number, reverse=True):
+        volume_dict[volume] = sorted(issues[volume].items(), key=lambda item: _number(item[0]))
+    return volume_dict
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+_cache = TtlCache(ARCHIVE_FILE, 'volumes', DEFAULT_TTL, ISSUE_ARCHIVE_TTLS)
+
+
+def get_issue_archive(publisher, journal_name, lookup, ttl=None, refresh=None):
+    """
+    Returns a journal's volume_dict, refreshing it once the cached listing has expired.
+
+    Args:
+        publisher (str): The publisher, e.g. 'springer'.
+        journal_name (str): The name of the journal.
+        lookup (callable): Reads the journal's whole issue archive and returns its volume_dict.
+        ttl (int): Seconds the cached listing stays valid. Defaults to ISSUE_ARCHIVE_TTLS or DEFAULT_TTL.
+        refresh (callable): Called with the expired volume_dict to return the updated one, e.g. by only reading the
+            newest part of the archive. Defaults to reading the whole archive again with lookup().
+
+    Returns:
+        volume_dict (dict): Maps each volume, newest first, to its [issue, url] pairs.
+
+    Raises:
+        Exception: Whatever lookup() raised, or LookupError if it found no issue, when the journal has no cached
+            listing to fall back on.
+    """
+
+    def found(volume_dict):
+        if not volume_dict:
+            raise LookupError(f"No issues found in the archive of {journal_name}")
+        return volume_dict
+
+    return _cache.get(f"{publisher}/{journal_name}", lambda: found(lookup()), ttl,
+                      refresh=(lambda volume_dict: found(refresh(volume_dict))) if refresh else None,
+                      description=f"issue archive of {journal_name}")
+
+
+def merge_issue_archives(volume_dict, newest):
+    """
+    Updates a volume_dict with the volumes of a partial listing, such as the newest part of a journal's archive.
+
+    Args:
+        volume_dict (dict): Maps each volume to its (issue, url) pairs.
+        newest (dict): The volumes read again, which replace those of volume_dict. Volumes without issues are
+            ignored, so a partially loaded page does not erase cached issues.
+
+    Returns:
+        volume_dict (dict): Every volume of both listings, newest first.
+    """
+
+    merged = dict(volume_dict)
+    merged.update((volume, issues) for volume, issues in newest.items() if issues)
+    return {volume: merged[volume] for volume in sorted(merged, key=_number, reverse=True)}
+
+
+def index_issue_archive(volume_dict):
+    """
+    Maps each volume number to its issues, so the URL of an issue is found without scanning the listing.
+
+    Args:
+        volume_dict (dict): Maps each volume, e.g. 'Vol. 24', to its (issue, url) pairs.
+
+    Returns:
+        dict: Maps each volume number (int) to a dict mapping issue (str) to URL.
+    """
+
+    return {_number(volume): {str(issue): url for issue, url in issues} for volume, issues in volume_dict.items()}
+
+
+def select_issue_urls(volume_dict, num_prev_vols):
+    """
+    Returns the issue URLs of a journal's latest volumes.
+
+    Args:
+        volume_dict (dict): Maps each volume, newest first, to its (issue, url) pairs.
+        num_prev_vols (int): The number of latest volumes to list.
+
+    Returns:
+        url (list): URLs of the issue pages, newest volume first.
+
+    Raises:
+        IncompleteArchive: If the listing holds fewer than num_prev_vols volumes and does not reach back to volume 1.
+    """
+
+    volumes = list(volume_dict)[:num_prev_vols]
+    if len(volumes) < num_prev_vols and (not volumes or _number(volumes[-1]) > 1):
+        raise IncompleteArchive(f"The issue archive lists {len(volumes)} of the {num_prev_vols} volumes requested")
+    return [url for volume in volumes for _, url in volume_dict[volume]]
+
+
+def get_issue_numbers(publisher, journal_name):
+    """
+    Maps each issue URL of a journal's cached listing to its volume and issue numbers, without reading the archive.
+
+    Args:
+        publisher (str): The publisher, e.g. 'springer'.
+        journal_name (str): The name of the journal.
+
+    Returns:
+        dict: Maps issue URL to (volume, issue) as ints. Empty if the journal has no cached listing; issues without a
+            number are left out.
+    """
+
+    volume_dict = _cache.peek(f"{publisher}/{journal_name}") or {}
+    return {url: (_number(volume), _number(issue)) for volume, issues in volume_dict.items() for issue, url in issues
+            if _number(issue)}
+
+
+def invalidate_issue_archive(publisher, journal_name):
+    """
+    Forces the next get_issue_archive call for a journal to refresh.
+
+    Args:
+        publisher (str): The publisher, e.g. 'springer'.
+        journal_name (str): The name of the journal.
+    """
+
+    _cache.invalidate(f"{publisher}/{journal_name}")
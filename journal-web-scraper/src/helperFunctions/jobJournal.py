@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""
+Job Journal
+
+This module checkpoints a journal's scrape in a SQLite database under DATA_PATH so that an interrupted run can resume
+where it stopped. The runners record every issue page once its paper links have been collected, and every extracted
+record as soon as its article has been scraped. A restarted run skips the issues and articles already in the journal
+and only scrapes the remaining work. Once the results have been saved, the runner clears the job.
+
+Classes:
+    JobJournal(job_id): Durable record of the finished issues, discovered paper links and extracted records of a job.
+
+Usage:
+    journal = JobJournal(f'wiley_{name}')
+    if not journal.issue_done(site):
+        journal.record_issue(site, get_papers_link_wiley(site, [], wait_time))
+    abstract_list = get_abstracts(WILEY_ARTICLE_PARSER, journal.get_links(), wait_time, name, num_workers, journal)
+    journal.finish()
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+import os.path
+import sqlite3
+import threading
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+JOURNAL_PATH = os.path.join(DATA_PATH, 'scrape_jobs.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (job_id, url)
+);
+CREATE TABLE IF NOT EXISTS links (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    issue_url TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+);
+CREATE TABLE IF NOT EXISTS records (
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (job_id, url)
+);
+"""
+
+
+# =============================================================================
+# Job Journal
+# =============================================================================
+class JobJournal:
+    """
+    Durable record of the finished issues, discovered paper links and extracted records of a scrape job.
+
+    Args:
+        job_id (str): Identifies the job across runs, e.g. 'wiley_The Journal of Finance'.
+        path (str): Location of the SQLite database. Defaults to JOURNAL_PATH.
+    """
+
+    def __init__(self, job_id, path=JOURNAL_PATH):
+        self.job_id = job_id
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def issue_done(self, issue_url):
+        """
+        Returns True if the paper links of an issue page were recorded by this or an earlier run.
+        """
+
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM issues WHERE job_id = ? AND url = ?",
+                                           (self.job_id, issue_url)).fetchone()
+        return row is not None
+
+    def record_issue(self, issue_url, links):
+        """
+        Records the paper links of an issue page and marks the issue as done, in one transaction.
+
+        Args:
+            issue_url (str): URL of the issue page.
+            links (list): Paper URLs found on the issue page, in page order.
+        """
+
+        with self._lock, self._connection:
+            start = self._connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM links WHERE job_id = ?",
+                                             (self.job_id,)).fetchone()[0]
+            self._connection.executemany(
+                "INSERT INTO links (job_id, position, issue_url, url) VALUES (?, ?, ?, ?)",
+                [(self.job_id, start + i, issue_url, link) for i, link in enumerate(links)]
+            )
+            self._connection.execute("INSERT OR IGNORE INTO issues (job_id, url) VALUES (?, ?)",
+                                     (self.job_id, issue_url))
+
+    def get_links(self):
+        """
+        Returns every recorded paper link, in discovery order.
+
+        Returns:
+            list: Paper URLs.
+        """
+
+        with self._lock:
+            rows = self._connection.execute("SELECT url FROM links WHERE job_id = ? ORDER BY position",
+                                            (self.job_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_issue_links(self):
+        """
+        Returns the recorded paper links of every issue page.
+
+        Returns:
+            dict: Maps issue URL to its paper URLs, in discovery order.
+        """
+
+        issue_links = {}
+        with self._lock:
+            rows = self._connection.execute("SELECT issue_url, url FROM links WHERE job_id = ? ORDER BY position",
+                                            (self.job_id,)).fetchall()
+        for issue_url, url in rows:
+            issue_links.setdefault(issue_url, []).append(url)
+        return issue_links
+
+    def get_records(self):
+        """
+        Returns the records extracted so far.
+
+        Returns:
+            dict: Maps paper URL to its extracted record.
+        """
+
+        with self._lock:
+            rows = self._connection.execute("SELECT url, record FROM records WHERE job_id = ?",
+                                            (self.job_id,)).fetchall()
+        return {url: json.loads(record) for url, record in rows}
+
+    def get_recorded_urls(self):
+        """
+        Returns the URLs of the papers whose records were extracted so far, without loading the records.
+
+        Returns:
+            set: Paper URLs.
+        """
+
+        with self._lock:
+            rows = self._connection.execute("SELECT url FROM records WHERE job_id = ?", (self.job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_records(self, batch_size=500):
+        """
+        Yields the records extracted so far, loading batch_size of them at a time.
+
+        Yields:
+            tuple: (paper URL, record).
+        """
+
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT rowid, url, record FROM records WHERE job_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (self.job_id, last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for last_rowid, url, record in rows:
+                yield url, json.loads(record)
+
+    def record_result(self, paper_url, record):
+        """
+        Stores the record extracted from a paper, committing it immediately.
+
+        Args:
+            paper_url (str): URL of the paper.
+            record (list): The record of one article, as returned by its publisher's ArticleParser.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO records (job_id, url, record) VALUES (?, ?, ?)",
+                                     (self.job_id, paper_url, json.dumps(record)))
+
+    def finish(self):
+        """
+        Deletes the job's checkpoints once its results have been saved, and closes the database.
+        """
+
+        with self._lock, self._connection:
+            for table in ('issues', 'links', 'records'):
+                self._connection.execute(f"DELETE FROM {table} WHERE job_id = ?", (self.job_id,))
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+Journal Metadata Registry
+
+This module serves the per-publisher journal metadata stored in the JSON files next to each scraper (number of issues,
+internal journal numbers, full names). Each file is located relative to the package rather than the current working
+directory, loaded the first time it is needed, validated, and then kept in memory for the rest of the process, so the
+get_num_issues_* style lookups no longer open and parse a file on every call.
+
+Functions:
+    get_journal_metadata(publisher): Returns the validated metadata of every journal of a publisher.
+    get_journal_entry(publisher, name): Returns the metadata of one journal, or None if it is not registered.
+    load_all_metadata(): Loads and validates the metadata of every publisher.
+
+Usage:
+    num_issues = get_journal_entry('springer', 'IMF Economic Review')[1]
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+import os.path
+import threading
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+METADATA_FILES = {
+    'elsevier': os.path.join('elsevier', 'elsevier_journals_with_issues.json'),
+    'oxford': os.path.join('oxford', 'oxford_name_to_num_issues.json'),
+    'springer': os.path.join('springer', 'springer_journal_name_to_int_and_num_issues.json'),
+    'uchicago': os.path.join('uchicago', 'uchicago_journal_name_to_num_issues_and_full_name.json'),
+    'wiley': os.path.join('wiley', 'wiley_journal_name_to_int_and_num_issues.json'),
+}
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _is_name(value):
+    return isinstance(value, str) and value.strip() != ''
+
+
+# Expected shape of one journal's entry in each publisher's file
+_VALIDATORS = {
+    # number of issues
+    'elsevier': _is_count,
+    # number of issues, or "NY" when the journal is not split into issues
+    'oxford': lambda entry: _is_count(entry) or entry == 'NY',
+    # [journal number, number of issues]
+    'springer': lambda entry: isinstance(entry, list) and len(entry) == 2 and _is_count(entry[0])
+                              and _is_count(entry[1]),
+    # [number of issues, full journal name]
+    'uchicago': lambda entry: isinstance(entry, list) and len(entry) == 2 and _is_count(entry[0])
+                              and _is_name(entry[1]),
+    # [journal number or ISSN, number of issues]
+    'wiley': lambda entry: isinstance(entry, list) and len(entry) == 2
+                           and (_is_count(entry[0]) or _is_name(entry[0])) and _is_count(entry[1]),
+}
+
+
+def _validate(publisher, metadata):
+    if not isinstance(metadata, dict):
+        raise ValueError(f"{METADATA_FILES[publisher]} must map journal names to entries")
+    invalid = [name for name, entry in metadata.items() if not _VALIDATORS[publisher](entry)]
+    if invalid:
+        raise ValueError(f"Invalid entries in {METADATA_FILES[publisher]}: {', '.join(invalid)}")
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_journal_metadata(publisher):
+    """
+    Returns the validated metadata of every journal of a publisher, loading its file on first use.
+
+    Args:
+        publisher (str): Key of the publisher in METADATA_FILES, e.g. 'springer'.
+
+    Returns:
+        dict: Maps journal name to its metadata entry.
+
+    Raises:
+        ValueError: If the publisher's file contains an entry of the wrong shape.
+    """
+
+    with _registry_lock:
+        if publisher not in _registry:
+            with open(os.path.join(SRC_PATH, METADATA_FILES[publisher]), 'r', encoding='utf-8') as file:
+                metadata = json.load(file)
+            _validate(publisher, metadata)
+            _registry[publisher] = metadata
+        return _registry[publisher]
+
+
+def get_journal_entry(publisher, name):
+    """
+    Returns the metadata of one journal.
+
+    Args:
+        publisher (str): Key of the publisher in METADATA_FILES, e.g. 'springer'.
+        name (str): The name of the journal as used in the publisher's file.
+
+    Returns:
+        The journal's entry, or None if the journal is not registered.
+    """
+
+    return get_journal_metadata(publisher).get(name)
+
+
+def load_all_metadata():
+    """
+    Loads and validates the metadata of every publisher, so a malformed file is reported before any scraping starts.
+
+    Raises:
+        ValueError: If any file contains an entry of the wrong shape.
+    """
+
+    for publisher in METADATA_FILES:
+        get_journal_metadata(publisher)
@@ -1,6 +1,7 @@
 from config import DATA_PATH
 import json
 import os
+import tempfile
 def load_json_as_dict(file_name):
     """
     Loads a JSON file and returns it as a Python dictionary.
@@ -17,11 +18,20 @@ def load_json_as_dict(file_name):
 
 def save_dict_as_json(data_dict, file_name):
     """
-    Saves a dictionary as a JSON file.
+    Saves a dictionary as a JSON file. The dictionary is written to a temporary file that then replaces the old file,
+    so readers and interrupted runs never see a half-written file.
 
     Args:
         data_dict (dict): The dictionary to save.
         file_name (str): The name of the file to save the dictionary in.
     """
-    with open(os.path.join(DATA_PATH ,file_name), 'w', encoding='utf-8') as f:
-        json.dump(data_dict, f, ensure_ascii=False, indent=4)
\ No newline at end of file
+    path = os.path.join(DATA_PATH, file_name)
+    f = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), prefix=os.path.basename(path),
+                                    suffix='.tmp', delete=False)
+    try:
+        with f:
+            json.dump(data_dict, f, ensure_ascii=False, indent=4)
+        os.replace(f.name, path)
+    except BaseException:
+        os.remove(f.name)
+        raise
\ No newline at end of file
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Latest Volume Cache
+
+This module remembers the latest volume of every journal between runs, in latest_volumes.json under DATA_PATH (see
+ttlCache.py). The runners ask the cache instead of loading the journal's page on every run; the page is only loaded
+again once the journal's entry is older than its time-to-live. If that refresh fails, the last known volume is used
+rather than stopping the journal, since a volume number only ever goes up and a slightly old one only delays the
+newest issue. A lookup that returns no volume, or one below 1, counts as a failure and is never cached.
+
+Functions:
+    get_latest_volume(publisher, journal_name, lookup, ttl): Returns a journal's latest volume, refreshing it with
+        lookup() once the cached value has expired.
+    invalidate_latest_volume(publisher, journal_name): Forces the next call for a journal to refresh.
+
+Usage:
+    latest_vol = get_latest_volume('wiley', name, lambda: get_latest_volume_number_wiley(volume_url, wait_time))
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+from src.helperFunctions.ttlCache import TtlCache
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+CACHE_FILE = 'latest_volumes.json'
+
+# Seconds a cached latest volume stays valid
+DEFAULT_TTL = 3 * 24 * 60 * 60
+
+# Per-journal time-to-live overrides, keyed by 'publisher/journal_name', for journals that open volumes more often
+LATEST_VOLUME_TTLS = {}
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+_cache = TtlCache(CACHE_FILE, 'volume', DEFAULT_TTL, LATEST_VOLUME_TTLS)
+
+
+def get_latest_volume(publisher, journal_name, lookup, ttl=None):
+    """
+    Returns a journal's latest volume, refreshing it with lookup() once the cached value has expired.
+
+    Args:
+        publisher (str): The publisher, e.g. 'wiley'.
+        journal_name (str): The name of the journal.
+        lookup (callable): Loads the journal's page and returns its latest volume.
+        ttl (int): Seconds the cached value stays valid. Defaults to LATEST_VOLUME_TTLS or DEFAULT_TTL.
+
+    Returns:
+        int: The latest volume.
+
+    Raises:
+        Exception: Whatever lookup() raised, or ValueError if it returned no valid volume, when the journal has no
+            cached value to fall back on.
+    """
+
+    def checked_lookup():
+        volume = lookup()
+        if volume is None or int(volume) < 1:
+            raise ValueError(f"No valid latest volume found for {journal_name} (got {volume!r})")
+        return int(volume)
+
+    return _cache.get(f"{publisher}/{journal_name}", checked_lookup, ttl,
+                      description=f"latest volume of {journal_name}")
+
+
+def invalidate_latest_volume(publisher, journal_name):
+    """
+    Forces the next get_latest_volume call for a journal to refresh.
+
+    Args:
+        publisher (str): The publisher, e.g. 'wiley'.
+        journal_name (str): The name of the journal.
+    """
+
+    _cache.invalidate(f"{publisher}/{journal_name}")
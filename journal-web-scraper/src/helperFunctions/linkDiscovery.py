@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Link Discovery
+
+This module collects the paper links of every issue page of a journal. The issue pages are loaded one after the other
+in a single browser session pinned for the journal (see browserPool.pin_browser), or over the shared HTTP client for
+server-rendered pages, rather than going back to the browser pool for every issue. Links are deduplicated with a set
+as they arrive, so a paper listed on several issue pages, or twice on one page, is only scraped once. When a
+JobJournal is given, issues recorded by an interrupted run are skipped and the links of each issue are checkpointed as
+soon as the issue is done. An issue page that fails is loaded again with a backoff (see
+failureLedger.call_with_retries); when a FailureLedger is given, an issue page that still fails is recorded there and
+skipped, so one bad issue does not cost the rest of the journal.
+
+Functions:
+    discover_links(get_papers_link, issue_urls, wait_time, job_journal, failure_ledger): Returns the unique paper
+        links of every issue page, in discovery order.
+
+Usage:
+    html_list = discover_links(get_papers_link_wiley, url, wait_time, job_journal, failure_ledger)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+from tqdm import tqdm
+from src.helperFunctions.browserPool import pin_browser
+from src.helperFunctions.failureLedger import call_with_retries
+from src.helperFunctions.metrics import increment
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+def discover_links(get_papers_link, issue_urls, wait_time, job_journal=None, failure_ledger=None):
+    """
+    Returns the unique paper links of every issue page, in discovery order.
+
+    Args:
+        get_papers_link (callable): The publisher's get_papers_link_* function.
+        issue_urls (list): URLs of the issue pages.
+        wait_time (int): Longest time to wait for a page to render before scraping.
+        job_journal (JobJournal): Checkpoints of the scrape job. Issues it has already recorded are skipped.
+        failure_ledger (FailureLedger): Records the issue pages that failed, which are then skipped instead of
+            stopping the scrape.
+
+    Returns:
+        html_list (list): Paper URLs.
+
+    Raises:
+        RuntimeError: If the links of an issue page could not be retrieved and no failure ledger is given.
+    """
+
+    html_list = job_journal.get_links() if job_journal is not None else []
+    seen = set(html_list)
+
+    with pin_browser():
+        for site in tqdm(issue_urls, desc="Getting paper links"):
+            if job_journal is not None and job_journal.issue_done(site):
+                continue
+            try:
+                links = call_with_retries(get_papers_link, site, [], wait_time)
+            except Exception as e:
+                if failure_ledger is None:
+                    raise RuntimeError(f"Failed to get links for each paper: {e}")
+                print(f"Failed to get links for {site}: {type(e).__name__}: {e}")
+                increment('scrape_failures_total', publisher=failure_ledger.publisher, stage='issue')
+                failure_ledger.record_exception(site, 'issue', e)
+                continue
+
+            new_links = []
+            for link in links:
+                if link not in seen:
+                    seen.add(link)
+                    new_links.append(link)
+            if job_journal is not None:
+                job_journal.record_issue(site, new_links)
+            if failure_ledger is not None:
+                failure_ledger.resolve([site])
+            html_list.extend(new_links)
+
+    return html_list
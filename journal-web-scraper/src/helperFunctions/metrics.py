@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scrape Metrics
+
+This module collects the counters and timing histograms of a scrape run and exports them as a snapshot. The shared
+helpers record them as they work, so every runner and web_scraper_* module is covered without timing code of its own:
+    browserPool: browser launches ('browser_launch' stage)
+    fetchBackend and pageReadiness: page requests over HTTP and in browsers ('navigation'), readiness waits ('wait'),
+        in-browser field extraction ('extraction'), and pages fetched per publisher, page type and backend
+    parallelAbstracts: field extraction from page snapshots ('extraction') and articles per outcome
+    articleStore: writes to the article store ('save')
+    failureLedger and rateLimit: retries, failures and block pages
+    the runners: the time taken by each journal
+Timings are histograms with fixed buckets, labelled by stage, publisher and page type, so the slowest publisher and
+stage can be read off the snapshot. export_metrics writes the snapshot as JSON and in the Prometheus text format under
+DATA_PATH/metrics, once per run. Every process keeps its own metrics; parse processes send their timings back with
+their results, and distributed workers export their own snapshots.
+
+Functions:
+    increment(name, value, **labels): Adds to a counter.
+    observe(name, seconds, **labels): Records a duration in a histogram.
+    timer(name, **labels): Times the body of a with block into a histogram.
+    timed(name, **labels): Decorator timing every call of a function into a histogram.
+    get_metrics_snapshot(): Returns every counter and histogram.
+    format_prometheus(): Formats the metrics in the Prometheus text format.
+    format_metrics_summary(): Formats the total time per publisher and stage, slowest first.
+    export_metrics(run_name): Writes the snapshot as JSON and Prometheus text files.
+    reset_metrics(): Clears every metric.
+
+Usage:
+    with timer('scrape_stage_seconds', stage='navigation', publisher='wiley', page_type='issue'):
+        browser.get(url)
+    increment('scrape_pages_total', publisher='wiley', page_type='issue', backend='selenium')
+    export_metrics('combined_runner')
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+METRICS_DIR = os.path.join(DATA_PATH, 'metrics')
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800)
+
+# Description of every metric, used as the HELP line of the Prometheus export
+METRIC_HELP = {
+    'scrape_stage_seconds': "Time spent in each scrape stage, by stage, publisher and page type.",
+    'scrape_journal_seconds': "Time taken to scrape one journal, by publisher.",
+    'scrape_pages_total': "Pages fetched, by publisher, page type and backend.",
+    'scrape_articles_total': "Articles scraped, by publisher and outcome.",
+    'scrape_journals_total': "Journals scraped, by publisher and outcome.",
+    'scrape_failures_total': "Pages that failed after their retries, by publisher and stage.",
+    'scrape_retries_total': "Retries of failed calls, by operation.",
+    'scrape_blocked_pages_total': "CAPTCHA, challenge and rate limit responses, by host.",
+    'scrape_browser_launches_total': "Browsers launched by the browser pool.",
+    'scrape_saved_articles_total': "Articles written to the article store, by publisher.",
+}
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+_counters = {}
+_histograms = {}
+_lock = threading.Lock()
+_started = time.time()
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def increment(name, value=1, **labels):
+    """
+    Adds to a counter.
+
+    Args:
+        name (str): Name of the counter, e.g. 'scrape_pages_total'.
+        value (int): Amount to add.
+        **labels: Labels of the counter, e.g. publisher='wiley'.
+    """
+
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """
+    Records a duration in a histogram.
+
+    Args:
+        name (str): Name of the histogram, e.g. 'scrape_stage_seconds'.
+        seconds (float): The duration.
+        **labels: Labels of the histogram, e.g. stage='navigation'.
+    """
+
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'count': 0, 'sum': 0.0, 'min': seconds, 'max': seconds,
+                                            'buckets': [0] * len(BUCKETS)}
+        histogram['count'] += 1
+        histogram['sum'] += seconds
+        histogram['min'] = min(histogram['min'], seconds)
+        histogram['max'] = max(histogram['max'], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][i] += 1
+                break
+
+
+@contextmanager
+def timer(name, **labels):
+    """
+    Times the body of a with block into a histogram, whether or not it raises.
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    """
+    Decorator timing every call of a function into a histogram, and counting its calls in name's '_total' counter
+    by outcome ('ok' or 'error').
+
+    Args:
+        name (str): Name of the histogram, e.g. 'scrape_journal_seconds'. Must end in '_seconds'.
+        **labels: Labels of the histogram and counter, e.g. publisher='wiley'.
+    """
+
+    counter = name[:-len('_seconds')] + 's_total'
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            outcome = 'error'
+            try:
+                with timer(name, **labels):
+                    result = func(*args, **kwargs)
+                outcome = 'ok'
+                return result
+            finally:
+                increment(counter, outcome=outcome, **labels)
+        return wrapper
+    return decorator
+
+
+def reset_metrics():
+    """
+    Clears every metric, e.g. between two runs in one process.
+    """
+
+    global _started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started = time.time()
+
+
+# =============================================================================
+# Export
+# =============================================================================
+def get_metrics_snapshot():
+    """
+    Returns every counter and histogram.
+
+    Returns:
+        dict: The start and snapshot times of the run, a list of counters with name, labels and value, and a list of
+            histograms with name, labels, count, sum, min, max, mean and cumulative bucket counts.
+    """
+
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), histogram in sorted(_histograms.items()):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets['+Inf'] = histogram['count']
+            histograms.append({'name': name, 'labels': dict(labels), 'count': histogram['count'],
+                               'sum': histogram['sum'], 'min': histogram['min'], 'max': histogram['max'],
+                               'mean': histogram['sum'] / histogram['count'], 'buckets': buckets})
+        return {'started': _started, 'snapshot': time.time(), 'counters': counters, 'histograms': histograms}
+
+
+def _format_labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return "{" + ",".join(f'{label}="{value}"' for label, value in zip(labels, escaped)) + "}"
+
+
+def format_prometheus(snapshot=None):
+    """
+    Formats the metrics in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): A snapshot from get_metrics_snapshot. Defaults to the current metrics.
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+
+    snapshot = snapshot or get_metrics_snapshot()
+    lines = []
+    described = set()
+
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for counter in snapshot['counters']:
+        describe(counter['name'], 'counter')
+        lines.append(f"{counter['name']}{_format_labels(counter['labels'])} {counter['value']}")
+    for histogram in snapshot['histograms']:
+        name, labels = histogram['name'], histogram['labels']
+        describe(name, 'histogram')
+        for bound, count in histogram['buckets'].items():
+            lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def format_metrics_summary(snapshot=None):
+    """
+    Formats the total time spent per publisher and stage, slowest first.
+
+    Returns:
+        str: One line per publisher and stage.
+    """
+
+    snapshot = snapshot or get_metrics_snapshot()
+    totals = {}
+    for histogram in snapshot['histograms']:
+        if histogram['name'] != 'scrape_stage_seconds':
+            continue
+        key = (histogram['labels'].get('publisher', 'all'), histogram['labels'].get('stage', ''))
+        entry = totals.setdefault(key, {'count': 0, 'sum': 0.0, 'max': 0.0})
+        entry['count'] += histogram['count']
+        entry['sum'] += histogram['sum']
+        entry['max'] = max(entry['max'], histogram['max'])
+
+    lines = []
+    for (publisher, stage), entry in sorted(totals.items(), key=lambda item: -item[1]['sum']):
+        lines.append(f"{publisher} {stage}: {entry['sum']:.1f}s over {entry['count']} calls, "
+                     f"mean {entry['sum'] / entry['count']:.2f}s, max {entry['max']:.2f}s")
+    return "\n".join(lines)
+
+
+def export_metrics(run_name, directory=METRICS_DIR):
+    """
+    Writes the metrics snapshot of the run as <run_name>_<timestamp>.json and .prom files.
+
+    Args:
+        run_name (str): Identifies the run, e.g. 'combined_runner'.
+        directory (str): Folder of the snapshot files. Defaults to METRICS_DIR.
+
+    Returns:
+        str: Path of the snapshot files, without their extension.
+    """
+
+    snapshot = get_metrics_snapshot()
+    snapshot['run'] = run_name
+    os.makedirs(directory, exist_ok=True)
+    base_path = os.path.join(directory, f"{run_name}_{time.strftime('%Y%m%d-%H%M%S')}")
+    with open(base_path + '.json', 'w') as json_file:
+        json.dump(snapshot, json_file, indent=1)
+    with open(base_path + '.prom', 'w') as prom_file:
+        prom_file.write(format_prometheus(snapshot))
+    return base_path
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+"""
+Page Cache
+
+This module keeps the rendered HTML of fetched pages on disk under DATA_PATH, so selectors can be tuned and a corpus
+re-parsed without downloading it again. Page bodies are gzip-compressed and stored by the SHA-256 of their content,
+so pages with identical HTML are stored once; a SQLite index maps each URL to its body and records when it was last
+used. When the cache grows past its size limit, the least recently used pages are evicted.
+
+The cache is used by fetchBackend.fetch_page according to its mode:
+    'off': pages are always fetched and never stored (default).
+    'record': pages are always fetched and stored.
+    'read_write': stored pages are served from the cache, other pages are fetched and stored.
+    'replay': pages are only served from the cache; a page that is not stored raises PageNotCached without any
+        network access.
+
+Functions:
+    configure_page_cache(mode, max_bytes): Sets the cache mode and size limit.
+    get_page_cache_mode(): Returns the current cache mode.
+    get_cached_page(url): Returns the final URL and HTML stored for a URL, or None.
+    store_page(url, final_url, html): Stores the HTML of a page.
+    clear_page_cache(): Deletes every stored page.
+
+Usage:
+    configure_page_cache('replay')
+    abstract_list = get_abstracts(SPRINGER_ARTICLE_PARSER, html_list, wait_time, name)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+CACHE_PATH = os.path.join(DATA_PATH, 'page_cache')
+
+CACHE_MODES = ('off', 'record', 'read_write', 'replay')
+
+# Total size of the compressed page bodies before the least recently used pages are evicted
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash);
+"""
+
+
+class PageNotCached(LookupError):
+    pass
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+_config = {'mode': 'off', 'max_bytes': DEFAULT_MAX_BYTES}
+_connection = None
+_lock = threading.Lock()
+
+
+def configure_page_cache(mode, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Sets the cache mode and size limit.
+
+    Args:
+        mode (str): One of 'off', 'record', 'read_write' or 'replay'.
+        max_bytes (int): Total size of the compressed page bodies kept on disk.
+    """
+
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Page cache mode must be one of {', '.join(CACHE_MODES)}, not '{mode}'")
+    with _lock:
+        _config['mode'] = mode
+        _config['max_bytes'] = max_bytes
+
+
+def get_page_cache_mode():
+    return _config['mode']
+
+
+def _get_connection():
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_PATH, exist_ok=True)
+        _connection = sqlite3.connect(os.path.join(CACHE_PATH, 'index.sqlite'), timeout=30, check_same_thread=False)
+        with _connection:
+            _connection.executescript(_SCHEMA)
+    return _connection
+
+
+def _body_path(content_hash):
+    return os.path.join(CACHE_PATH, content_hash[:2], content_hash + '.html.gz')
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+def get_cached_page(url):
+    """
+    Returns the page stored for a URL, marking it as recently used.
+
+    Args:
+        url (str): The requested URL.
+
+    Returns:
+        tuple: (final_url, html), or None if the URL is not stored.
+    """
+
+    with _lock:
+        connection = _get_connection()
+        row = connection.execute("SELECT final_url, content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        final_url, content_hash = row
+        try:
+            with gzip.open(_body_path(content_hash), 'rt', encoding='utf-8') as f:
+                html = f.read()
+        except FileNotFoundError:
+            with connection:
+                connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+            return None
+        with connection:
+            connection.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+    return final_url, html
+
+
+def store_page(url, final_url, html):
+    """
+    Stores the HTML of a page, then evicts the least recently used pages if the cache is over its size limit.
+
+    Args:
+        url (str): The requested URL.
+        final_url (str): The URL the page was served from, after redirects.
+        html (str): The page's HTML.
+    """
+
+    content_hash = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    body_path = _body_path(content_hash)
+
+    with _lock:
+        connection = _get_connection()
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            tmp_path = body_path + '.tmp'
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, body_path)
+        size = os.path.getsize(body_path)
+
+        now = time.time()
+        with connection:
+            old = connection.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            connection.execute("INSERT OR REPLACE INTO pages (url, final_url, content_hash, size, stored_at, last_used) "
+                               "VALUES (?, ?, ?, ?, ?, ?)", (url, final_url, content_hash, size, now, now))
+        if old is not None and old[0] != content_hash:
+            _remove_unreferenced_body(connection, old[0])
+        _evict(connection)
+
+
+def _remove_unreferenced_body(connection, content_hash):
+    if connection.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone() is None:
+        try:
+            os.remove(_body_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+
+def _evict(connection):
+    # Bodies shared by several URLs are counted once
+    total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM "
+                               "(SELECT DISTINCT content_hash, size FROM pages)").fetchone()[0]
+    if total <= _config['max_bytes']:
+        return
+
+    for url, content_hash in connection.execute("SELECT url, content_hash FROM pages ORDER BY last_used").fetchall():
+        with connection:
+            connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+        if connection.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone() is None:
+            total -= os.path.getsize(_body_path(content_hash)) if os.path.exists(_body_path(content_hash)) else 0
+            _remove_unreferenced_body(connection, content_hash)
+        if total <= _config['max_bytes']:
+            break
+
+
+def clear_page_cache():
+    """
+    Deletes every stored page.
+    """
+
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+        shutil.rmtree(CACHE_PATH, ignore_errors=True)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+"""
+Page Readiness
+
+This module replaces the fixed time.sleep(wait_time) calls of the web_scraper_* modules with readiness-based waits.
+Every publisher has a readiness spec listing, per page type, the CSS selectors that must be present before the page
+is scraped and the longest time to wait for them. A page is scraped as soon as its selectors exist, and the time
+actually waited is recorded against the old fixed budget so the savings can be reported at the end of a run. The
+time each page takes to load is reported to the host's rate controller (see rateLimit.py), and a page that never
+becomes ready is checked for a CAPTCHA or challenge, which raises BlockedPage.
+
+Functions:
+    load_page(browser, url, publisher, page_type, wait_time): Opens a URL and waits until the page is ready.
+    wait_until_ready(browser, publisher, page_type, wait_time): Waits until every required selector of a page exists.
+    get_wait_telemetry(): Returns the time waited versus the fixed budget per publisher and page type.
+    format_wait_telemetry(): Formats the wait telemetry as printable lines.
+    reset_wait_telemetry(): Clears the recorded wait telemetry.
+
+Usage:
+    with borrow_browser() as browser:
+        load_page(browser, url, 'elsevier', 'article', wait_time)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from src.helperFunctions.hostOverride import rewrite_url
+from src.helperFunctions.metrics import observe
+from src.helperFunctions.rateLimit import BlockedPage, is_block_page, report_failure, report_success, throttle
+
+
+# =============================================================================
+# Readiness Specs
+# =============================================================================
+# Selectors separated by commas inside one string are alternatives (CSS selector groups); every string in the list
+# must match at least one element.
+READINESS_SPECS = {
+    'elsevier': {
+        'timeout': 30,
+        'latest_volume': [".js-issue-item-link"],
+        'issue_archive': [".js-issue-item-link"],
+        'issue': ["h3 a"],
+        'article': ["#abstracts", "#screen-reader-main-title", "#author-group", ".publication-volume .text-xs"],
+    },
+    'wiley': {
+        'timeout': 30,
+        'latest_volume': ["div.cover-image__details span.comma"],
+        'issue_archive': ["a[href*='/toc/']"],
+        'issue': ["a.issue-item__title.visitable"],
+        'article': [".volume-issue", ".citation__title", "div.article-section__content p"],
+    },
+    'oxford': {
+        'timeout': 30,
+        'latest_volume': ["span.volume"],
+        'issue_archive': ["a[href*='/issue']"],
+        'issue': ["h5.customLink.item-title a"],
+        'article': ["h1.wi-article-title", "section.abstract p", "div.volume-issue__wrap .volume"],
+    },
+    'springer': {
+        'timeout': 30,
+        'latest_volume': ["li.app-section h2.app-section__heading span.u-display-block.u-flex-grow, "
+                          "li.app-vol-and-issues-item h2 span"],
+        'issue_archive': ["a[href*='/volumes-and-issues/']"],
+        'issue': ["article.c-card-open h3.c-card-open__heading a, li.c-list-group__item a"],
+        'article': ["h1.c-article-title", "div.c-article-section__content p", "span[data-test='journal-volume']"],
+    },
+    'uchicago': {
+        'timeout': 30,
+        'latest_volume': ["div.cover-image__details .journal-meta span.citation-line"],
+        'issue_archive': ["a[href*='/toc/']"],
+        'issue': ["div.issue-item h4.issue-item__title a"],
+        'article': ["h1.citation__title", "div.abstractSection.abstractInFull p", ".current-issue__meta"],
+    },
+    'aea': {
+        'timeout': 30,
+        'volume_index': [".volume-container .issue-item a"],
+        'issue': ["article.journal-article h3.title a"],
+        'article': ["section.article-information.abstract", "h1.title", "div.journal"],
+    },
+    'jstor': {
+        'timeout': 30,
+        'issue_archive': [".decade"],
+        'issue': ["div.stable"],
+        'article': ["mfe-turnaway-pharos-heading[data-pharos-component='PharosHeading']",
+                    "p.content-meta-data__authors",
+                    "mfe-turnaway-pharos-link[data-pharos-component='PharosLink']"],
+    },
+}
+
+_READY_SCRIPT = "return arguments[0].every(function (s) { return document.querySelector(s) !== null; });"
+
+
+# =============================================================================
+# Waiting
+# =============================================================================
+_telemetry = {}
+_telemetry_lock = threading.Lock()
+
+
+def load_page(browser, url, publisher, page_type, wait_time=None):
+    """
+    Opens a URL, once its host's rate limit allows it, and waits until the page's required selectors exist.
+
+    Args:
+        browser (webdriver.Firefox): The browser to load the page in.
+        url (str): URL of the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        page_type (str): Kind of page, e.g. 'issue' or 'article'.
+        wait_time (int): Longest time to wait, previously the fixed sleep. Defaults to the spec's timeout.
+
+    Returns:
+        bool: True if the page became ready, False if the wait timed out.
+
+    Raises:
+        BlockedPage: If the page never became ready because the host answered with a CAPTCHA or challenge page.
+    """
+
+    throttle(url)
+    start = time.monotonic()
+    try:
+        browser.get(rewrite_url(url))
+    except WebDriverException:
+        report_failure(url)
+        raise
+    latency = time.monotonic() - start
+    observe('scrape_stage_seconds', latency, stage='navigation', publisher=publisher, page_type=page_type)
+
+    ready = wait_until_ready(browser, publisher, page_type, wait_time)
+    if not ready and is_block_page(browser.page_source):
+        report_failure(url, blocked=True)
+        raise BlockedPage(f"{url} answered with a CAPTCHA or challenge page")
+    report_success(url, latency)
+    return ready
+
+
+def wait_until_ready(browser, publisher, page_type, wait_time=None):
+    """
+    Waits until every required selector of a page exists, recording the time actually waited.
+
+    A timeout is not raised: the caller's own element lookups decide whether a partially rendered page is usable.
+
+    Args:
+        browser (webdriver.Firefox): The browser showing the page.
+        publisher (str): Key of the publisher in READINESS_SPECS.
+        page_type (str): Kind of page, e.g. 'issue' or 'article'.
+        wait_time (int): Longest time to wait, previously the fixed sleep. Defaults to the spec's timeout.
+
+    Returns:
+        bool: True if the page became ready, False if the wait timed out.
+    """
+
+    spec = READINESS_SPECS[publisher]
+    selectors = spec[page_type]
+    timeout = spec['timeout'] if wait_time is None else min(wait_time, spec['timeout'])
+
+    start = time.perf_counter()
+    try:
+        WebDriverWait(browser, timeout, poll_frequency=0.25).until(
+            lambda driver: driver.execute_script(_READY_SCRIPT, selectors)
+        )
+        ready = True
+    except TimeoutException:
+        ready = False
+    waited = time.perf_counter() - start
+    observe('scrape_stage_seconds', waited, stage='wait', publisher=publisher, page_type=page_type)
+
+    _record_wait(publisher, page_type, waited, wait_time or 0, ready)
+    return ready
+
+
+# =============================================================================
+# Telemetry
+# =============================================================================
+def _record_wait(publisher, page_type, waited, budget, ready):
+    with _telemetry_lock:
+        entry = _telemetry.setdefault((publisher, page_type),
+                                      {'pages': 0, 'waited': 0.0, 'fixed_budget': 0.0, 'timeouts': 0})
+        entry['pages'] += 1
+        entry['waited'] += waited
+        entry['fixed_budget'] += budget
+        if not ready:
+            entry['timeouts'] += 1
+
+
+def get_wait_telemetry():
+    """
+    Returns the time waited versus the fixed budget per publisher and page type.
+
+    Returns:
+        dict: Maps (publisher, page_type) to pages, seconds waited, seconds of fixed budget and timeouts.
+    """
+
+    with _telemetry_lock:
+        return {key: dict(value) for key, value in _telemetry.items()}
+
+
+def format_wait_telemetry():
+    """
+    Formats the wait telemetry as printable lines.
+
+    Returns:
+        str: One line per publisher and page type, plus a total.
+    """
+
+    telemetry = get_wait_telemetry()
+    lines = []
+    total_waited = 0.0
+    total_budget = 0.0
+    for (publisher, page_type), entry in sorted(telemetry.items()):
+        total_waited += entry['waited']
+        total_budget += entry['fixed_budget']
+        lines.append(f"{publisher} {page_type}: {entry['pages']} pages, waited {entry['waited']:.1f}s "
+                     f"of {entry['fixed_budget']:.0f}s fixed budget, {entry['timeouts']} timeouts")
+    lines.append(f"Total: waited {total_waited:.1f}s of {total_budget:.0f}s fixed budget")
+    return "\n".join(lines)
+
+
+def reset_wait_telemetry():
+    """
+    Clears the recorded wait telemetry.
+    """
+
+    with _telemetry_lock:
+        _telemetry.clear()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parallel Abstract Fetching
+
+This module scrapes every paper link of a journal in two stages. The fetch stage loads each article's page once,
+with a pool of worker threads sharing the pooled browsers and HTTP client, and hands the page's HTML on. The parse
+stage extracts the fields from that snapshot with the publisher's ArticleParser (see articleParser.py), either on the
+calling thread or, when parse workers are configured, in a pool of processes shared by every journal, so the CPU-bound
+parsing neither holds up the browsers nor competes with them for the interpreter. The two stages are sized
+independently; article pages rendered in a browser may have their fields extracted there already (see
+articleParser.configure_extraction) and skip the parse pool. Results come back in the same order as the paper links.
+A page that fails to load is fetched again with a backoff (see failureLedger.call_with_retries); an article that still
+fails, or whose fields cannot be extracted, is reported with its exception instead of stopping the run, and recorded
+in the journal's FailureLedger, when one is given, as soon as it fails. When a JobJournal is given, articles already
+recorded by an interrupted run are not scraped again and every new record is checkpointed as soon as it is parsed. When
+a sink is given (see recordSink.JournalSink), every paper is written to it as soon as it is parsed instead of being kept
+for the returned list, so memory use does not grow with the number of articles.
+
+Functions:
+    configure_parse_workers(parse_workers): Sets how many processes parse article pages.
+    get_abstracts(parser, html_list, wait_time, journal_name, num_workers, job_journal, failure_ledger, sink): Fetches
+        and parses the abstract of every paper link, in link order or streamed to a sink.
+    shutdown_parse_pool(): Stops the parse processes.
+
+Usage:
+    configure_parse_workers(4)
+    abstract_list = get_abstracts(ELSEVIER_ARTICLE_PARSER, html_list, wait_time, name, num_workers=4)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from tqdm import tqdm
+from src.helperFunctions.browserPool import get_browser_pool
+from src.helperFunctions.failureLedger import call_with_retries
+from src.helperFunctions.metrics import increment, observe
+from src.helperFunctions.pageCache import PageNotCached
+
+
+# =============================================================================
+# Parse Stage
+# =============================================================================
+_parse_config = {'parse_workers': 1}
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def configure_parse_workers(parse_workers):
+    """
+    Sets how many processes parse article pages. With 1, pages are parsed on the thread that collects the fetches.
+
+    Args:
+        parse_workers (int): Number of parse processes.
+    """
+
+    if parse_workers < 1:
+        raise ValueError(f"parse_workers must be at least 1, not {parse_workers}")
+    shutdown_parse_pool()
+    _parse_config['parse_workers'] = parse_workers
+
+
+def _get_parse_pool():
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Spawned rather than forked, since the parent holds browser and HTTP client threads
+            _parse_pool = ProcessPoolExecutor(max_workers=_parse_config['parse_workers'],
+                                              mp_context=multiprocessing.get_context('spawn'))
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """
+    Stops the parse processes. They are started again by the next get_abstracts call that needs them.
+    """
+
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown()
+            _parse_pool = None
+
+
+atexit.register(shutdown_parse_pool)
+
+
+def _parse(parser, url, html, journal_name):
+    # A page missing a field gives an empty paper; the error is sent back by name, since it may not unpickle, and the
+    # time taken is sent back since a parse process keeps no metrics of its own
+    start = time.perf_counter()
+    try:
+        return parser.parse(url, html, journal_name), None, time.perf_counter() - start
+    except Exception as e:
+        return [], (type(e).__name__, str(e)), time.perf_counter() - start
+
+
+def _parse_page(parser, page, journal_name):
+    start = time.perf_counter()
+    try:
+        return parser.parse_page(page, journal_name), None, time.perf_counter() - start
+    except Exception as e:
+        return [], (type(e).__name__, str(e)), time.perf_counter() - start
+
+
+# =============================================================================
+# Functions
+# =============================================================================
+def get_abstracts(parser, html_list, wait_time, journal_name, num_workers=1, job_journal=None, failure_ledger=None,
+                  sink=None):
+    """
+    Fetches and parses the abstract of every paper link, optionally with several browsers working at the same time.
+
+    Args:
+        parser (ArticleParser): The publisher's article parser, e.g. ELSEVIER_ARTICLE_PARSER.
+        html_list (list): List of paper URLs.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        journal_name (str): The name of the journal being scraped.
+        num_workers (int): Number of articles fetched at the same time.
+        job_journal (JobJournal): Checkpoints of the scrape job. Records it already holds are reused.
+        failure_ledger (FailureLedger): Records the articles that failed, and forgets those that now succeeded.
+        sink (JournalSink): Receives every non-empty paper as soon as it is parsed, those recorded by an interrupted
+            run first.
+
+    Returns:
+        abstract_list (list): The non-empty papers, in the same order as html_list. With a sink, the number of papers
+            written to it instead.
+    """
+
+    failures = {'fetch': 0, 'parse': 0}
+    written = 0
+    if sink is None:
+        recorded = job_journal.get_records() if job_journal is not None else {}
+        results = [recorded.get(url) for url in html_list]
+    else:
+        # The papers recorded by an interrupted run are streamed to the sink rather than loaded at once
+        recorded = job_journal.get_recorded_urls() if job_journal is not None else set()
+        if recorded:
+            wanted = set(html_list)
+            for url, paper in job_journal.iter_records():
+                if paper and url in wanted:
+                    sink.write(paper)
+                    written += 1
+    pending = [i for i, url in enumerate(html_list) if url not in recorded]
+
+    num_workers = max(1, num_workers)
+    if num_workers > 1:
+        get_browser_pool().ensure_capacity(num_workers)
+    parse_pool = _get_parse_pool() if _parse_config['parse_workers'] > 1 else None
+
+    def fail(i, stage, error_type, message):
+        # Failures are recorded from this thread only, as they arrive, so an interrupted run keeps them too
+        failures[stage] += 1
+        increment('scrape_failures_total', publisher=parser.publisher, stage=stage)
+        if failure_ledger is not None:
+            failure_ledger.record(html_list[i], stage, error_type, message)
+        if stage == 'fetch':
+            print(f"Failed to get abstract for {html_list[i]}: {error_type}: {message}")
+
+    def record(i, parsed):
+        nonlocal written
+        paper, error, seconds = parsed
+        observe('scrape_stage_seconds', seconds, stage='extraction', publisher=parser.publisher, page_type='article')
+        if sink is None:
+            results[i] = paper
+        elif paper:
+            sink.write(paper)
+            written += 1
+        # Checkpoints are written from this thread only, as results arrive
+        if job_journal is not None:
+            job_journal.record_result(html_list[i], paper)
+        if error is not None:
+            fail(i, 'parse', *error)
+        elif failure_ledger is not None:
+            failure_ledger.resolve([html_list[i]])
+
+    with ThreadPoolExecutor(max_workers=num_workers) as fetch_pool, \
+            tqdm(total=len(pending), desc="Getting abstracts") as progress:
+        # A page missing from the replay cache will not appear on a retry
+        fetches = {fetch_pool.submit(call_with_retries, parser.fetch, html_list[i], wait_time,
+                                     no_retry=(PageNotCached,)): i for i in pending}
+        parses = {}
+        while fetches or parses:
+            done, _ = wait(list(fetches) + list(parses), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parses:
+                    record(parses.pop(future), future.result())
+                    progress.update()
+                    continue
+
+                i = fetches.pop(future)
+                try:
+                    page = future.result()
+                except Exception as e:
+                    fail(i, 'fetch', type(e).__name__, str(e))
+                    progress.update()
+                    continue
+                # Pages whose fields were already extracted in the browser only need building
+                if parse_pool is not None and page.html is not None:
+                    parses[parse_pool.submit(_parse, parser, page.url, page.html, journal_name)] = i
+                else:
+                    record(i, _parse_page(parser, page, journal_name))
+                    progress.update()
+
+    increment('scrape_articles_total', len(pending) - failures['fetch'] - failures['parse'], publisher=parser.publisher,
+              outcome='ok')
+    increment('scrape_articles_total', failures['fetch'], publisher=parser.publisher, outcome='fetch_failed')
+    increment('scrape_articles_total', failures['parse'], publisher=parser.publisher, outcome='parse_failed')
+    if failures['parse']:
+        print(f"{failures['parse']} articles of {journal_name} were missing a field")
+
+    if sink is not None:
+        return written
+    return [paper for paper in results if paper]
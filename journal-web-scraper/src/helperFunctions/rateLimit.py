@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-Host Rate Limiting
+
+This module gives every publisher host its own token bucket. Each page request made by the web_scraper_* modules,
+whether over HTTP or in a browser, first takes a token from the bucket of the host it is sent to. Hosts are limited
+independently, so scraping several publishers at the same time multiplies throughput without sending any single site
+more requests than its bucket allows.
+
+The rate of each bucket adapts to how the host responds (additive increase, multiplicative decrease): every fast,
+successful page raises the rate by a small step up to the host's ceiling, while slow pages, errors and block pages
+(CAPTCHAs, HTTP 429) cut it by a factor down to its floor. A failure also pauses the host for an exponentially growing,
+jittered backoff, longer after a block page; the pause ends early when the server sends a Retry-After header. The
+fetch backend reports the outcome of every page through report_success and report_failure, and retries block pages.
+
+Functions:
+    get_host_bucket(host): Returns the token bucket of a host, creating it on first use.
+    configure_host_rate(host, rate, burst, max_rate): Sets the request rate, burst size and rate ceiling of a host.
+    configure_rate_control(adaptive, **settings): Turns rate adaptation on or off and changes its settings.
+    throttle(url): Blocks until the host of a URL may receive another request.
+    report_success(url, latency): Records a page that loaded, raising the host's rate if it was fast.
+    report_failure(url, blocked, retry_after): Records a failed or blocked page, lowering the host's rate and pausing it.
+    is_block_page(html, status_code): Returns True if a response is a CAPTCHA, challenge or rate limit page.
+    get_rate_stats(): Returns the current rate and outcome counts of every host.
+    format_rate_stats(): Formats the host statistics as printable lines.
+
+Usage:
+    throttle(url)
+    start = time.monotonic()
+    browser.get(url)
+    report_success(url, time.monotonic() - start)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+from src.helperFunctions.metrics import increment
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+PUBLISHER_HOSTS = {
+    'elsevier': 'www.sciencedirect.com',
+    'wiley': 'onlinelibrary.wiley.com',
+    'oxford': 'academic.oup.com',
+    'springer': 'link.springer.com',
+    'uchicago': 'www.journals.uchicago.edu',
+    'aea': 'www.aeaweb.org',
+    'americaneconomicjournal': 'www.aeaweb.org',
+    'jstor': 'www.jstor.org',
+}
+
+# Requests per second and burst size used for hosts without an explicit entry in HOST_RATE_LIMITS
+DEFAULT_RATE = 0.5
+DEFAULT_BURST = 2
+
+HOST_RATE_LIMITS = {}
+
+# Highest rate the adaptation may reach, per host, in requests per second
+DEFAULT_MAX_RATE = 2.0
+HOST_MAX_RATES = {}
+
+RATE_CONTROL = {
+    # Adapt the rates to the hosts' responses; when False every host keeps its configured rate
+    'adaptive': True,
+    # Requests per second added after every fast, successful page
+    'increase_step': 0.05,
+    # Factor applied to the rate after a slow page, a failure or a block page
+    'decrease_factor': 0.5,
+    # Lowest rate the adaptation may reach, in requests per second
+    'min_rate': 0.05,
+    # Pages taking longer than this (smoothed over recent pages), in seconds, count as a sign of overload
+    'target_latency': 8.0,
+    # Weight of the latest page in the smoothed latency
+    'latency_smoothing': 0.3,
+    # Pause after the first failure in a row, doubled with every further failure, in seconds
+    'backoff_base': 5.0,
+    # Pause after the first block page in a row, doubled with every further block page, in seconds
+    'block_backoff_base': 60.0,
+    'backoff_max': 900.0,
+}
+
+# Markers of CAPTCHA, bot challenge and rate limit pages, matched case-insensitively against the HTML. Only the title
+# and the interstitial's own form or frame count: ordinary pages also load challenge scripts and embed CAPTCHA widgets.
+BLOCK_PAGE_PATTERN = re.compile(
+    r"<title>[^<]*(?:just a moment|attention required|access denied|are you a robot|too many requests|captcha)|"
+    r"<form[^>]*(?:id|class)=[\"'][^\"']*(?:challenge-form|cf-challenge|captcha-form)|"
+    r"<div[^>]*id=[\"']px-captcha|"
+    r"<iframe[^>]*captcha-delivery",
+    re.IGNORECASE
+)
+
+# Status codes that mean the host is refusing requests for now
+BLOCK_STATUS_CODES = {429}
+
+
+# =============================================================================
+# Token Bucket
+# =============================================================================
+class BlockedPage(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens the bucket holds.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting for the token.
+        """
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate):
+        """
+        Changes the rate at which tokens are added, keeping the tokens accumulated at the old rate.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+# =============================================================================
+# Rate Control
+# =============================================================================
+class HostController:
+    """
+    Adapts the rate of one host's token bucket to its responses and pauses the host after failures.
+
+    Args:
+        bucket (TokenBucket): The host's token bucket.
+        max_rate (float): Highest rate the adaptation may reach.
+    """
+
+    def __init__(self, bucket, max_rate):
+        self.bucket = bucket
+        self.max_rate = max(max_rate, bucket.rate)
+        self.latency = None
+        self.failures_in_row = 0
+        self.blocks_in_row = 0
+        self.paused_until = 0.0
+        self.stats = {'pages': 0, 'failures': 0, 'blocks': 0, 'backoff_s': 0.0}
+        self._lock = threading.Lock()
+
+    def wait_for_pause(self):
+        """
+        Sleeps until the backoff pause of the host, if any, is over.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def record_success(self, latency):
+        with self._lock:
+            self.stats['pages'] += 1
+            self.failures_in_row = 0
+            self.blocks_in_row = 0
+            smoothing = RATE_CONTROL['latency_smoothing']
+            self.latency = latency if self.latency is None else smoothing * latency + (1 - smoothing) * self.latency
+            if not RATE_CONTROL['adaptive']:
+                return
+            if self.latency > RATE_CONTROL['target_latency']:
+                self._decrease()
+            else:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + RATE_CONTROL['increase_step']))
+
+    def record_failure(self, blocked=False, retry_after=None):
+        with self._lock:
+            self.stats['pages'] += 1
+            self.stats['failures'] += 1
+            if blocked:
+                self.stats['blocks'] += 1
+                self.blocks_in_row += 1
+                base, count = RATE_CONTROL['block_backoff_base'], self.blocks_in_row
+            else:
+                self.failures_in_row += 1
+                base, count = RATE_CONTROL['backoff_base'], self.failures_in_row
+
+            if RATE_CONTROL['adaptive']:
+                self._decrease()
+
+            if retry_after is not None:
+                backoff = min(float(retry_after), RATE_CONTROL['backoff_max'])
+            else:
+                # Equal jitter: half the exponential backoff is fixed, the other half random, so the threads and
+                # workers that were blocked together do not all come back at the same moment
+                backoff = min(base * 2 ** (count - 1), RATE_CONTROL['backoff_max'])
+                backoff = backoff / 2 + random.uniform(0, backoff / 2)
+            self.paused_until = max(self.paused_until, time.monotonic() + backoff)
+            self.stats['backoff_s'] += backoff
+            return backoff
+
+    def _decrease(self):
+        self.bucket.set_rate(max(RATE_CONTROL['min_rate'], self.bucket.rate * RATE_CONTROL['decrease_factor']))
+
+
+# =============================================================================
+# Host Registry
+# =============================================================================
+_buckets = {}
+_controllers = {}
+_buckets_lock = threading.Lock()
+
+
+def get_host_bucket(host):
+    """
+    Returns the token bucket of a host, creating it on first use.
+
+    Args:
+        host (str): Network location, e.g. 'www.sciencedirect.com'.
+
+    Returns:
+        TokenBucket: The bucket limiting requests to that host.
+    """
+
+    return _get_controller(host).bucket
+
+
+def _get_controller(host):
+    with _buckets_lock:
+        if host not in _controllers:
+            rate, burst = HOST_RATE_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+            _buckets[host] = TokenBucket(rate, burst)
+            _controllers[host] = HostController(_buckets[host], HOST_MAX_RATES.get(host, DEFAULT_MAX_RATE))
+        return _controllers[host]
+
+
+def configure_host_rate(host, rate, burst=DEFAULT_BURST, max_rate=None):
+    """
+    Sets the request rate and burst size of a host. With rate adaptation on, the rate is the starting point.
+
+    Args:
+        host (str): Network location, e.g. 'www.sciencedirect.com'.
+        rate (float): Requests per second.
+        burst (int): Number of requests that may be sent back to back.
+        max_rate (float): Highest rate the adaptation may reach. Defaults to DEFAULT_MAX_RATE.
+    """
+
+    with _buckets_lock:
+        HOST_RATE_LIMITS[host] = (rate, burst)
+        if max_rate is not None:
+            HOST_MAX_RATES[host] = max_rate
+        _buckets[host] = TokenBucket(rate, burst)
+        _controllers[host] = HostController(_buckets[host], HOST_MAX_RATES.get(host, DEFAULT_MAX_RATE))
+
+
+def configure_rate_control(adaptive=True, **settings):
+    """
+    Turns rate adaptation on or off and changes its settings.
+
+    Args:
+        adaptive (bool): Adapt the hosts' rates to their responses. Backoff pauses apply either way.
+        **settings: Keys of RATE_CONTROL to change, e.g. target_latency=5.
+    """
+
+    unknown = set(settings) - set(RATE_CONTROL)
+    if unknown:
+        raise ValueError(f"Unknown rate control settings: {', '.join(sorted(unknown))}")
+    with _buckets_lock:
+        RATE_CONTROL.update(settings, adaptive=adaptive)
+
+
+def throttle(url):
+    """
+    Blocks until the host of a URL may receive another request: until its backoff pause, if any, is over and a token
+    is available.
+
+    Args:
+        url (str): The URL about to be requested.
+
+    Returns:
+        float: Seconds spent waiting.
+    """
+
+    controller = _get_controller(urlparse(url).netloc)
+    return controller.wait_for_pause() + controller.bucket.acquire()
+
+
+def report_success(url, latency):
+    """
+    Records a page that loaded, raising the rate of its host by a step, or lowering it if pages have become slow.
+
+    Args:
+        url (str): URL of the page.
+        latency (float): Seconds the page took to load.
+    """
+
+    _get_controller(urlparse(url).netloc).record_success(latency)
+
+
+def report_failure(url, blocked=False, retry_after=None):
+    """
+    Records a page that failed to load, cutting the rate of its host and pausing the host for a jittered exponential
+    backoff.
+
+    Args:
+        url (str): URL of the page.
+        blocked (bool): The host answered with a CAPTCHA, challenge or rate limit page.
+        retry_after (float): Seconds the host asked to wait (Retry-After header), used instead of the backoff.
+
+    Returns:
+        float: Seconds the host is paused for.
+    """
+
+    host = urlparse(url).netloc
+    if blocked:
+        increment('scrape_blocked_pages_total', host=host)
+    return _get_controller(host).record_failure(blocked, retry_after)
+
+
+def is_block_page(html, status_code=None):
+    """
+    Returns True if a response is a CAPTCHA, bot challenge or rate limit page rather than the requested page.
+
+    Args:
+        html (str): The page's HTML.
+        status_code (int): HTTP status of the response, if known.
+    """
+
+    if status_code in BLOCK_STATUS_CODES:
+        return True
+    return bool(html) and BLOCK_PAGE_PATTERN.search(html) is not None
+
+
+# =============================================================================
+# Statistics
+# =============================================================================
+def get_rate_stats():
+    """
+    Returns the current rate and outcome counts of every host.
+
+    Returns:
+        dict: Maps host to its rate, smoothed latency, pages, failures, block pages and seconds of backoff.
+    """
+
+    with _buckets_lock:
+        controllers = dict(_controllers)
+    stats = {}
+    for host, controller in controllers.items():
+        with controller._lock:
+            stats[host] = dict(controller.stats, rate=controller.bucket.rate, latency=controller.latency)
+    return stats
+
+
+def format_rate_stats():
+    """
+    Formats the host statistics as printable lines.
+
+    Returns:
+        str: One line per host.
+    """
+
+    lines = []
+    for host, entry in sorted(get_rate_stats().items()):
+        latency = "n/a" if entry['latency'] is None else f"{entry['latency']:.1f}s"
+        lines.append(f"{host}: {entry['rate']:.2f} requests/s, latency {latency}, {entry['pages']} pages, "
+                     f"{entry['failures']} failures ({entry['blocks']} blocked), {entry['backoff_s']:.0f}s backoff")
+    return "\n".join(lines)
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+
+"""
+Record Sinks
+
+This module streams a journal's articles to disk as they are extracted, instead of the runners holding every paper in
+a list until the journal is done and then copying it into a JSON dump and a DataFrame. get_abstracts (see
+parallelAbstracts.py) hands each paper to a JournalSink, which turns it into a record with its Key and writes it to
+one writer per configured format:
+    'jsonl': one JSON object per line in DATA_PATH/<publisher>_<journal>.jsonl, flushed per record
+    'csv': DATA_PATH/<publisher>_<journal>.csv, flushed per record
+    'parquet': DATA_PATH/<publisher>_<journal>.parquet, written one row group per batch
+    'store': the article store (see articleStore.py), appended to per batch
+    'catalog': the article catalog (see articleCatalog.py), one transaction per batch
+Only one batch of records is in memory at a time, so a run's memory use does not grow with the number of volumes
+requested. Records are written in the order their articles finish, after those recovered from an interrupted run.
+Incremental and retry runs only scrape some of a journal's articles, so they open the JSON Lines and CSV files in
+append mode instead of replacing the articles of earlier runs, and copy the rows of the existing Parquet file into the
+new one. A JournalSink used as a context manager is closed as failed if the journal raised, which leaves the previous
+Parquet file in place instead of replacing it with the rows of a partial run.
+
+Classes:
+    JsonLinesSink(path, append): Writes records as JSON Lines.
+    CsvSink(path, columns, append): Writes records as CSV rows.
+    ParquetSink(path, columns, batch_size, append): Writes records to a Parquet file in row groups.
+    ArticleStoreSink(columns, batch_size): Appends records to the article store in batches.
+    CatalogSink(batch_size, path): Adds records to the article catalog in batches.
+    JournalSink(journal_website, journal_name, sinks): Turns a journal's papers into records and writes them to sinks.
+
+Functions:
+    configure_record_sinks(formats, batch_size): Sets the formats the runners write and the batch size.
+    paper_to_record(paper, journal_website, journal_name): Returns the record of a paper.
+    open_journal_sink(file_stem, journal_website, journal_name, formats, append): Opens the sinks of a journal.
+
+Usage:
+    with open_journal_sink(f'wiley_{name}', 'Wiley', name) as journal_sink:
+        get_abstracts(WILEY_ARTICLE_PARSER, html_list, wait_time, name, num_workers, job_journal, failure_ledger,
+                      journal_sink)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import csv
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import DATA_PATH
+from src.helperFunctions.articleCatalog import ArticleCatalog, CATALOG_PATH
+from src.helperFunctions.articleStore import append_articles
+from src.helperFunctions.generateKey import generate_key, split_volume_issue
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+RECORD_COLUMNS = ['Journal_Website', 'Journal_Name', 'Key', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
+
+SINK_FORMATS = ('jsonl', 'csv', 'parquet', 'store', 'catalog')
+
+_config = {
+    'formats': ('jsonl', 'store', 'catalog'),
+    # Records buffered by the Parquet, article store and catalog sinks before they are written
+    'batch_size': 200,
+}
+
+
+def configure_record_sinks(formats=('jsonl', 'store', 'catalog'), batch_size=200):
+    """
+    Sets the formats the runners write their articles in and the batch size of the batched sinks.
+
+    Args:
+        formats (tuple): Any of SINK_FORMATS.
+        batch_size (int): Records buffered by the Parquet, article store and catalog sinks before they are written.
+    """
+
+    for sink_format in formats:
+        if sink_format not in SINK_FORMATS:
+            raise ValueError(f"Unknown record sink format '{sink_format}', expected one of {SINK_FORMATS}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, not {batch_size}")
+    _config.update(formats=tuple(formats), batch_size=batch_size)
+
+
+# =============================================================================
+# Sinks
+# =============================================================================
+class JsonLinesSink:
+    """
+    Writes records as JSON Lines, one object per line, flushing after every record.
+
+    Args:
+        path (str): Location of the file.
+        append (bool): Add the records to the end of an existing file instead of overwriting it.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self, failed=False):
+        self._file.close()
+
+
+class CsvSink:
+    """
+    Writes records as CSV rows under a header line, flushing after every record.
+
+    Args:
+        path (str): Location of the file.
+        columns (list): The columns, in order. Defaults to RECORD_COLUMNS.
+        append (bool): Add the rows to the end of an existing file instead of overwriting it. The header is only
+            written to an empty file.
+    """
+
+    def __init__(self, path, columns=None, append=False):
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=columns or RECORD_COLUMNS, extrasaction='ignore')
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def close(self, failed=False):
+        self._file.close()
+
+
+class ParquetSink:
+    """
+    Writes records to a Parquet file, one row group per batch. Every column is stored as a string. The file is
+    written under a temporary name and only takes its final name once closed, so readers never see a partial file. If
+    it is closed as failed, the temporary file is deleted and the previous file is left as it was.
+
+    Args:
+        path (str): Location of the file.
+        columns (list): The columns, in order. Defaults to RECORD_COLUMNS.
+        batch_size (int): Records per row group.
+        append (bool): Start with the row groups of the existing file, one at a time, instead of overwriting it.
+    """
+
+    def __init__(self, path, columns=None, batch_size=200, append=False):
+        self.path = path
+        self.columns = list(columns or RECORD_COLUMNS)
+        self.batch_size = batch_size
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._writer = pq.ParquetWriter(path + '.tmp', self._schema)
+        self._batch = []
+        if append and os.path.exists(path):
+            try:
+                with pq.ParquetFile(path) as existing:
+                    for i in range(existing.num_row_groups):
+                        self._writer.write_table(existing.read_row_group(i, columns=self.columns).cast(self._schema))
+            except Exception:
+                self.close(failed=True)
+                raise
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        table = pa.table({column: [None if record.get(column) is None else str(record[column])
+                                   for record in self._batch] for column in self.columns}, schema=self._schema)
+        self._writer.write_table(table)
+        self._batch = []
+
+    def close(self, failed=False):
+        if failed:
+            self._writer.close()
+            os.remove(self.path + '.tmp')
+            return
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+        os.replace(self.path + '.tmp', self.path)
+
+
+class ArticleStoreSink:
+    """
+    Appends records to the article store in batches. Each batch becomes a part file of its partition, and articles
+    already stored are skipped as with append_articles; compact_store merges the part files.
+
+    Args:
+        columns (list): Columns to store. Defaults to RECORD_COLUMNS.
+        batch_size (int): Records per append.
+    """
+
+    def __init__(self, columns=None, batch_size=200):
+        self.columns = list(columns or RECORD_COLUMNS)
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch = []
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        self.written += append_articles(pd.DataFrame(self._batch, columns=self.columns), self.columns)
+        self._batch = []
+
+    def close(self, failed=False):
+        self.flush()
+
+
+class CatalogSink:
+    """
+    Adds records to the article catalog in batches, one transaction per batch.
+
+    Args:
+        batch_size (int): Records per transaction.
+        path (str): Location of the catalog. Defaults to CATALOG_PATH.
+    """
+
+    def __init__(self, batch_size=200, path=CATALOG_PATH):
+        self.batch_size = batch_size
+        self.written = 0
+        self._catalog = ArticleCatalog(path)
+        self._batch = []
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        self.written += self._catalog.add_records(self._batch)
+        self._batch = []
+
+    def close(self, failed=False):
+        try:
+            self.flush()
+        finally:
+            self._catalog.close()
+
+
+# =============================================================================
+# Journal Sink
+# =============================================================================
+def paper_to_record(paper, journal_website, journal_name):
+    """
+    Returns the record of a paper.
+
+    Args:
+        paper (list): [volume_issue, [title, authors, abstract]], as returned by an ArticleParser.
+        journal_website (str): The publisher, e.g. 'Wiley'.
+        journal_name (str): The name of the journal.
+
+    Returns:
+        dict: The paper's fields under RECORD_COLUMNS.
+    """
+
+    volume_issue, (title, authors, abstract) = paper
+    volume, issue = split_volume_issue(volume_issue)
+    return {
+        'Journal_Website': journal_website,
+        'Journal_Name': journal_name,
+        'Key': generate_key(journal_website, journal_name, volume, issue, title),
+        'Volume_Issue': volume_issue,
+        'Title': title,
+        'Authors': authors,
+        'Abstract': abstract,
+    }
+
+
+class JournalSink:
+    """
+    Turns the papers of one journal into records and writes each to every sink. Used as a context manager, it is
+    closed on leaving the block, as failed if the block raised.
+
+    Args:
+        journal_website (str): The publisher, e.g. 'Wiley'.
+        journal_name (str): The name of the journal.
+        sinks (list): The sinks to write to.
+    """
+
+    def __init__(self, journal_website, journal_name, sinks):
+        self.journal_website = journal_website
+        self.journal_name = journal_name
+        self.sinks = sinks
+        self.count = 0
+
+    def write(self, paper):
+        record = paper_to_record(paper, self.journal_website, self.journal_name)
+        for sink in self.sinks:
+            sink.write(record)
+        self.count += 1
+
+    def close(self, failed=False):
+        """
+        Writes the buffered records and closes every sink, even if one of them fails.
+
+        Args:
+            failed (bool): The journal stopped with an error. The Parquet file is then left as it was, while the
+                records already written to the other sinks are kept, as an interrupted run resumes from them.
+        """
+
+        errors = []
+        for sink in self.sinks:
+            try:
+                sink.close(failed)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        # The journal's own error is the one raised
+        try:
+            self.close(failed=True)
+        except Exception as e:
+            print(f"Could not close the sinks of {self.journal_name}: {e}")
+
+
+def open_journal_sink(file_stem, journal_website, journal_name, formats=None, append=False):
+    """
+    Opens the sinks of a journal, one per format. If a sink cannot be opened, the sinks already opened are closed.
+
+    Args:
+        file_stem (str): Name of the journal's files under DATA_PATH, without extension, e.g. 'wiley_The Journal of
+            Finance'.
+        journal_website (str): The publisher, e.g. 'Wiley'.
+        journal_name (str): The name of the journal.
+        formats (tuple): Any of SINK_FORMATS. Defaults to the configured formats.
+        append (bool): Add to the journal's JSON Lines, CSV and Parquet files instead of overwriting them, for runs
+            that only scrape part of the journal.
+
+    Returns:
+        JournalSink: The journal's sink, to be closed once its articles are written, e.g. by a with block.
+    """
+
+    sinks = []
+    try:
+        for sink_format in formats or _config['formats']:
+            if sink_format == 'jsonl':
+                sinks.append(JsonLinesSink(os.path.join(DATA_PATH, f'{file_stem}.jsonl'), append))
+            elif sink_format == 'csv':
+                sinks.append(CsvSink(os.path.join(DATA_PATH, f'{file_stem}.csv'), append=append))
+            elif sink_format == 'parquet':
+                sinks.append(ParquetSink(os.path.join(DATA_PATH, f'{file_stem}.parquet'),
+                                         batch_size=_config['batch_size'], append=append))
+            elif sink_format == 'store':
+                sinks.append(ArticleStoreSink(batch_size=_config['batch_size']))
+            elif sink_format == 'catalog':
+                sinks.append(CatalogSink(batch_size=_config['batch_size']))
+            else:
+                raise ValueError(f"Unknown record sink format '{sink_format}', expected one of {SINK_FORMATS}")
+    except Exception:
+        # Nothing has been written yet, so the opened sinks are only closed to release their files and connections
+        for sink in sinks:
+            try:
+                sink.close(failed=True)
+            except Exception as e:
+                print(f"Could not close a {type(sink).__name__}: {e}")
+        raise
+    return JournalSink(journal_website, journal_name, sinks)
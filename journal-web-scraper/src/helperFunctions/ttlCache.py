@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+TTL Cache
+
+This module keeps values that are slow to look up, such as a journal's latest volume or its issue archive, in a JSON
+file under DATA_PATH between runs. Each entry records when it was checked; once it is older than its time-to-live the
+value is looked up again, and if that lookup fails the cached value is used rather than stopping the journal. The file
+is written to a temporary file and then moved over the old one, so a run that is interrupted, or another process
+reading at the same time, never sees a half-written cache. Before writing, the entries other processes saved in the
+meantime are read back, so concurrent workers do not drop each other's entries.
+
+Classes:
+    TtlCache(file_name, value_field, default_ttl, ttls): A JSON file of values with a time-to-live, keyed by
+        'publisher/journal_name'.
+
+Usage:
+    _latest_volumes = TtlCache('latest_volumes.json', 'volume', DEFAULT_TTL, LATEST_VOLUME_TTLS)
+    latest_vol = _latest_volumes.get(f"wiley/{name}", lambda: get_latest_volume_number_wiley(volume_url, wait_time),
+                                     description=f"latest volume of {name}")
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import os.path
+import threading
+import time
+from config import DATA_PATH
+from src.helperFunctions.jsonHelpers import load_json_as_dict, save_dict_as_json
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+class TtlCache:
+    """
+    A JSON file of values with a time-to-live. Every entry is stored as {value_field: value, 'checked': timestamp}.
+
+    Args:
+        file_name (str): Name of the cache file under DATA_PATH.
+        value_field (str): Name the value is stored under in each entry.
+        default_ttl (int): Seconds an entry stays valid.
+        ttls (dict): Per-key time-to-live overrides. The dict is read on every lookup, so later changes apply.
+    """
+
+    def __init__(self, file_name, value_field, default_ttl, ttls=None):
+        self.file_name = file_name
+        self.value_field = value_field
+        self.default_ttl = default_ttl
+        self.ttls = ttls if ttls is not None else {}
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _read_file(self):
+        return load_json_as_dict(self.file_name) if os.path.exists(os.path.join(DATA_PATH, self.file_name)) else {}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def _save(self, key, entry):
+        # Entries saved by other processes since this one loaded the file are kept
+        entries = self._read_file()
+        if entry is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = entry
+        save_dict_as_json(entries, self.file_name)
+        self._entries = entries
+
+    def get(self, key, lookup, ttl=None, refresh=None, description=None):
+        """
+        Returns the value of a key, looking it up again once the cached entry has expired.
+
+        Args:
+            key (str): The key, e.g. 'wiley/The Journal of Finance'.
+            lookup (callable): Returns the value when nothing is cached.
+            ttl (int): Seconds the cached entry stays valid. Defaults to the key's override or default_ttl.
+            refresh (callable): Called with the expired value to return the updated one. Defaults to lookup().
+            description (str): Names the value in the message printed when a refresh fails. Defaults to the key.
+
+        Returns:
+            The cached or refreshed value.
+
+        Raises:
+            Exception: Whatever lookup() raised, if the key has no cached value to fall back on.
+        """
+
+        if ttl is None:
+            ttl = self.ttls.get(key, self.default_ttl)
+
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is not None and time.time() - entry['checked'] < ttl:
+            return entry[self.value_field]
+
+        try:
+            value = lookup() if entry is None or refresh is None else refresh(entry[self.value_field])
+        except Exception as e:
+            if entry is None:
+                raise
+            print(f"Could not refresh the {description or key} ({e}), using the cached value")
+            return entry[self.value_field]
+
+        with self._lock:
+            self._save(key, {self.value_field: value, 'checked': time.time()})
+            return self._entries[key][self.value_field]
+
+    def peek(self, key):
+        """
+        Returns the cached value of a key, however old, without looking it up.
+
+        Returns:
+            The cached value, or None if the key has no entry.
+        """
+
+        with self._lock:
+            entry = self._load().get(key)
+        return entry[self.value_field] if entry is not None else None
+
+    def invalidate(self, key):
+        """
+        Forces the next get call for a key to look its value up again.
+
+        Args:
+            key (str): The key.
+        """
+
+        with self._lock:
+            if key in self._load():
+                self._save(key, None)
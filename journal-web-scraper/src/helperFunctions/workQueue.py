@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+"""
+Work Queue
+
+This module keeps a queue of scrape tasks in a SQLite database that any number of worker processes pull from. A worker
+leases a task for a limited time; the task is marked done when the worker completes it, or becomes available to other
+workers again when the worker fails or its lease expires (e.g. because the process or machine died). A failed task is
+retried after a growing delay until it has been attempted max_attempts times, after which it is marked failed.
+Completing a task can add follow-up tasks in the same transaction, so a worker that finds the papers of an issue
+enqueues their article tasks atomically. Tasks are unique per (kind, key), so enqueuing the same task twice is a
+no-op.
+
+Every operation is a short transaction, so the database can be shared by the worker processes of one machine, or by
+several machines through a filesystem that supports SQLite locking. The WorkQueue methods are the only interface the
+distributed runner uses, so a networked queue can replace this class without touching the workers.
+
+Classes:
+    WorkQueue(path, lease_seconds, max_attempts, retry_delay): A SQLite-backed task queue with leases and retries.
+
+Functions:
+    keep_lease(queue, task): Context manager renewing a task's lease in the background while the task runs.
+
+Usage:
+    queue = WorkQueue(os.path.join(DATA_PATH, 'work_queue.sqlite'))
+    queue.enqueue('journal', 'wiley/The Journal of Finance', {'publisher': 'wiley', 'journal': 'The Journal of Finance'})
+    task = queue.lease('worker-1')
+    with keep_lease(queue, task):
+        children = [('issue', url, {'url': url}) for url in get_issue_urls_wiley(name, 1, 15)]
+    queue.complete(task, result=None, children=children)
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from config import DATA_PATH
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+QUEUE_PATH = os.path.join(DATA_PATH, 'work_queue.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, task_key)
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, priority, available_at);
+"""
+
+# Task statuses:
+#     'pending': waiting for a worker, possibly after a failed attempt
+#     'leased': held by a worker until lease_expires
+#     'done': completed, with its result
+#     'failed': failed max_attempts times
+#     'collected': done and its result saved by the coordinator
+TASK_STATUSES = ('pending', 'leased', 'done', 'failed', 'collected')
+
+
+# =============================================================================
+# Queue
+# =============================================================================
+class WorkQueue:
+    """
+    A SQLite-backed task queue with leases and retries.
+
+    Args:
+        path (str): Location of the SQLite database.
+        lease_seconds (int): Time a worker holds a task before other workers may take it over.
+        max_attempts (int): Number of times a task is tried before it is marked failed.
+        retry_delay (int): Seconds before a failed task is retried, multiplied by the number of attempts so far.
+    """
+
+    def __init__(self, path=QUEUE_PATH, lease_seconds=600, max_attempts=3, retry_delay=30):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never lease the same task
+        return _Transaction(self._connection, self._lock)
+
+    def enqueue(self, kind, key, payload, priority=0):
+        """
+        Adds a task unless a task of the same kind and key already exists.
+
+        Args:
+            kind (str): Kind of task, e.g. 'issue'.
+            key (str): Identifies the task within its kind, e.g. the issue URL.
+            payload (dict): JSON-serialisable arguments of the task.
+            priority (int): Tasks with a higher priority are leased first.
+
+        Returns:
+            bool: True if the task was added.
+        """
+
+        with self._transaction() as connection:
+            return _insert(connection, kind, key, payload, priority)
+
+    def lease(self, worker_id, kinds=None):
+        """
+        Leases the next available task: the highest priority pending task, or a task whose lease has expired.
+
+        Args:
+            worker_id (str): Identifies the worker, recorded as the lease owner.
+            kinds (list): Only lease tasks of these kinds. Defaults to every kind.
+
+        Returns:
+            dict: The task, with id, kind, key, payload and attempts, or None if no task is available.
+        """
+
+        now = time.time()
+        kind_filter, kind_args = "", []
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            kind_args = list(kinds)
+
+        with self._transaction() as connection:
+            # Tasks whose worker died are given up once they have used all their attempts
+            connection.execute("UPDATE tasks SET status = 'failed', error = 'Lease expired', updated_at = ? "
+                               "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                               (now, now, self.max_attempts))
+            row = connection.execute(
+                "SELECT id, kind, task_key, payload, attempts FROM tasks "
+                "WHERE ((status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?))"
+                + kind_filter + " ORDER BY priority DESC, id LIMIT 1",
+                [now, now] + kind_args
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                               "lease_expires = ?, updated_at = ? WHERE id = ?",
+                               (worker_id, now + self.lease_seconds, now, row[0]))
+
+        return {'id': row[0], 'kind': row[1], 'key': row[2], 'payload': json.loads(row[3]), 'attempts': row[4] + 1,
+                'worker_id': worker_id}
+
+    def renew(self, task):
+        """
+        Extends the lease of a task that is taking long.
+
+        Returns:
+            bool: False if the lease was lost to another worker.
+        """
+
+        now = time.time()
+        with self._transaction() as connection:
+            cursor = connection.execute("UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                                        "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                                        (now + self.lease_seconds, now, task['id'], task['worker_id']))
+            return cursor.rowcount == 1
+
+    def complete(self, task, result=None, children=()):
+        """
+        Marks a leased task as done and adds its follow-up tasks, in one transaction.
+
+        Args:
+            task (dict): The task returned by lease().
+            result: JSON-serialisable result of the task.
+            children (iterable): Follow-up tasks as (kind, key, payload) or (kind, key, payload, priority).
+
+        Returns:
+            bool: False if the lease was lost to another worker, in which case nothing is recorded.
+        """
+
+        with self._transaction() as connection:
+            cursor = connection.execute("UPDATE tasks SET status = 'done', result = ?, error = NULL, "
+                                        "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                                        "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                                        (json.dumps(result), time.time(), task['id'], task['worker_id']))
+            if cursor.rowcount != 1:
+                return False
+            for child in children:
+                _insert(connection, *child)
+            return True
+
+    def fail(self, task, error):
+        """
+        Records a failed attempt of a leased task. The task is retried after a delay, or marked failed once it has
+        been attempted max_attempts times.
+
+        Args:
+            task (dict): The task returned by lease().
+            error (str): Description of the failure.
+        """
+
+        now = time.time()
+        status = 'failed' if task['attempts'] >= self.max_attempts else 'pending'
+        with self._transaction() as connection:
+            connection.execute("UPDATE tasks SET status = ?, error = ?, available_at = ?, lease_owner = NULL, "
+                               "lease_expires = NULL, updated_at = ? "
+                               "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                               (status, str(error), now + self.retry_delay * task['attempts'], now, task['id'],
+                                task['worker_id']))
+
+    def get_done(self, kind):
+        """
+        Returns the completed tasks of a kind whose results have not been collected yet.
+
+        Returns:
+            list: (id, payload, result) of every task.
+        """
+
+        with self._lock:
+            rows = self._connection.execute("SELECT id, payload, result FROM tasks "
+                                            "WHERE kind = ? AND status = 'done' ORDER BY id", (kind,)).fetchall()
+        return [(row[0], json.loads(row[1]), json.loads(row[2])) for row in rows]
+
+    def mark_collected(self, task_ids):
+        """
+        Marks completed tasks whose results have been saved.
+        """
+
+        with self._transaction() as connection:
+            connection.executemany("UPDATE tasks SET status = 'collected', updated_at = ? WHERE id = ?",
+                                   [(time.time(), task_id) for task_id in task_ids])
+
+    def retry_failed(self):
+        """
+        Makes every failed task available again with a fresh set of attempts.
+
+        Returns:
+            int: Number of tasks requeued.
+        """
+
+        with self._transaction() as connection:
+            return connection.execute("UPDATE tasks SET status = 'pending', attempts = 0, available_at = 0, "
+                                      "updated_at = ? WHERE status = 'failed'", (time.time(),)).rowcount
+
+    def counts(self):
+        """
+        Returns the number of tasks of each kind in each status.
+
+        Returns:
+            dict: Maps kind to a dict mapping status to count.
+        """
+
+        with self._lock:
+            rows = self._connection.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+        counts = {}
+        for kind, status, count in rows:
+            counts.setdefault(kind, dict.fromkeys(TASK_STATUSES, 0))[status] = count
+        return counts
+
+    def is_drained(self):
+        """
+        Returns True once no task is pending or leased, i.e. no worker has anything left to do.
+        """
+
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1"
+                                           ).fetchone()
+        return row is None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+@contextmanager
+def keep_lease(queue, task):
+    """
+    Renews a task's lease from a background thread every third of the lease time while the block runs, so a task that
+    takes longer than lease_seconds is not leased again by another worker. The heartbeat stops if the lease is lost.
+
+    Args:
+        queue (WorkQueue): The queue the task was leased from.
+        task (dict): The task returned by lease().
+    """
+
+    stopped = threading.Event()
+
+    def heartbeat():
+        while not stopped.wait(queue.lease_seconds / 3):
+            try:
+                if not queue.renew(task):
+                    print(f"Lost the lease of {task['kind']} task {task['key']}")
+                    return
+            except sqlite3.Error as e:
+                print(f"Could not renew the lease of {task['kind']} task {task['key']}: {e}")
+
+    thread = threading.Thread(target=heartbeat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+class _Transaction:
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self._connection.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        finally:
+            self._lock.release()
+
+
+def _insert(connection, kind, key, payload, priority=0):
+    cursor = connection.execute("INSERT OR IGNORE INTO tasks (kind, task_key, payload, priority, updated_at) "
+                                "VALUES (?, ?, ?, ?, ?)", (kind, key, json.dumps(payload), priority, time.time()))
+    return cursor.rowcount == 1
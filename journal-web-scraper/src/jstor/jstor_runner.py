@@ -1,26 +1,34 @@
 # -*- coding: utf-8 -*-
 
 
-# Currently not in use ///////////////////////////////////
-
-
 # =============================================================================
 # Jstor Journal Web Scraper
 # =============================================================================
 """
 This module provides a web scraping tool to extract data from academic
 journals hosted on JSTOR. It uses Python with the Selenium library and
-Firefox web driver to automate the process of accessing journal webpages
+the pooled Firefox browsers to automate the process of accessing journal webpages
 and collecting information such as article titles, authors, abstracts, and
-issue/volume details. The data is saved in JSON format.
+issue/volume details. The data is saved in JSON Lines format and the article store.
+
+JSTOR's issue URLs are read from the journal page. The resulting volume -> issue -> URL listing is cached on disk (see
+helperFunctions/issueArchive.py); once it expires only the newest REFRESH_DECADES decades of the page are opened again
+and merged into it, so the back catalog is crawled once per journal.
 
 Functions:
-    scrape_jstor_journal(journal_name, volumes, issues, get_link_dicts=True): Scrapes articles
-        from a specified JSTOR journal.
+    get_issue_archive_jstor(name, wait_time, ttl): Returns the cached volume -> issue -> URL listing of a JSTOR journal.
+    get_issue_urls_jstor(name, num_prev_vols, wait_time): Lists the issue pages of the latest volumes of a JSTOR journal.
+    automatic_scrape_jstor_journal(name, num_prev_vols, wait_time): Automatically scrapes articles from a specified JSTOR journal.
+    scrape_jstor_journal(journal_name, volumes, issues, get_link_dicts, wait_time): Scrapes articles
+        from a specified JSTOR journal based on provided volumes and issues.
+    scrape_multiple_jstor_journals(journal_list, num_prev_vols, wait_time): Scrapes multiple JSTOR journals.
 
 Usage:
     To scrape a specific journal:
         scrape_jstor_journal('journal-name', [volume_numbers], [issue_numbers])
+
+    To scrape the latest volumes of multiple journals:
+        scrape_multiple_jstor_journals(['journal1', 'journal2'], num_prev_vols, wait_time)
 """
 
 # =============================================================================
@@ -30,78 +38,187 @@ Usage:
 # General Modules
 import os.path
 import sys
-import json
-from tqdm import tqdm
-from config import USER_PATH, DATA_PATH
+from config import USER_PATH
 
 
 # Developed Modules
 sys.path.append(os.path.join(USER_PATH, 'src'))
-from src.helperFunctions.jsonHelpers import save_dict_as_json, load_json_as_dict
-from src.jstor.web_scraper_jstor import get_papers_link_jstor, get_abstract_info_jstor, get_volume_and_issue_data_jstor, \
-    get_link_from_dict_jstor
+from src.jstor.web_scraper_jstor import get_papers_link_jstor, get_volume_and_issue_data_jstor, \
+    get_link_from_dict_jstor, JSTOR_ARTICLE_PARSER
+from src.helperFunctions.recordSink import open_journal_sink
+from src.helperFunctions.parallelAbstracts import get_abstracts
+from src.helperFunctions.linkDiscovery import discover_links
+from src.helperFunctions.jobJournal import JobJournal
+from src.helperFunctions.failureLedger import FailureLedger, ISSUE_STAGES, ARTICLE_STAGES
+from src.helperFunctions.metrics import timed
+from src.helperFunctions.harvestIndex import HarvestIndex, seed_from_store
+from src.helperFunctions.issueArchive import get_issue_archive, merge_issue_archives, index_issue_archive, \
+    select_issue_urls
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Decades of the journal page opened again when the cached listing has expired
+REFRESH_DECADES = 1
 
 
 # =============================================================================
 # Scraper/Saver
 # =============================================================================
-def scrape_jstor_journal(journal_name, volumes, issues, get_link_dicts=True):
+def get_issue_archive_jstor(name, wait_time, ttl=None):
     """
-    Scrapes information from JSTOR journal webpages and saves it in a JSON file.
+    Returns the volume -> issue -> URL listing of a JSTOR journal. The first call opens every decade of the journal
+    page; once the cached listing has expired, only the newest REFRESH_DECADES decades are read and merged into it.
+
+    Args:
+        name (str): End of link for the specific journal, e.g. 'jecongrowth'.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        ttl (int): Seconds the cached listing stays valid. Defaults to the issue archive's time-to-live.
+
+    Returns:
+        volume_dict (dict): Maps each volume, newest first, to its [issue, url] pairs.
+    """
+
+    journal_url = f'https://www.jstor.org/journal/{name}'
+
+    # Merging also orders the volumes newest first
+    return get_issue_archive(
+        'jstor', name, lambda: merge_issue_archives({}, get_volume_and_issue_data_jstor(journal_url, wait_time)), ttl,
+        refresh=lambda volume_dict: merge_issue_archives(
+            volume_dict, get_volume_and_issue_data_jstor(journal_url, wait_time, REFRESH_DECADES))
+    )
+
+
+def get_issue_urls_jstor(name, num_prev_vols, wait_time):
+    """
+    Lists the issue pages of the latest volumes of a specified JSTOR journal.
+
+    Args:
+        name (str): End of link for the specific journal.
+        num_prev_vols (int): The number of previous volumes to scrape.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        url (list): URLs of the issue pages.
+    """
+
+    return select_issue_urls(get_issue_archive_jstor(name, wait_time), num_prev_vols)
+
+
+@timed('scrape_journal_seconds', publisher='jstor')
+def automatic_scrape_jstor_journal(name, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                   retry_failures=False):
+    """
+    Automatically scrapes articles from a specified JSTOR journal.
+
+    Args:
+        name (str): End of link for the specific journal.
+        num_prev_vols (int): The number of previous volumes to scrape.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        num_workers (int): Number of articles fetched at the same time.
+        incremental (bool): Only scrape the articles not harvested by an earlier run.
+        retry_failures (bool): Only scrape the issue pages and articles recorded in the journal's failure ledger.
+
+    Returns:
+        None: Writes the scraped articles to the record sinks.
+    """
+
+    # Open the journal's checkpoints, failure ledger and harvest index; they are closed even if the scrape fails,
+    # and the checkpoints are kept so the next run resumes
+    failure_ledger = FailureLedger('jstor', name)
+    job_journal = JobJournal(f'jstor_{name}')
+    harvest_index = HarvestIndex(f'jstor_{name}')
+    try:
+        # Retry runs only revisit the issue pages and articles that failed in earlier runs
+        if retry_failures:
+            url = failure_ledger.get_urls(ISSUE_STAGES)
+        else:
+            url = get_issue_urls_jstor(name, num_prev_vols, wait_time)
+
+        # Get links for each paper in one browser session, skipping issues already recorded by an interrupted run
+        html_list = discover_links(get_papers_link_jstor, url, wait_time, job_journal, failure_ledger)
+
+        # Only open the article pages of papers not harvested by an earlier run
+        if incremental:
+            # A journal scraped before the harvest index existed starts from the issues already in the article store
+            seed_from_store(harvest_index, job_journal.get_issue_links(), 'jstor', name, 'JSTOR')
+            html_list = harvest_index.filter_new(html_list)
+        if retry_failures:
+            # Articles that failed to parse are in the harvest index too, so the ledger's are added after the filter
+            html_list = list(dict.fromkeys(html_list + failure_ledger.get_urls(ARTICLE_STAGES)))
+        if not html_list:
+            print(f"No new articles for {name}")
+            job_journal.finish()
+            return
+
+        # Write every article to the record sinks as soon as it is extracted; articleStore.main() exports all_df.csv
+        with open_journal_sink(f'jstor_{name}', 'JSTOR', name, append=incremental or retry_failures) as journal_sink:
+            get_abstracts(JSTOR_ARTICLE_PARSER, html_list, wait_time, name, num_workers, job_journal, failure_ledger,
+                          journal_sink)
+
+        harvest_index.add(job_journal.get_recorded_urls())
+
+        # Results are saved, the checkpoints are no longer needed
+        job_journal.finish()
+    finally:
+        harvest_index.close()
+        failure_ledger.close()
+        job_journal.close()
+
+
+def scrape_jstor_journal(journal_name, volumes, issues, get_link_dicts=False, wait_time=30, num_workers=1):
+    """
+    Scrapes information from JSTOR journal webpages and saves it in a JSON Lines file.
 
     Args:
         journal_name (str): End of link for specific journal.
         volumes (list of int): Volume numbers to scrape.
-        issues (list of int): Issue numbers within each volume to scrape.
-        get_link_dicts (bool): Whether to retrieve link dictionaries.
+        issues (list of int): Issue numbers within each volume to scrape. Every issue of the volumes if empty.
+        get_link_dicts (bool): Whether to refresh the cached volume/issue links now instead of once they expire.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+        num_workers (int): Number of articles fetched at the same time.
 
     Returns:
-        None: Saves the scraped data to a JSON file.
+        None: Writes the scraped articles to a JSON Lines file.
     """
 
-    journal_url = f'https://www.jstor.org/journal/{journal_name}'
-    output_path = os.path.join(DATA_PATH, f'jstor_{journal_name}.json')
-
-    # Get volumne/issue links as url pattern is unclear
-    if get_link_dicts:
-        url_links = get_volume_and_issue_data_jstor(journal_url, 30)
-        save_dict_as_json(url_links, f'urldict_jstor_{journal_name}.json')
-    url_links_loaded = load_json_as_dict(f'urldict_jstor_{journal_name}.json')
+    # Get volume/issue links as url pattern is unclear
+    volume_dict = get_issue_archive_jstor(journal_name, wait_time, ttl=0 if get_link_dicts else None)
+    issue_index = index_issue_archive(volume_dict)
 
-    html_list = []
-    abstract_list = []
     url = []
 
     # Generate URLs
-    try:
-        for volume in volumes:
-            if issues:
-                for issue in issues:
-                    url.append(get_link_from_dict_jstor(url_links_loaded, volume, issue))
-            else:
-                pass
-    except Exception as e:
-        raise RuntimeError(f"URL generation failed: {e}")
-
-    # Get links for each paper with progress bar
-    for site in tqdm(url, desc="Getting paper links"):
-        try:
-            html_list = get_papers_link_jstor(site, html_list, 30)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get links for each paper: {e}")
+    for volume in volumes:
+        if issues:
+            for issue in issues:
+                link = get_link_from_dict_jstor(issue_index, volume, issue)
+                if link is None:
+                    print(f"No link found for volume {volume}, issue {issue} of {journal_name}")
+                else:
+                    url.append(link)
+        else:
+            url.extend(issue_index.get(int(volume), {}).values())
+
+    # Get links for each paper in one browser session
+    html_list = discover_links(get_papers_link_jstor, url, wait_time)
 
-    # Get Abstracts with progress bar
-    for i in tqdm(range(len(html_list)), desc="Getting abstracts"):
+    # Write every article to a JSON Lines file as soon as it is extracted
+    with open_journal_sink(f'jstor_{journal_name}', 'JSTOR', journal_name, formats=('jsonl',)) as journal_sink:
+        get_abstracts(JSTOR_ARTICLE_PARSER, html_list, wait_time, journal_name, num_workers, sink=journal_sink)
+
+
+# =============================================================================
+# Run Multiple
+# =============================================================================
+def scrape_multiple_jstor_journals(journal_list, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                   retry_failures=False):
+    for name in journal_list:
         try:
-            abstract = get_abstract_info_jstor(url_paper_list=html_list, paper_number=i, wait_time=30)
-            if abstract:
-                abstract_list.append(abstract)
+            automatic_scrape_jstor_journal(name, num_prev_vols, wait_time, num_workers, incremental, retry_failures)
         except Exception as e:
-            pass
-
-    # Write data to JSON file
-    with open(output_path, 'w') as json_file:
-        json.dump(abstract_list, json_file)
+            print(e)
 
 
 # =============================================================================
@@ -111,7 +228,7 @@ def main():
     volumes = [24]
     issues = [4]
 
-    scrape_jstor_journal(journal_name='jecongrowth', volumes=volumes, issues=issues, get_link_dicts=True)
+    scrape_jstor_journal(journal_name='jecongrowth', volumes=volumes, issues=issues)
 
 
 if __name__ == "__main__":
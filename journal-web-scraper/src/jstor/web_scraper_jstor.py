@@ -1,144 +1,173 @@
 # -*- coding: utf-8 -*-
 
-# Currently not in use ///////////////////////////////////
-
 """
 Web Scraper for Academic Journals - JSTOR Module
 
 This module provides a web scraping tool to extract data from academic journals available on JSTOR.
-It uses Python programming language and the Selenium library, along with Firefox and Chrome web drivers,
+It uses Python and the Selenium library with the pooled Firefox browsers (see helperFunctions/browserPool.py)
 to automate the process of accessing academic journal webpages and collecting relevant information like
 article titles, authors, abstracts, and other details. The tool is tailored for research purposes, enabling
 efficient data collection from JSTOR.
 
+JSTOR's issue URLs cannot be built from the volume and issue numbers, so they are read from the journal page, where
+the volumes are grouped by decade in accordions that only load their issues once opened. The whole page is read once
+per journal; later refreshes only open the newest decades (see jstor_runner.get_issue_archive_jstor).
+
 Functions:
-    get_volume_and_issue_data_jstor(url): Retrieves volume and issue data from a specified JSTOR journal.
-    get_link_from_dict_jstor(volume_dict, volume_number, issue_number): Gets the link for a specific volume and issue from the volume dictionary.
+    get_volume_and_issue_data_jstor(url, wait_time, num_decades): Retrieves volume and issue data from a specified JSTOR journal.
+    get_link_from_dict_jstor(issue_index, volume_number, issue_number): Gets the link for a specific volume and issue from the issue index.
     get_papers_link_jstor(url, html_list, wait_time): Collects URLs of papers from a JSTOR journal's webpage.
-    get_abstract_info_jstor(url_paper_list, paper_number, wait_time): Extracts detailed information from a paper's webpage on JSTOR.
+    get_abstract_info_jstor(url_paper_list, paper_number, wait_time, journal_name): Extracts detailed information from a paper's webpage on JSTOR.
 
 Usage:
     1. Retrieve volume and issue data:
-        volume_issue_data = get_volume_and_issue_data_jstor(journal_url)
+        volume_issue_data = get_volume_and_issue_data_jstor(journal_url, wait_time)
 
     2. Get a specific link for a volume and issue:
-        specific_link = get_link_from_dict_jstor(volume_issue_data, volume_number, issue_number)
+        specific_link = get_link_from_dict_jstor(index_issue_archive(volume_issue_data), volume_number, issue_number)
 
     3. Collect paper URLs:
         paper_urls = get_papers_link_jstor(specific_link, [], wait_time)
 
     4. Extract paper details:
-        paper_info = get_abstract_info_jstor(paper_urls, paper_index, wait_time)
+        paper_info = get_abstract_info_jstor(paper_urls, paper_index, wait_time, journal_name)
 """
 
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service as ServiceFF
-from selenium.webdriver.chrome.service import Service as ServiceC
+import re
+from urllib.parse import urljoin
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from config import GECKO_PATH, CHROME_PATH
+from src.helperFunctions.browserPool import borrow_browser
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.pageReadiness import READINESS_SPECS, load_page
+from src.helperFunctions.articleParser import ArticleParser
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_JSTOR = {
+    'title': ('text', "mfe-turnaway-pharos-heading[data-pharos-component='PharosHeading']"),
+    'authors': ('text', "p.content-meta-data__authors"),
+    'abstract': ('text', "div.turnaway-preview-appendix__section--prominent "
+                         "p.turnaway-preview-appendix__section-paragraph"),
+    'volume_issue': ('text', "mfe-turnaway-pharos-link[data-pharos-component='PharosLink']"),
+}
+
+# Returns [volume label, [issue links]] for every volume of the opened decades, in page order
+_VOLUMES_SCRIPT = """
+var decades = Array.prototype.slice.call(document.getElementsByClassName('decade'), 0, arguments[0]);
+var volumes = [];
+decades.forEach(function (decade) {
+    Array.prototype.forEach.call(decade.getElementsByClassName('year-volume-heading'), function (heading) {
+        var strong = heading.querySelector('strong');
+        var links = Array.prototype.map.call(heading.querySelectorAll('li collection-view-pharos-link'),
+                                             function (link) { return link.getAttribute('href'); });
+        volumes.push([strong ? strong.textContent.trim() : '', links]);
+    });
+});
+return volumes;
+"""
+
+# True once every opened decade has loaded its volumes
+_DECADES_LOADED_SCRIPT = """
+var decades = Array.prototype.slice.call(document.getElementsByClassName('decade'), 0, arguments[0]);
+return decades.every(function (decade) {
+    return decade.querySelector('.year-volume-heading li collection-view-pharos-link') !== null;
+});
+"""
 
 
 # =============================================================================
 # Functions
 # =============================================================================
-def get_volume_and_issue_data_jstor(url, wait_time):
+def get_volume_and_issue_data_jstor(url, wait_time, num_decades=None):
     """
     Retrieves volume and issue data from the specified JSTOR journal URL.
 
     Args:
         url (str): URL of the JSTOR journal page to scrape.
+        wait_time (int): Longest time to wait for the page, and then for the opened decades, to load.
+        num_decades (int): Number of decades to open, newest first. Defaults to every decade.
 
     Returns:
         volume_dict (dict): A dictionary mapping each volume to its issues and corresponding URLs.
-    """
-
-    def click_dropdowns():
-        details_elements = browser.find_elements(By.CLASS_NAME, "decade")
-
-        for detail in details_elements:
-            # Scroll the detail element into view
-            browser.execute_script("arguments[0].scrollIntoView(true);", detail)
-            time.sleep(1)  # Short wait after scrolling
-
-            try:
-                # Try clicking the element
-                if not detail.get_attribute('open'):
-                    detail.click()
-                    time.sleep(wait_time)  # Wait for content to load
-            except Exception:
-                # If click fails, use JavaScript to forcibly click the element
-                browser.execute_script("arguments[0].click();", detail)
 
+    Raises:
+        TimeoutException: If the opened decades did not load their issues within the wait, so a partial listing never
+            replaces a cached one.
+    """
 
-    service = ServiceC(CHROME_PATH)
-    browser = webdriver.Chrome(service=service)
     base_url = "https://www.jstor.org"
-    browser.get(url)
-
-    time.sleep(wait_time)
-
-    click_dropdowns()
-
-    time.sleep(wait_time)
+    timeout = wait_time or READINESS_SPECS['jstor']['timeout']
 
     # Dictionary to store volume: [(issue_number, link)]
     volume_dict = {}
 
-    # Find all decade sections
-    decade_elements = browser.find_elements(By.CLASS_NAME, "decade")
-    for decade in decade_elements:
-        # Find all volume elements within this decade
-        volume_elements = decade.find_elements(By.CLASS_NAME, "year-volume-heading")
-
-        for volume_element in volume_elements:
-            volume_strong = volume_element.find_element(By.TAG_NAME, "strong")
-            volume = volume_strong.text.split('(')[1].split(')')[
-                0] if '(' in volume_strong.text else volume_strong.text  # Extract volume number
+    with borrow_browser() as browser:
+        load_page(browser, url, 'jstor', 'issue_archive', wait_time)
 
-            issue_elements = volume_element.find_elements(By.TAG_NAME, "li")
+        decade_elements = browser.find_elements(By.CLASS_NAME, "decade")
+        if num_decades is None:
+            num_decades = len(decade_elements)
 
-            issue_list = []
-            issue_num = len(issue_elements)  # Start with the number of issues as the highest issue number
-            for issue in issue_elements:
-                # Extracting the link
-                link_element = issue.find_element(By.TAG_NAME, "collection-view-pharos-link")
-                link = link_element.get_attribute('href')
-                if not link.startswith('http'):
-                    link = base_url + link  # Construct the full URL if it's a relative link
-
-                issue_list.append((str(issue_num), link))
-                issue_num -= 1  # Decrease the issue number for the next issue
+        for detail in decade_elements[:num_decades]:
+            if detail.get_attribute('open'):
+                continue
+            browser.execute_script("arguments[0].scrollIntoView(true);", detail)
+            try:
+                detail.click()
+            except WebDriverException:
+                # If click fails, use JavaScript to forcibly click the element
+                browser.execute_script("arguments[0].click();", detail)
 
+        # Wait for the opened decades to load their issues instead of sleeping after every click
+        try:
+            WebDriverWait(browser, timeout, poll_frequency=0.25).until(
+                lambda driver: driver.execute_script(_DECADES_LOADED_SCRIPT, num_decades)
+            )
+        except TimeoutException:
+            raise TimeoutException(f"Not every decade of {url} loaded within {timeout} seconds")
+
+        volumes = browser.execute_script(_VOLUMES_SCRIPT, num_decades)
+
+    for volume_text, links in volumes:
+        # Extract volume number
+        volume = volume_text.split('(')[1].split(')')[0] if '(' in volume_text else volume_text
+
+        issue_list = []
+        issue_num = len(links)  # Start with the number of issues as the highest issue number
+        for link in links:
+            if link:
+                issue_list.append((str(issue_num), urljoin(base_url, link)))
+            issue_num -= 1  # Decrease the issue number for the next issue
+
+        # A volume whose issues did not load is left out rather than listed without issues
+        if issue_list:
             volume_dict[volume] = issue_list
 
-    # browser.close()
     return volume_dict
 
 
-def get_link_from_dict_jstor(volume_dict, volume_number, issue_number):
+def get_link_from_dict_jstor(issue_index, volume_number, issue_number):
     """
-    Retrieves the link for a specific volume and issue from a volume dictionary.
+    Retrieves the link for a specific volume and issue from an issue index.
 
     Args:
-        volume_dict (dict): A dictionary containing volume and issue data.
+        issue_index (dict): Maps each volume number to its issues and URLs, see issueArchive.index_issue_archive.
         volume_number (int): The volume number.
         issue_number (int): The issue number within the volume.
 
     Returns:
-        str: URL link for the specified volume and issue, or a message if not found.
+        str: URL link for the specified volume and issue, or None if not found.
     """
-    volume_key = f"Vol. {volume_number}"
-    if volume_key in volume_dict:
-        for issue in volume_dict[volume_key]:
-            if issue[0] == str(issue_number):
-                return issue[1]
-    return "No link found for the specified volume and issue."
+
+    return issue_index.get(int(volume_number), {}).get(str(issue_number))
 
 
 def get_papers_link_jstor(url, html_list, wait_time):
@@ -148,57 +177,74 @@ def get_papers_link_jstor(url, html_list, wait_time):
     Args:
         url (str): URL of the journal's webpage.
         html_list (list): List to store the paper URLs.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         html_list (list): Updated list with URLs of papers.
     """
-    time.sleep(wait_time)
-    service = ServiceC(CHROME_PATH)
-    browser = webdriver.Chrome(service=service)
-    browser.get(url)
-    time.sleep(wait_time)
 
-    # Find all <div> elements with class 'stable' which contains the paper links
-    links = browser.find_elements(By.CSS_SELECTOR, "div.stable")
+    page = fetch_page(url, 'jstor', 'issue', wait_time)
 
-    for link in links:
-        paper_url = link.text  # Extract the URL text from the <div> element
+    # The <div> elements with class 'stable' contain the paper links as text
+    for paper_url in page.texts("div.stable"):
         if paper_url.startswith("http"):  # Ensure it's a valid URL
             html_list.append(paper_url)
 
-    browser.close()
     return html_list
 
 
-def get_abstract_info_jstor(url_paper_list, paper_number, wait_time):
+def build_paper_jstor(fields, journal_name):
+    """
+    Builds the paper of a JSTOR article from the fields read with ARTICLE_FIELDS_JSTOR.
+
+    Args:
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
+
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
+
+    return [_reformat_volume_issue(fields['volume_issue']), [fields['title'], fields['authors'], fields['abstract']]]
+
+
+JSTOR_ARTICLE_PARSER = ArticleParser('jstor', ARTICLE_FIELDS_JSTOR, build_paper_jstor)
+
+
+def get_abstract_info_jstor(url_paper_list, paper_number, wait_time, journal_name):
     """
     Retrieves detailed information of a specific paper from JSTOR.
 
     Args:
         url_paper_list (list): List of paper URLs.
         paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
+
     try:
-        time.sleep(wait_time)
-        service = ServiceC(CHROME_PATH)
-        browser = webdriver.Chrome(service=service)
-        browser.get(url_paper_list[paper_number])
-        time.sleep(wait_time)
-        title = browser.find_element(By.CSS_SELECTOR,
-                                     "mfe-turnaway-pharos-heading[data-pharos-component='PharosHeading']").text
-        authors = browser.find_element(By.CSS_SELECTOR, "p.content-meta-data__authors").text
-        abstract = browser.find_element(By.CSS_SELECTOR,
-                                        "div.turnaway-preview-appendix__section--prominent p.turnaway-preview-appendix__section-paragraph").text
-        issue_volume = browser.find_element(By.CSS_SELECTOR,
-                                            "mfe-turnaway-pharos-link[data-pharos-component='PharosLink']").text
-        paper = [issue_volume, [title, authors, abstract]]
+        page = JSTOR_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = JSTOR_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         paper = []
 
-    browser.close()
     return paper
+
+
+def _reformat_volume_issue(volume_issue):
+    """
+    Reformats JSTOR's volume and issue line to the format of the other publishers.
+
+    Args:
+        volume_issue (str): The original volume and issue string, e.g., 'Vol. 24, No. 4 (December 2019)'
+
+    Returns:
+        str: Reformatted volume and issue string, e.g., 'Volume 24, Issue 4'
+    """
+
+    match = re.search(r"Vol\. (\d+)(?:, No\. (\d+))?", volume_issue)
+    if not match:
+        return volume_issue
+    return f"Volume {match.group(1)}, Issue {match.group(2) or 1}"
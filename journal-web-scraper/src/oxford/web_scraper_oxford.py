@@ -9,6 +9,7 @@ The tool is designed to assist in gathering data for academic research and analy
 
 Functions:
     get_latest_volume_number_oxford(url, wait_time): Retrieves the latest volume number from a specified Oxford journal.
+    get_volume_and_issue_data_oxford(name, num_years, wait_time): Retrieves the existing volumes and issues of an Oxford journal.
     get_num_issues_oxford(name): Retrieves the number of issues available for a specified Oxford journal.
     get_papers_link_oxford(url, html_list, wait_time): Retrieves URLs of papers from a specified Oxford journal webpage.
     get_abstract_info_oxford(url_paper_list, paper_number, wait_time): Extracts detailed information from an Oxford paper's webpage,
@@ -32,14 +33,24 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from config import GECKO_PATH
 import re
-import json
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.journalMetadata import get_journal_metadata
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.articleParser import ArticleParser
+from src.helperFunctions.issueArchive import parse_issue_links
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_OXFORD = {
+    'title': ('text', 'h1.wi-article-title'),
+    'authors': ('texts', 'div.wi-authors span.al-author-name-more button.linked-name'),
+    'abstract': ('text', 'section.abstract p'),
+    'volume': ('text', 'div.volume-issue__wrap .volume'),
+    'issue': ('text', 'div.volume-issue__wrap .issue'),
+}
 
 # =============================================================================
 # Functions
@@ -57,12 +68,7 @@ def get_num_issues_oxford(name):
         int or None: The number of issues if the journal is found, otherwise None.
     """
 
-    try:
-        with open('oxford_name_to_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('oxford/oxford_name_to_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('oxford')
 
     try:
         return name_dict[name]
@@ -76,35 +82,53 @@ def get_latest_volume_number_oxford(url, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         int: The latest volume number as an integer.
+
+    Raises:
+        ValueError: If the page shows no volume number.
     """
 
-    volume_number = 0
-    try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url)
+    page = fetch_page(url, 'oxford', 'latest_volume', wait_time)
 
-        # Wait for the page to render
-        time.sleep(wait_time)
+    # Find the volume element and extract the number
+    volume_text = page.text("span.volume")
+    match = re.search(r"Volume (\d+)", volume_text)
+    if not match:
+        raise ValueError(f"No volume number in '{volume_text}' on {url}")
 
-        # Find the volume element and extract the number
-        volume_element = browser.find_element(By.CSS_SELECTOR, "span.volume")
-        volume_text = volume_element.text
-        match = re.search(r"Volume (\d+)", volume_text)
-        if match:
-            volume_number = int(match.group(1))
+    return int(match.group(1))
 
-    except Exception as e:
-        print("Error: " + str(e))
 
-    finally:
-        browser.close()
+def get_volume_and_issue_data_oxford(name, num_years, wait_time):
+    """
+    Retrieves volume and issue data from the issue archive of an Oxford journal. When the archive only lists years,
+    the issues are read from the pages of its latest years.
+
+    Args:
+        name (str): The name of the Oxford journal, as in its URL.
+        num_years (int): The number of latest year pages to read when the archive only lists years.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        volume_dict (dict): A dictionary mapping each volume, newest first, to its issues and corresponding URLs.
+    """
 
-    return volume_number
+    base_url = f"https://academic.oup.com/{name}"
+    journal_url = "{}/issue/{{}}/{{}}".format(base_url)
+    issue_pattern = rf"/{name}/issue/(\d+)/(\d+)"
+
+    page = fetch_page(f"{base_url}/issue-archive", 'oxford', 'issue_archive', wait_time)
+    volume_dict = parse_issue_links([page], issue_pattern, journal_url.format)
+    if volume_dict:
+        return volume_dict
+
+    year_urls = sorted({link for link in page.links("a[href]") if re.search(r"/issue-archive/\d{4}$", link)},
+                       reverse=True)
+    year_pages = [fetch_page(year_url, 'oxford', 'issue_archive', wait_time) for year_url in year_urls[:num_years]]
+    return parse_issue_links(year_pages, issue_pattern, journal_url.format)
 
 
 def get_papers_link_oxford(url, html_list, wait_time):
@@ -113,35 +137,40 @@ def get_papers_link_oxford(url, html_list, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper_links (list): List of URLs of papers.
     """
 
-    # Initialize the browser
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
-    browser.get(url)
+    page = fetch_page(url, 'oxford', 'issue', wait_time)
 
-    # Wait for the page to render
-    time.sleep(wait_time)
+    # Find all article links, resolved to full URLs against the issue page
+    html_list.extend(page.links("h5.customLink.item-title a"))
 
-    # Find all elements that match the desired XPath
-    articles = browser.find_elements(By.XPATH, "//h5[@class='customLink item-title']/a")
+    return html_list
 
-    # Construct the full URL for each paper and add it to the list
-    base_url = "https://academic.oup.com"
 
-    for article in articles:
-        partial_link = article.get_attribute('href')
-        full_link = base_url + partial_link if partial_link.startswith("/doi") else partial_link
-        html_list.append(full_link)
+def build_paper_oxford(fields, journal_name):
+    """
+    Builds the paper of an Oxford article from the fields read with ARTICLE_FIELDS_OXFORD.
 
-    # Close the browser
-    browser.close()
+    Args:
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
 
-    return html_list
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
+
+    authors = ", ".join(fields['authors'])
+    abstract = re.sub(r'\\u\d{4}', '', fields['abstract'])
+    issue_volume = f"{fields['volume']}, {fields['issue']}"
+
+    return [issue_volume, [fields['title'], authors, abstract]]
+
+
+OXFORD_ARTICLE_PARSER = ArticleParser('oxford', ARTICLE_FIELDS_OXFORD, build_paper_oxford)
 
 
 def get_abstract_info_oxford(url_paper_list, paper_number, wait_time, journal_name):
@@ -151,44 +180,16 @@ def get_abstract_info_oxford(url_paper_list, paper_number, wait_time, journal_na
     Args:
         url_paper_list (list): List of paper URLs.
         paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
 
     try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
-
-        # Wait for the page to render
-        time.sleep(wait_time)
-
-        # Find the title
-        title = browser.find_element(By.CSS_SELECTOR, "h1.wi-article-title").text
-
-        # Find the authors
-        authors_elements = browser.find_elements(By.CSS_SELECTOR, "div.wi-authors span.al-author-name-more button.linked-name")
-        authors = ", ".join([author.text for author in authors_elements])
-
-        # Find the abstract
-        abstract = browser.find_element(By.CSS_SELECTOR, "section.abstract p").text
-        abstract = re.sub(r'\\u\d{4}', '', abstract)
-
-        # Find the volume and issue
-        volume = browser.find_element(By.CSS_SELECTOR, "div.volume-issue__wrap .volume").text
-        issue = browser.find_element(By.CSS_SELECTOR, "div.volume-issue__wrap .issue").text
-        issue_volume = f"{volume}, {issue}"
-
-        # key = generate_key('Oxford', journal_name, issue_volume.split(" ")[1].replace(',', ''), issue_volume.split(" ")[-1])
-        # paper = [key, issue_volume, [title, authors, abstract]]
-        paper = [issue_volume, [title, authors, abstract]]
+        page = OXFORD_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = OXFORD_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         paper = []
 
-    finally:
-        browser.close()
-
     return paper
-
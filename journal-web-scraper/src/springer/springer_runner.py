@@ -4,7 +4,7 @@
 Springer Journal Web Scraper
 
 This module provides automated tools for scraping academic articles from Springer journals. It extracts details such as article titles,
-authors, abstracts, and issue/volume information using Selenium with GeckoDriver for web scraping. The scraped data is saved in JSON format.
+authors, abstracts, and issue/volume information using Selenium with GeckoDriver for web scraping. The scraped data is saved in JSON Lines format and the article store.
 The module includes functions for both manual and automatic scraping of articles from specified journals.
 
 Functions:
@@ -28,42 +28,58 @@ Usage:
 # Packages
 # =============================================================================
 
-# General Modules
-from tqdm import tqdm
-import json
-import os.path
-import pandas as pd
-
 # Developed Modules
-from config import USER_PATH, DATA_PATH
 from src.springer.web_scraper_springer import get_latest_volume_number_springer, get_num_issues_springer, \
-    get_paper_number_from_name_springer, get_papers_link_springer, get_abstract_info_springer
-from src.helperFunctions.saving_to_dfs import process_file
+    get_paper_number_from_name_springer, get_papers_link_springer, SPRINGER_ARTICLE_PARSER, \
+    get_volume_and_issue_data_springer
+from src.helperFunctions.recordSink import open_journal_sink
+from src.helperFunctions.parallelAbstracts import get_abstracts
+from src.helperFunctions.linkDiscovery import discover_links
+from src.helperFunctions.jobJournal import JobJournal
+from src.helperFunctions.failureLedger import FailureLedger, ISSUE_STAGES, ARTICLE_STAGES
+from src.helperFunctions.metrics import timed
+from src.helperFunctions.harvestIndex import HarvestIndex, seed_from_store
+from src.helperFunctions.latestVolumeCache import get_latest_volume
+from src.helperFunctions.issueArchive import get_issue_archive, select_issue_urls
 
 # =============================================================================
 # Scraper/Savers
 # =============================================================================
 
-def automatic_scrape_springer_journal(name, num_prev_vols, wait_time):
+def get_issue_urls_springer(name, num_prev_vols, wait_time):
+    """
+    Lists the issue pages of the latest volumes of a specified Springer journal.
+
+    Args:
+        name (str): The name of the Springer journal.
+        num_prev_vols (int): The number of previous volumes to scrape.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        url (list): URLs of the issue pages.
+    """
+
     int_paper = get_paper_number_from_name_springer(name)
     volume_url = f"https://link.springer.com/journal/{int_paper}/volumes-and-issues"
     journal_url = "https://link.springer.com/journal/{}/volumes-and-issues/{{}}-{{}}".format(int_paper)
-    output_path = os.path.join(DATA_PATH, f'springer_{name}.json')
-    output_path_solo_df = os.path.join(DATA_PATH, f'springer_df.csv')
-    output_path_total_df = os.path.join(DATA_PATH, f'all_df.csv')
 
-    html_list = []
-    abstract_list = []
+    # Only list the issues that exist, falling back to the journal's usual issue count if the archive cannot be read
+    try:
+        volume_dict = get_issue_archive('springer', name,
+                                        lambda: get_volume_and_issue_data_springer(int_paper, wait_time))
+        return select_issue_urls(volume_dict, num_prev_vols)
+    except Exception as e:
+        print(f"Could not read the issue archive of {name} ({e}), listing issues from the journal metadata")
+
     url = []
 
     num_issues = get_num_issues_springer(name)
     issues = [i for i in range(1, num_issues + 1)]
-    latest_vol = get_latest_volume_number_springer(volume_url, wait_time)
+    latest_vol = get_latest_volume('springer', name,
+                                   lambda: get_latest_volume_number_springer(volume_url, wait_time))
     starting_vol = max(1, latest_vol - num_prev_vols + 1)
     volumes = [vol for vol in range(starting_vol, latest_vol + 1)]
 
-    print(latest_vol)
-
     # Generate URLs
     try:
         for volume in volumes:
@@ -75,53 +91,60 @@ def automatic_scrape_springer_journal(name, num_prev_vols, wait_time):
     except Exception as e:
         raise RuntimeError(f"URL generation failed: {e}")
 
-    # Get links for each paper
-    for site in tqdm(url, desc="Getting paper links"):
-        try:
-            html_list = get_papers_link_springer(site, html_list, wait_time)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get links for each paper: {e}")
-
-    # Get Abstracts with progress bar
-    for i in tqdm(range(len(html_list)), desc="Getting abstracts"):
-        try:
-            abstract = get_abstract_info_springer(url_paper_list=html_list, paper_number=i, wait_time=wait_time, journal_name=name)
-            if abstract:
-                abstract_list.append(abstract)
-
-        except Exception as e:
-            pass
+    return url
 
-    # Write data to JSON file
-    with open(output_path, 'w') as json_file:
-        json.dump(abstract_list, json_file)
 
-    #ToDo add UNIQUE KEY
-
-    # Convert to DataFrame
-    # df = pd.DataFrame(abstract_list, columns=['Key', 'Volume_Issue', 'Details'])
-    df = pd.DataFrame(abstract_list, columns=['Volume_Issue', 'Details'])
-    df[['Title', 'Authors', 'Abstract']] = pd.DataFrame(df['Details'].tolist(), index=df.index)
-    df.drop(columns=['Details'], inplace=True)
-
-    df.insert(0, 'Journal_Website', 'Springer')
-    df.insert(1, 'Journal_Name', name)
-
-    # columns = ['Journal_Website', 'Journal_Name', 'Key', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
-    columns = ['Journal_Website', 'Journal_Name', 'Volume_Issue', 'Title', 'Authors', 'Abstract']
-
-
-    process_file(output_path_solo_df, df, columns)
-    process_file(output_path_total_df, df, columns)
-
-
-def manual_scrape_springer_journals(name, volumes, issues, wait_time):
+@timed('scrape_journal_seconds', publisher='springer')
+def automatic_scrape_springer_journal(name, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                      retry_failures=False):
+    # Open the journal's checkpoints, failure ledger and harvest index; they are closed even if the scrape fails,
+    # and the checkpoints are kept so the next run resumes
+    failure_ledger = FailureLedger('springer', name)
+    job_journal = JobJournal(f'springer_{name}')
+    harvest_index = HarvestIndex(f'springer_{name}')
+    try:
+        # Retry runs only revisit the issue pages and articles that failed in earlier runs
+        if retry_failures:
+            url = failure_ledger.get_urls(ISSUE_STAGES)
+        else:
+            url = get_issue_urls_springer(name, num_prev_vols, wait_time)
+
+        # Get links for each paper in one browser session, skipping issues already recorded by an interrupted run
+        html_list = discover_links(get_papers_link_springer, url, wait_time, job_journal, failure_ledger)
+
+        # Only open the article pages of papers not harvested by an earlier run
+        if incremental:
+            # A journal scraped before the harvest index existed starts from the issues already in the article store
+            seed_from_store(harvest_index, job_journal.get_issue_links(), 'springer', name, 'Springer')
+            html_list = harvest_index.filter_new(html_list)
+        if retry_failures:
+            # Articles that failed to parse are in the harvest index too, so the ledger's are added after the filter
+            html_list = list(dict.fromkeys(html_list + failure_ledger.get_urls(ARTICLE_STAGES)))
+        if not html_list:
+            print(f"No new articles for {name}")
+            job_journal.finish()
+            return
+
+        # Write every article to the record sinks as soon as it is extracted; articleStore.main() exports all_df.csv
+        with open_journal_sink(f'springer_{name}', 'Springer', name,
+                               append=incremental or retry_failures) as journal_sink:
+            get_abstracts(SPRINGER_ARTICLE_PARSER, html_list, wait_time, name, num_workers, job_journal, failure_ledger,
+                          journal_sink)
+
+        harvest_index.add(job_journal.get_recorded_urls())
+
+        # Results are saved, the checkpoints are no longer needed
+        job_journal.finish()
+    finally:
+        harvest_index.close()
+        failure_ledger.close()
+        job_journal.close()
+
+
+def manual_scrape_springer_journals(name, volumes, issues, wait_time, num_workers=1):
     int_paper = get_paper_number_from_name_springer(name)
     journal_url = "https://link.springer.com/journal/{}/volumes-and-issues/{{}}-{{}}".format(int_paper)
-    output_path = os.path.join(DATA_PATH, f'springer_{name}.json')
 
-    html_list = []
-    abstract_list = []
     url = []
 
     # Generate URLs
@@ -135,25 +158,12 @@ def manual_scrape_springer_journals(name, volumes, issues, wait_time):
     except Exception as e:
         raise RuntimeError(f"URL generation failed: {e}")
 
-    # Get links for each paper
-    for site in tqdm(url, desc="Getting paper links"):
-        try:
-            html_list = get_papers_link_springer(site, html_list, wait_time)
-        except Exception as e:
-            raise RuntimeError(f"Failed to get links for each paper: {e}")
-
-    # Get Abstracts with progress bar
-    for i in tqdm(range(len(html_list)), desc="Getting abstracts"):
-        try:
-            abstract = get_abstract_info_springer(url_paper_list=html_list, paper_number=i, wait_time=wait_time)
-            if abstract:
-                abstract_list.append(abstract)
-        except Exception as e:
-            pass
+    # Get links for each paper in one browser session
+    html_list = discover_links(get_papers_link_springer, url, wait_time)
 
-    # Write data to JSON file
-    with open(output_path, 'w') as json_file:
-        json.dump(abstract_list, json_file)
+    # Write every article to a JSON Lines file as soon as it is extracted
+    with open_journal_sink(f'springer_{name}', 'Springer', name, formats=('jsonl',)) as journal_sink:
+        get_abstracts(SPRINGER_ARTICLE_PARSER, html_list, wait_time, name, num_workers, sink=journal_sink)
 
     #ToDo add saving in XLSX
 
@@ -161,10 +171,11 @@ def manual_scrape_springer_journals(name, volumes, issues, wait_time):
 # =============================================================================
 # Run Multiple
 # =============================================================================
-def scrape_multiple_springer_journals(journal_list, num_prev_vols, wait_time):
+def scrape_multiple_springer_journals(journal_list, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                                      retry_failures=False):
     for name in journal_list:
         try:
-            automatic_scrape_springer_journal(name, num_prev_vols, wait_time)
+            automatic_scrape_springer_journal(name, num_prev_vols, wait_time, num_workers, incremental, retry_failures)
         except Exception as e:
             print(e)
 
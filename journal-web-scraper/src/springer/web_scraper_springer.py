@@ -10,6 +10,7 @@ The tool is designed to assist in gathering data for academic research and analy
 
 Functions:
     get_latest_volume_number_springer(url, wait_time): Retrieves the latest volume number from a specified Springer journal.
+    get_volume_and_issue_data_springer(int_paper, wait_time): Retrieves the existing volumes and issues of a Springer journal.
     get_paper_number_from_name_springer(name): Retrieves the paper number associated with a Springer journal name.
     get_num_issues_springer(name): Retrieves the number of issues available for a specified Springer journal.
     get_papers_link_springer(url, html_list, wait_time): Retrieves URLs of papers from a specified Springer journal webpage.
@@ -36,16 +37,23 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from config import GECKO_PATH
 import re
-import json
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.journalMetadata import get_journal_metadata
+from src.helperFunctions.fetchBackend import fetch_page, ElementNotFound
+from src.helperFunctions.articleParser import ArticleParser
+from src.helperFunctions.issueArchive import parse_issue_links
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_SPRINGER = {
+    'title': ('text', 'h1.c-article-title'),
+    'authors': ('texts', "ul.c-article-author-list li a[data-test='author-name']"),
+    'abstract': ('text', 'div.c-article-section__content p'),
+    'volume': ('text', 'span[data-test="journal-volume"]'),
+}
 
 
 
@@ -66,12 +74,7 @@ def get_paper_number_from_name_springer(name):
         None: If the journal name is not found or an error occurs.
     """
 
-    try:
-        with open('springer_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('springer/springer_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('springer')
 
     try:
         return name_dict[name][0]
@@ -92,12 +95,7 @@ def get_num_issues_springer(name):
         None: If the journal name is not found or an error occurs.
     """
 
-    try:
-        with open('springer_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('springer/springer_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('springer')
 
     try:
         return name_dict[name][1]
@@ -112,41 +110,48 @@ def get_latest_volume_number_springer(url, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         int: The latest volume number as an integer.
+
+    Raises:
+        ValueError: If the page shows no volume number.
     """
 
-    volume_number = 0
+    page = fetch_page(url, 'springer', 'latest_volume', wait_time)
+
+    # Find the first occurrence of the volume element and extract the number
     try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url)
-
-        # Wait for the page to render
-        time.sleep(wait_time)
-
-        # Find the first occurrence of the volume element and extract the number
-        try:
-            # Try the first CSS selector
-            volume_element = browser.find_element(By.CSS_SELECTOR,
-                                                  "li.app-section h2.app-section__heading span.u-display-block.u-flex-grow")
-        except:
-            # If the first selector fails, try the second one
-            volume_element = browser.find_element(By.CSS_SELECTOR, "li.app-vol-and-issues-item h2 span")
-        volume_text = volume_element.text
-        match = re.search(r"Volume (\d+)", volume_text)
-        if match:
-            volume_number = int(match.group(1))
+        # Try the first CSS selector
+        volume_text = page.text("li.app-section h2.app-section__heading span.u-display-block.u-flex-grow")
+    except ElementNotFound:
+        # If the first selector fails, try the second one
+        volume_text = page.text("li.app-vol-and-issues-item h2 span")
+    match = re.search(r"Volume (\d+)", volume_text)
+    if not match:
+        raise ValueError(f"No volume number in '{volume_text}' on {url}")
 
-    except Exception as e:
-        print("Error: " + str(e))
+    return int(match.group(1))
 
-    finally:
-        browser.close()
 
-    return volume_number
+def get_volume_and_issue_data_springer(int_paper, wait_time):
+    """
+    Retrieves volume and issue data from the volumes-and-issues page of a Springer journal.
+
+    Args:
+        int_paper (int): The number of the journal on link.springer.com.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        volume_dict (dict): A dictionary mapping each volume, newest first, to its issues and corresponding URLs.
+    """
+
+    archive_url = f"https://link.springer.com/journal/{int_paper}/volumes-and-issues"
+    journal_url = "https://link.springer.com/journal/{}/volumes-and-issues/{{}}-{{}}".format(int_paper)
+
+    page = fetch_page(archive_url, 'springer', 'issue_archive', wait_time)
+    return parse_issue_links([page], rf"/journal/{int_paper}/volumes-and-issues/(\d+)-(\d+)", journal_url.format)
 
 
 def get_papers_link_springer(url, html_list, wait_time):
@@ -155,38 +160,47 @@ def get_papers_link_springer(url, html_list, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        html_list (list): List the paper URLs are added to.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper_links (list): List of URLs of papers.
     """
 
-    try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url)
+    page = fetch_page(url, 'springer', 'issue', wait_time)
+
+    # Find all elements that match the desired selector
+    articles = page.links("article.c-card-open h3.c-card-open__heading a")
 
-        # Wait for the page to render
-        time.sleep(wait_time)
+    # IMF for some reason does not follow above format here
+    if not articles:
+        articles = page.links("li.c-list-group__item a")
 
-        # Find all elements that match the desired selector
-        articles = browser.find_elements(By.CSS_SELECTOR, "article.c-card-open h3.c-card-open__heading a")
+    html_list.extend(articles)
 
-        # IMF for some reason does not follow above format here
-        if not articles:
-            articles = browser.find_elements(By.CSS_SELECTOR, "li.c-list-group__item a")
+    return html_list
 
-        for article in articles:
-            link = article.get_attribute('href')
-            html_list.append(link)
 
-    except Exception as e:
-        print("Error: " + str(e))
+def build_paper_springer(fields, journal_name):
+    """
+    Builds the paper of a Springer article from the fields read with ARTICLE_FIELDS_SPRINGER.
+
+    Args:
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
 
-    finally:
-        browser.close()
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
 
-    return html_list
+    authors = ", ".join(fields['authors'])
+    volume = fields['volume'].replace("Volume", "").strip()
+    issue = "X"  # Page does not show issue
+
+    return [f"Volume {volume}, Issue {issue}", [fields['title'], authors, fields['abstract']]]
+
+
+SPRINGER_ARTICLE_PARSER = ArticleParser('springer', ARTICLE_FIELDS_SPRINGER, build_paper_springer)
 
 
 def get_abstract_info_springer(url_paper_list, paper_number, wait_time, journal_name):
@@ -196,45 +210,17 @@ def get_abstract_info_springer(url_paper_list, paper_number, wait_time, journal_
     Args:
         url_paper_list (list): List of paper URLs.
         paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
 
     try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
-
-        WebDriverWait(browser, wait_time).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "h1.c-article-title"))
-        )
-
-        # Find the title
-        title = browser.find_element(By.CSS_SELECTOR, 'h1.c-article-title').text
-
-        # Find the authors
-        authors_elements = browser.find_elements(By.CSS_SELECTOR,
-                                                 "ul.c-article-author-list li a[data-test='author-name']")
-        authors = ", ".join([author.text for author in authors_elements])
-
-        # Find the abstract
-        abstract = browser.find_element(By.CSS_SELECTOR, 'div.c-article-section__content p').text
-
-        # Find the volume and set issue to 'X'
-        volume_element = browser.find_element(By.CSS_SELECTOR, 'span[data-test="journal-volume"]')
-        volume = volume_element.text.replace("Volume", "").strip()
-        issue = "X"  # Page does not show issue
-
-        # key = generate_key('Springer', journal_name, volume, issue)
-        # paper = [key, f"Volume {volume}, Issue {issue}", [title, authors, abstract]]
-        paper = [f"Volume {volume}, Issue {issue}", [title, authors, abstract]]
+        page = SPRINGER_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = SPRINGER_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         print("Error: " + str(e))
         paper = []
 
-    finally:
-        browser.close()
-
     return paper
@@ -25,16 +25,23 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from config import GECKO_PATH
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import re
-import json
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.journalMetadata import get_journal_metadata
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.articleParser import ArticleParser
+from src.helperFunctions.issueArchive import parse_issue_links
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_UCHICAGO = {
+    'title': ('text', 'h1.citation__title'),
+    'authors': ('texts', 'a.author-name span'),
+    'abstract': ('text', 'div.abstractSection.abstractInFull p'),
+    'volume_issue': ('text', '.current-issue__meta'),
+}
 
 
 
@@ -44,12 +51,7 @@ from src.helperFunctions.generateKey import generate_key
 
 
 def get_num_issues_uchicago(name):
-    try:
-        with open('uchicago_journal_name_to_num_issues_and_full_name.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('uchicago/uchicago_journal_name_to_num_issues_and_full_name.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('uchicago')
 
     try:
         return name_dict[name][0]
@@ -57,12 +59,7 @@ def get_num_issues_uchicago(name):
         print(f"The journal name: {name} either is not a UChicago journal or has not been added to name->#issues dict, fullname.")
 
 def get_full_name_uchicago(name):
-    try:
-        with open('uchicago_journal_name_to_num_issues_and_full_name.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('uchicago/uchicago_journal_name_to_num_issues_and_full_name.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('uchicago')
 
     try:
         return name_dict[name][1]
@@ -72,33 +69,37 @@ def get_full_name_uchicago(name):
 
 
 def get_latest_volume_uchicago(journal_name):
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
     journal_url = f'https://www.journals.uchicago.edu/toc/{journal_name}/current'
-    browser.get(journal_url)
 
-    time.sleep(5)  # Wait for the page to load
+    page = fetch_page(journal_url, 'uchicago', 'latest_volume', 5)
 
-    try:
-        # Locate the elements containing volume and issue information
-        volume_element = browser.find_element(By.CSS_SELECTOR, "div.cover-image__details .journal-meta span.citation-line:first-child")
+    # Locate the elements containing volume and issue information
+    volume_info = page.text("div.cover-image__details .journal-meta span.citation-line:first-child")
 
-        volume_info = volume_element.text
+    volume_match = re.search(r"Volume (\d+)", volume_info)
+    if not volume_match:
+        raise ValueError(f"No volume number in '{volume_info}' on {journal_url}")
 
-        volume_match = re.search(r"Volume (\d+)", volume_info)
-        if volume_match:
-            latest_volume = int(volume_match.group(1))
-        else:
-            raise ValueError("Volume or issue number not found")
+    return int(volume_match.group(1))
 
-    except Exception as e:
-        print(f"Error occurred: {e}")
-        latest_volume = None
+def get_volume_and_issue_data_uchicago(journal_name, wait_time=None):
+    """
+    Retrieves volume and issue data from the list of issues of a University of Chicago journal.
+
+    Args:
+        journal_name (str): The name of the journal, as in its URL.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        volume_dict (dict): A dictionary mapping each volume, newest first, to its issues and corresponding URLs.
+    """
 
-    finally:
-        browser.close()
+    archive_url = f'https://www.journals.uchicago.edu/loi/{journal_name}'
+    journal_url = 'https://www.journals.uchicago.edu/toc/{}/{{}}/{{}}'.format(journal_name)
+
+    page = fetch_page(archive_url, 'uchicago', 'issue_archive', wait_time)
+    return parse_issue_links([page], rf"/toc/{journal_name}/(\d+)/(\d+)", journal_url.format)
 
-    return latest_volume
 
 def get_papers_link_uchicago(url, html_list, wait_time):
     """
@@ -107,25 +108,48 @@ def get_papers_link_uchicago(url, html_list, wait_time):
     Args:
         url (str): URL of the journal's webpage.
         html_list (list): List to store the paper URLs.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         html_list (list): Updated list with URLs of papers.
     """
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
-    browser.get(url)
-    time.sleep(wait_time)
+    page = fetch_page(url, 'uchicago', 'issue', wait_time)
 
     # Updated selector for DOI links
-    links = browser.find_elements(By.CSS_SELECTOR, "div.issue-item h4.issue-item__title a")
-    for link in links:
-        html_list.append(link.get_attribute('href'))
+    html_list.extend(page.links("div.issue-item h4.issue-item__title a"))
 
-    browser.close()
     return html_list
 
 
+def build_paper_uchicago(fields, journal_name):
+    """
+    Builds the paper of a University of Chicago article from the fields read with ARTICLE_FIELDS_UCHICAGO.
+
+    Args:
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
+
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
+
+    authors = ', '.join(fields['authors'])
+
+    volume_issue_match = re.search(r'Volume (\d+), Number (\d+)', fields['volume_issue'])
+    if volume_issue_match:
+        volume = volume_issue_match.group(1)
+        issue = volume_issue_match.group(2)
+        issue_volume = f"Volume {volume}, Issue {issue}"
+    else:
+        # Fallback in case the regex doesn't find a match
+        issue_volume = "Volume and issue information not found"
+
+    return [issue_volume, [fields['title'], authors, fields['abstract']]]
+
+
+UCHICAGO_ARTICLE_PARSER = ArticleParser('uchicago', ARTICLE_FIELDS_UCHICAGO, build_paper_uchicago)
+
+
 def get_abstract_info_uchicago(url_paper_list, paper_number, wait_time, journal_name):
     """
     Retrieves detailed information of a specific paper from the University of Chicago.
@@ -133,38 +157,16 @@ def get_abstract_info_uchicago(url_paper_list, paper_number, wait_time, journal_
     Args:
         url_paper_list (list): List of paper URLs.
         paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
+
     try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
-        time.sleep(wait_time)
-        title = browser.find_element(By.CSS_SELECTOR, "h1.citation__title").text
-        authors = ', '.join([author.text for author in browser.find_elements(By.CSS_SELECTOR, "a.author-name span")])
-        abstract = browser.find_element(By.CSS_SELECTOR, "div.abstractSection.abstractInFull p").text
-
-
-        issue_volume_text = browser.find_element(By.CSS_SELECTOR, ".current-issue__meta").text
-        volume_issue_match = re.search(r'Volume (\d+), Number (\d+)', issue_volume_text)
-        if volume_issue_match:
-            volume = volume_issue_match.group(1)
-            issue = volume_issue_match.group(2)
-            issue_volume = f"Volume {volume}, Issue {issue}"
-        else:
-            # Fallback in case the regex doesn't find a match
-            issue_volume = "Volume and issue information not found"
-
-        # key = generate_key('UChicago', journal_name, issue_volume.split(" ")[1].replace(',', ''), issue_volume.split(" ")[-1])
-        # paper = [key, issue_volume, [title, authors, abstract]]
-        paper = [issue_volume, [title, authors, abstract]]
+        page = UCHICAGO_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = UCHICAGO_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         paper = []
 
-    finally:
-        browser.close()
     return paper
-
@@ -1,17 +1,20 @@
 """
 Academic Journal Web Scraper
 
-This script serves as a unified platform to automate the web scraping of academic journals from various publishers. It integrates modules for scraping journals from Oxford, Wiley, Springer, Elsevier, the American Economic Association (AEA), and the University of Chicago. Each module is specialized to handle the unique web structure of journals from these respective publishers.
+This script serves as a unified platform to automate the web scraping of academic journals from various publishers. It integrates modules for scraping journals from Oxford, Wiley, Springer, Elsevier, the American Economic Association (AEA), the University of Chicago, and JSTOR. Each module is specialized to handle the unique web structure of journals from these respective publishers.
 
 The script allows for easy and targeted scraping of a specific journal by specifying the base website (publisher), the journal name, and other relevant parameters.
 
 Functions:
-    webscrape_journal(base_website, journal_name, num_prev_vols, wait_time):
+    webscrape_journal(base_website, journal_name, num_prev_vols, wait_time, num_workers, incremental, retry_failures):
         Automates the scraping of a specified journal.
         - base_website: The publisher's name (e.g., 'oxford', 'wiley', 'springer', etc.)
         - journal_name: The specific name of the journal to be scraped.
         - num_prev_vols: Number of previous volumes of the journal to scrape.
         - wait_time: Wait time in seconds for web page loading and processing.
+        - num_workers: Number of articles fetched at the same time, each with its own browser.
+        - incremental: Only scrape the articles not harvested by an earlier run.
+        - retry_failures: Only scrape the issue pages and articles recorded in the journal's failure ledger.
 
 Main Execution:
     The main() function sets up the parameters for the specific journal to be scraped and invokes the webscrape_journal function. This example scrapes a journal from the American Economic Association.
@@ -29,57 +32,88 @@ from src.oxford.oxford_runner import automatic_scrape_oxford_journal
 from src.elsevier.elsevier_runner import automatic_scrape_elsevier_journal
 from src.springer.springer_runner import automatic_scrape_springer_journal
 from src.americanEconomicAssociation.aea_runner import automatic_scrape_aea_journal
+from src.jstor.jstor_runner import automatic_scrape_jstor_journal
+from src.helperFunctions.browserPool import get_browser_pool, shutdown_browser_pool
+from src.helperFunctions.pageReadiness import format_wait_telemetry
+from src.helperFunctions.fetchBackend import format_fetch_stats
+from src.helperFunctions.journalMetadata import load_all_metadata
+from src.helperFunctions.metrics import export_metrics, format_metrics_summary
 
 
-def webscrape_journal(base_website, journal_name, num_prev_vols, wait_time):
+def webscrape_journal(base_website, journal_name, num_prev_vols, wait_time, num_workers=1, incremental=False,
+                      retry_failures=False):
     if base_website.lower() == "oxford":
         try:
-            automatic_scrape_oxford_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_oxford_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                            retry_failures)
         except Exception as e:
             print(e)
             print("Either 1. journal is not Oxford journal, 2. name inputted incorrectly, 3. journal not implemented")
     elif base_website.lower() == "wiley":
         try:
-            automatic_scrape_wiley_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_wiley_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                           retry_failures)
         except Exception as e:
             print(e)
             print("Either 1. journal is not Wiley journal, 2. name inputted incorrectly, 3. journal not implemented")
     elif base_website.lower() == "springer":
         try:
-            automatic_scrape_springer_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_springer_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                              retry_failures)
         except Exception as e:
             print(e)
             print("Either 1. journal is not Springer journal, 2. name inputted incorrectly, 3. journal not implemented")
     elif base_website.lower() == "elsevier":
         try:
-            automatic_scrape_elsevier_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_elsevier_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                              retry_failures)
         except Exception as e:
             print(e)
             print("Either 1. journal is not Elsevier journal, 2. name inputted incorrectly, 3. journal not implemented")
     elif base_website.lower() == "aea" or base_website.lower().replace(' ', '') == "americaneconomicjournal":
         try:
-            automatic_scrape_aea_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_aea_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                         retry_failures)
         except Exception as e:
             print(e)
             print(
                 "Either 1. journal is not American Economic Association journal, 2. name inputted incorrectly, 3. journal not implemented")
     elif base_website.lower().replace(' ', '') == 'uchicago':
         try:
-            automatic_scrape_uchicago_journal(journal_name, num_prev_vols, wait_time)
+            automatic_scrape_uchicago_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                              retry_failures)
         except Exception as e:
             print(e)
             print("Either 1. journal is not Uchicago journal, 2. name inputted incorrectly, 3. journal not implemented")
+    elif base_website.lower() == 'jstor':
+        try:
+            automatic_scrape_jstor_journal(journal_name, num_prev_vols, wait_time, num_workers, incremental,
+                                           retry_failures)
+        except Exception as e:
+            print(e)
+            print("Either 1. journal is not JSTOR journal, 2. name inputted incorrectly, 3. journal not implemented")
     else:
         print(f"Base website {base_website} has been input correclty or has not been implemented yet")
 
 
 def main():
+    # Report a malformed journal metadata file before any scraping starts
+    load_all_metadata()
+
     base_website = "aea"
     journal_name = "edcc"
     num_prev_vols = 1
     wait_time = 15
+    num_workers = 1
+
+    webscrape_journal(base_website, journal_name, num_prev_vols, wait_time, num_workers)
 
-    webscrape_journal(base_website, journal_name, num_prev_vols, wait_time)
+    print(get_browser_pool().format_stats())
+    print(format_wait_telemetry())
+    print(format_fetch_stats())
+    print(format_metrics_summary())
+    print(f"Metrics snapshot saved to {export_metrics('webscraper')}.json/.prom")
+    shutdown_browser_pool()
 
 
 if __name__ == "__main__":
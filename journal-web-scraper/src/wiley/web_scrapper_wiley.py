@@ -10,6 +10,7 @@ The tool is designed to assist in gathering data for academic research and analy
 
 Functions:
     get_latest_volume_number_wiley(url, wait_time): Retrieves the latest volume number from a specified Wiley journal.
+    get_volume_and_issue_data_wiley(int_paper, wait_time): Retrieves the existing volumes and issues of a Wiley journal.
     get_paper_number_from_name_wiley(name): Retrieves the internal paper number associated with a Wiley journal name.
     get_num_issues_wiley(name): Retrieves the number of issues available for a specified Wiley journal.
     get_papers_link_wiley(url, html_list, wait_time): Retrieves URLs of papers from a specified Wiley journal webpage.
@@ -36,16 +37,23 @@ Usage:
 # =============================================================================
 # Packages
 # =============================================================================
-import time
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from config import GECKO_PATH
 import re
-import json
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from src.helperFunctions.generateKey import generate_key
+from src.helperFunctions.journalMetadata import get_journal_metadata
+from src.helperFunctions.fetchBackend import fetch_page
+from src.helperFunctions.articleParser import ArticleParser
+from src.helperFunctions.issueArchive import parse_issue_links
+
+
+# =============================================================================
+# Parameters
+# =============================================================================
+# Fields of an article page, see articleParser.FIELD_KINDS
+ARTICLE_FIELDS_WILEY = {
+    'volume_issue': ('outer_html', '.volume-issue'),
+    'title': ('text', '.citation__title'),
+    'authors': ('texts', 'div#sb-1 > div > div > span > a > span'),
+    'abstract': ('text', 'div.article-section__content > p'),
+}
 
 # =============================================================================
 # Functions
@@ -64,12 +72,7 @@ def get_paper_number_from_name_wiley(name):
         None: If the journal name is not in the dictionary or an error occurs.
     """
 
-    try:
-        with open('wiley_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('wiley/wiley_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('wiley')
 
     try:
         return name_dict[name][0]
@@ -90,12 +93,7 @@ def get_num_issues_wiley(name):
         None: If the journal name is not in the dictionary or an error occurs.
     """
 
-    try:
-        with open('wiley_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
-    except:
-        with open('wiley/wiley_journal_name_to_int_and_num_issues.json', 'r') as file:
-            name_dict = json.load(file)
+    name_dict = get_journal_metadata('wiley')
 
     try:
         return name_dict[name][1]
@@ -110,35 +108,44 @@ def get_latest_volume_number_wiley(url, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         int: The latest volume number as an integer.
+
+    Raises:
+        ValueError: If the page shows no volume number.
     """
 
-    volume_number = 0
-    try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url)
+    page = fetch_page(url, 'wiley', 'latest_volume', wait_time)
 
-        # Wait for the page to render
-        time.sleep(wait_time)
+    # Find the volume element and extract the number
+    volume_text = page.text("div.cover-image__details span.comma")
+    match = re.search(r"Volume (\d+)", volume_text)
+    if not match:
+        raise ValueError(f"No volume number in '{volume_text}' on {url}")
 
-        # Find the volume element and extract the number
-        volume_element = browser.find_element(By.CSS_SELECTOR, "div.cover-image__details span.comma")
-        volume_text = volume_element.text
-        match = re.search(r"Volume (\d+)", volume_text)
-        if match:
-            volume_number = int(match.group(1))
+    return int(match.group(1))
 
-    except Exception as e:
-        print("Error: " + str(e))
 
-    finally:
-        browser.close()
+def get_volume_and_issue_data_wiley(int_paper, wait_time):
+    """
+    Retrieves volume and issue data from the list of issues of a Wiley journal.
 
-    return volume_number
+    Args:
+        int_paper (int): The internal number of the journal on onlinelibrary.wiley.com.
+        wait_time (int): Longest time to wait for the page to render before scraping.
+
+    Returns:
+        volume_dict (dict): A dictionary mapping each volume, newest first, to its issues and corresponding URLs.
+    """
+
+    archive_url = f"https://onlinelibrary.wiley.com/loi/{int_paper}"
+    journal_url = "https://onlinelibrary.wiley.com/toc/{}/{{}}/{{}}".format(int_paper)
+
+    page = fetch_page(archive_url, 'wiley', 'issue_archive', wait_time)
+    # Issue links may carry the year before the volume, e.g. /toc/15406261/2024/79/1
+    return parse_issue_links([page], rf"/toc/{int_paper}/(?:\d{{4}}/)?(\d+)/(\d+)", journal_url.format)
 
 
 def get_papers_link_wiley(url, html_list, wait_time):
@@ -147,88 +154,65 @@ def get_papers_link_wiley(url, html_list, wait_time):
 
     Args:
         url (str): URL of the journal's webpage.
-        wait_time (int): Time to wait for page rendering before scraping.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
     Returns:
         paper_links (list): List of URLs of papers.
     """
 
-    # Initialize the browser
-    service = Service(GECKO_PATH)
-    browser = webdriver.Firefox(service=service)
-    browser.get(url)
-
-    # Wait for the page to render
-    time.sleep(wait_time)
-
-    # Find all elements that match the desired XPath
-    articles = browser.find_elements(By.XPATH, "//a[contains(@class, 'issue-item__title visitable')]")
-
-    # Construct the full URL for each paper and add it to the list
-    base_url = "https://onlinelibrary.wiley.com"
+    page = fetch_page(url, 'wiley', 'issue', wait_time)
 
-    for article in articles:
-        partial_link = article.get_attribute('href')
-        full_link = base_url + partial_link if partial_link.startswith("/doi") else partial_link
-        html_list.append(full_link)
-
-    # Close the browser
-    browser.close()
+    # Find all article links, resolved to full URLs against the issue page
+    html_list.extend(page.links("a.issue-item__title.visitable"))
 
     return html_list
 
 
-def get_abstract_info_wiley(url_paper_list, paper_number, wait_time, journal_name):
+def build_paper_wiley(fields, journal_name):
     """
-    Retrieves detailed information of a specific paper from Wiley.
+    Builds the paper of a Wiley article from the fields read with ARTICLE_FIELDS_WILEY.
 
     Args:
-        url_paper_list (list): List of paper URLs.
-        paper_number (int): Index of the paper in the list.
-        wait_time (int): Time to wait for page rendering before scraping.
+        fields (dict): The extracted fields.
+        journal_name (str): The name of the journal.
 
     Returns:
         paper (list): A list containing detailed information of the paper.
     """
 
-    try:
-        service = Service(GECKO_PATH)
-        browser = webdriver.Firefox(service=service)
-        browser.get(url_paper_list[paper_number])
+    match = re.search(r"Volume (\d+), Issue (\d+)", fields['volume_issue'])
+    if match:
+        volume = match.group(1)
+        issue = match.group(2)
+        issue_volume = f"Volume {volume}, Issue {issue}"
+    else:
+        issue_volume = "Volume/Issue info not found"
+
+    authors = ", ".join(fields['authors'])
 
-        WebDriverWait(browser, wait_time).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "volume-issue"))
-        )
+    return [issue_volume, [fields['title'], authors, fields['abstract']]]
 
-        # Find the volume-issue element and extract text
-        volume_issue_element = browser.find_element(By.CLASS_NAME, 'volume-issue')
-        volume_issue_text = volume_issue_element.get_attribute('outerHTML')
-        match = re.search(r"Volume (\d+), Issue (\d+)", volume_issue_text)
-        if match:
-            volume = match.group(1)
-            issue = match.group(2)
-            issue_volume = f"Volume {volume}, Issue {issue}"
-        else:
-            issue_volume = "Volume/Issue info not found"
 
-        # Find the citation title
-        citation_title = browser.find_element(By.CLASS_NAME, 'citation__title').text
+WILEY_ARTICLE_PARSER = ArticleParser('wiley', ARTICLE_FIELDS_WILEY, build_paper_wiley)
 
-        authors_elements = browser.find_elements(By.XPATH,
-                                                 "//div[@id='sb-1']/div/div/span/a/span")
-        authors = ", ".join([author.text for author in authors_elements])
 
-        abstract = browser.find_element(By.XPATH, "//div[contains(@class, 'article-section__content')]/p").text
+def get_abstract_info_wiley(url_paper_list, paper_number, wait_time, journal_name):
+    """
+    Retrieves detailed information of a specific paper from Wiley.
 
-        # key = generate_key('Wiley', journal_name, issue_volume.split(" ")[1].replace(',', ''), issue_volume.split(" ")[-1])
-        # paper = [key, issue_volume, [citation_title, authors, abstract]]
+    Args:
+        url_paper_list (list): List of paper URLs.
+        paper_number (int): Index of the paper in the list.
+        wait_time (int): Longest time to wait for the page to render before scraping.
 
-        paper = [issue_volume, [citation_title, authors, abstract]]
+    Returns:
+        paper (list): A list containing detailed information of the paper.
+    """
 
+    try:
+        page = WILEY_ARTICLE_PARSER.fetch(url_paper_list[paper_number], wait_time)
+        paper = WILEY_ARTICLE_PARSER.parse_page(page, journal_name)
     except Exception as e:
         paper = []
 
-    finally:
-        browser.close()
-
     return paper
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the article catalog: skipping articles already catalogued, queries by volume and issue, batched reads,
+full-text search and cataloguing the article store.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import pandas as pd
+import pytest
+from src.helperFunctions import articleStore
+from src.helperFunctions.articleCatalog import ArticleCatalog, export_text, import_store
+from src.helperFunctions.articleStore import STORE_COLUMNS, append_articles
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ArticleCatalog(str(tmp_path / 'articles.sqlite'))
+    yield catalog
+    catalog.close()
+
+
+def record(key, title='A title', volume_issue='Volume 78, Issue 1', journal_name='J', abstract='An abstract.'):
+    return {'Key': key, 'Journal_Website': 'Wiley', 'Journal_Name': journal_name, 'Volume_Issue': volume_issue,
+            'Title': title, 'Authors': 'A. Author', 'Abstract': abstract}
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_catalogued_keys_are_skipped(catalog):
+    assert catalog.add_records([record('a'), record('b'), record('a', title='Repeated')]) == 2
+    assert catalog.add_records([record('b', title='Changed'), record('c')]) == 1
+    assert catalog.add_records([]) == 0
+
+    assert len(catalog) == 3
+    # The first version of an article is kept
+    assert [article['Title'] for article in catalog.iter_articles(columns=['Title'])] == ['A title'] * 3
+
+
+def test_catalogued_articles_survive_reopening(catalog):
+    catalog.add_records([record('a')])
+    reopened = ArticleCatalog(catalog.path)
+    assert reopened.add_records([record('a'), record('b')]) == 1
+    reopened.close()
+    assert len(catalog) == 2
+
+
+def test_count_by_volume_and_issue(catalog):
+    catalog.add_records([record('a'), record('b', volume_issue='VOL. 78 NO. 2'),
+                         record('c', volume_issue='Volume 77, Issue X'), record('d', journal_name='K')])
+    assert catalog.count(publisher='Wiley', volume=78) == 3
+    assert catalog.count(journal='J', volume=78, issue=2) == 1
+    assert catalog.count(volume=77) == 1
+    assert catalog.count(volume=77, issue=1) == 0
+    assert catalog.get_journal_counts() == [('Wiley', 'J', 3), ('Wiley', 'K', 1)]
+
+
+def test_articles_are_read_in_batches_in_the_order_they_were_added(catalog):
+    catalog.add_records([record(str(i), title=f"Title {i}") for i in range(7)])
+    articles = list(catalog.iter_articles(columns=['Key', 'Title'], batch_size=3))
+    assert articles == [{'Key': str(i), 'Title': f"Title {i}"} for i in range(7)]
+
+    with pytest.raises(ValueError):
+        list(catalog.iter_articles(columns=['Title; DROP TABLE articles']))
+
+
+def test_search_matches_titles_and_abstracts(catalog):
+    catalog.add_records([record('a', title='Monetary policy and growth'),
+                         record('b', title='Labour supply', abstract='We study monetary shocks.'),
+                         record('c', title='Monetary unions', journal_name='K')])
+    assert {article['Key'] for article in catalog.search('monetary')} == {'a', 'b', 'c'}
+    assert [article['Key'] for article in catalog.search('monetary', journal='K')] == ['c']
+    assert [article['Key'] for article in catalog.search('Title: labour')] == ['b']
+
+
+def test_import_store_only_adds_new_articles(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(articleStore, 'STORE_PATH', str(tmp_path / 'article_store'))
+    monkeypatch.setattr(articleStore, '_partition_indexes', {})
+    columns = [column for column in STORE_COLUMNS if column != 'Key']
+    rows = [['Wiley', 'J', 'Volume 78, Issue 1', f"Title {i}", "A. Author", "An abstract."] for i in range(3)]
+    append_articles(pd.DataFrame(rows, columns=columns), STORE_COLUMNS)
+
+    assert import_store(catalog) == 3
+    assert import_store(catalog) == 0
+
+    text_path = tmp_path / 'journal_text.txt'
+    assert export_text(str(text_path), catalog) == 3
+    assert text_path.read_text(encoding='utf-8').count("An abstract.\n\n") == 3
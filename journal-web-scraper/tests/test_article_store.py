@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the article store: stable article keys, dropping articles already stored, within a run and across runs, and
+compaction of a partition's part files.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import glob
+import os
+import pandas as pd
+import pytest
+from src.helperFunctions import articleStore
+from src.helperFunctions.articleStore import STORE_COLUMNS, append_articles, compact_store, read_store
+from src.helperFunctions.generateKey import generate_key, generate_keys
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(articleStore, 'STORE_PATH', str(tmp_path / 'article_store'))
+    monkeypatch.setattr(articleStore, '_partition_indexes', {})
+    return tmp_path / 'article_store'
+
+
+def articles(titles, journal_name='J', volume_issue='Volume 78, Issue 1'):
+    columns = [column for column in STORE_COLUMNS if column != 'Key']
+    return pd.DataFrame([['Wiley', journal_name, volume_issue, title, "A. Author", "An abstract."] for title in titles],
+                        columns=columns)
+
+
+def part_files(store_path):
+    return glob.glob(os.path.join(str(store_path), '*', '*', 'part-*.parquet'))
+
+
+def restart(monkeypatch):
+    # A new process starts without the key indexes loaded by earlier appends
+    monkeypatch.setattr(articleStore, '_partition_indexes', {})
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_key_ignores_case_and_spacing_of_the_title():
+    key = generate_key('Wiley', 'J', '78', '1', title='Monetary Policy and Growth')
+    assert generate_key(' wiley', 'j ', '78', '1', title='monetary  policy and\ngrowth') == key
+    assert generate_key('Wiley', 'J', '78', '2', title='Monetary Policy and Growth') != key
+
+
+def test_key_prefers_the_doi():
+    key = generate_key('Wiley', 'J', '78', '1', title='A title', doi='10.1111/jofi.1')
+    assert generate_key('Wiley', 'J', '78', '1', title='A corrected title', doi='10.1111/JOFI.1') == key
+
+
+def test_keys_split_the_volume_and_issue():
+    df = articles(['A title'], volume_issue='VOL. 78 NO. 1')
+    assert generate_keys(df) == [generate_key('Wiley', 'J', '78', '1', title='A title')]
+
+
+def test_repeated_articles_are_stored_once(store_path):
+    assert append_articles(articles(['a', 'b', 'a', 'A ']), STORE_COLUMNS) == 2
+    assert append_articles(articles(['b', 'c']), STORE_COLUMNS) == 1
+    assert append_articles(articles(['a', 'c']), STORE_COLUMNS) == 0
+
+    assert sorted(read_store()['Title']) == ['a', 'b', 'c']
+    assert len(part_files(store_path)) == 2
+
+
+def test_stored_keys_are_remembered_across_runs(store_path, monkeypatch):
+    append_articles(articles(['a', 'b']), STORE_COLUMNS)
+    restart(monkeypatch)
+    assert append_articles(articles(['a', 'c']), STORE_COLUMNS) == 1
+
+    # A partition written before it had a key index is indexed from its part files
+    for key_file in glob.glob(os.path.join(str(store_path), '*', '*', 'keys.txt')):
+        os.remove(key_file)
+    restart(monkeypatch)
+    assert append_articles(articles(['a', 'b', 'c', 'd']), STORE_COLUMNS) == 1
+    assert sorted(read_store()['Title']) == ['a', 'b', 'c', 'd']
+
+
+def test_journals_are_deduplicated_separately(store_path):
+    df = pd.concat([articles(['a'], journal_name='J'), articles(['a'], journal_name='K')], ignore_index=True)
+    assert append_articles(df, STORE_COLUMNS) == 2
+    assert append_articles(articles(['a'], journal_name='K'), STORE_COLUMNS) == 0
+
+
+def test_compaction_merges_part_files_and_drops_duplicated_keys(store_path):
+    append_articles(articles(['a', 'b']), STORE_COLUMNS)
+    append_articles(articles(['c']), STORE_COLUMNS)
+    # A part file written by a process that did not see the other's keys
+    partition_dir = os.path.dirname(part_files(store_path)[0])
+    stored = pd.read_parquet(part_files(store_path)[0])
+    stored.to_parquet(os.path.join(partition_dir, 'part-00000000000000-copy.parquet'), index=False)
+
+    assert compact_store() == 1
+    assert len(part_files(store_path)) == 1
+    assert sorted(read_store()['Title']) == ['a', 'b', 'c']
+    assert compact_store() == 0
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the browser pool: reusing, recycling and discarding browsers, the size limit, pinning one browser to a block
+of pages, and shutting the pool down. Browsers are stand-ins, so Firefox is not needed.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import threading
+import pytest
+from src.helperFunctions import browserPool
+from src.helperFunctions.browserPool import BrowserPool, borrow_browser, pin_browser
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+class FakeBrowser:
+    """
+    Stands in for a Selenium driver: it has an open window until it crashes or is quit.
+    """
+
+    def __init__(self):
+        self.window_handles = ['window']
+        self.quit_called = False
+
+    def crash(self):
+        self.window_handles = []
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Launcher:
+    def __init__(self):
+        self.browsers = []
+
+    def __call__(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+@pytest.fixture
+def launcher():
+    return Launcher()
+
+
+@pytest.fixture
+def shared_pool(launcher, monkeypatch):
+    pool = BrowserPool(max_size=2, max_pages_per_browser=50, launch_browser=launcher)
+    monkeypatch.setattr(browserPool, '_shared_pool', pool)
+    yield pool
+    pool.shutdown()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_released_browser_is_lent_again(launcher):
+    pool = BrowserPool(launch_browser=launcher)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(launcher.browsers) == 1
+    assert pool.stats['pages_served'] == 1
+
+
+def test_browser_is_recycled_after_its_page_quota(launcher):
+    pool = BrowserPool(max_pages_per_browser=2, launch_browser=launcher)
+    for _ in range(3):
+        pool.release(pool.acquire())
+    assert len(launcher.browsers) == 2
+    assert launcher.browsers[0].quit_called and not launcher.browsers[1].quit_called
+    assert pool.stats['recycled'] == 1
+
+
+def test_crashed_browser_is_replaced(launcher):
+    pool = BrowserPool(launch_browser=launcher)
+    entry = pool.acquire()
+    pool.release(entry)
+    entry.browser.crash()
+
+    assert pool.acquire().browser is launcher.browsers[1]
+    assert launcher.browsers[0].quit_called
+    assert pool.stats['discarded_unhealthy'] == 1
+
+
+def test_pool_waits_for_a_browser_at_its_size_limit(launcher):
+    pool = BrowserPool(max_size=1, launch_browser=launcher)
+    entry = pool.acquire()
+    borrowed = []
+    waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive() and not borrowed
+
+    pool.release(entry)
+    waiter.join(5)
+    assert borrowed == [entry]
+    assert len(launcher.browsers) == 1
+
+
+def test_failed_launch_frees_its_slot(launcher):
+    attempts = []
+
+    def launch_once_failing():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise RuntimeError("geckodriver did not start")
+        return launcher()
+
+    pool = BrowserPool(max_size=1, launch_browser=launch_once_failing)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.acquire().browser is launcher.browsers[0]
+
+
+def test_borrowed_browser_is_kept_after_an_error_only_if_it_still_responds(shared_pool, launcher):
+    with pytest.raises(ValueError):
+        with borrow_browser():
+            raise ValueError("element not found")
+    with pytest.raises(ValueError):
+        with borrow_browser() as browser:
+            browser.crash()
+            raise ValueError("browser crashed")
+    with borrow_browser() as browser:
+        assert browser is launcher.browsers[1]
+    assert shared_pool.stats['discarded_unhealthy'] == 1
+
+
+def test_pinned_block_uses_one_browser_for_every_page(shared_pool, launcher):
+    with pin_browser():
+        pass
+    assert launcher.browsers == []
+
+    with pin_browser():
+        with borrow_browser() as first:
+            pass
+        with pin_browser():
+            with borrow_browser() as second:
+                pass
+        with borrow_browser() as third:
+            pass
+        # Another thread borrowing during the block gets a different browser
+        other = []
+
+        def borrow_in_other_thread():
+            with borrow_browser() as browser:
+                other.append(browser)
+
+        thread = threading.Thread(target=borrow_in_other_thread)
+        thread.start()
+        thread.join(5)
+    assert first is second is third
+    assert other and other[0] is not first
+    # The pinned browser is handed back once, for the three pages of the block, after the other thread's page
+    assert shared_pool.stats['pages_served'] == 4
+    assert shared_pool.acquire().browser is first
+
+
+def test_pinned_browser_is_replaced_after_a_crash(shared_pool, launcher):
+    with pin_browser():
+        with pytest.raises(ValueError):
+            with borrow_browser() as browser:
+                browser.crash()
+                raise ValueError("browser crashed")
+        with borrow_browser() as browser:
+            assert browser is launcher.browsers[1]
+    assert launcher.browsers[0].quit_called
+
+
+def test_shutdown_quits_idle_and_returned_browsers(launcher):
+    pool = BrowserPool(max_size=2, launch_browser=launcher)
+    idle, on_loan = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.shutdown()
+    assert launcher.browsers[0].quit_called and not launcher.browsers[1].quit_called
+
+    pool.release(on_loan)
+    assert launcher.browsers[1].quit_called
+    with pytest.raises(RuntimeError):
+        pool.acquire()
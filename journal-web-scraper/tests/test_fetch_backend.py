@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the HTTP fetch backend against a local http.server: server-rendered pages in STATIC_PAGES are parsed from the
+HTTP response, a page missing a readiness selector is loaded again with Selenium, refused responses slow the host down,
+and block pages are only retried by fetch_page.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.helperFunctions import failureLedger, fetchBackend
+from src.helperFunctions.failureLedger import call_with_retries
+from src.helperFunctions.fetchBackend import PageSnapshot, fetch_page
+from src.helperFunctions.rateLimit import BlockedPage, configure_host_rate
+
+
+# =============================================================================
+# Pages
+# =============================================================================
+ARTICLE_PAGE = """
+<html><head><title>A Springer article</title></head><body>
+<h1 class="c-article-title">Monetary Policy   and Growth</h1>
+<span data-test="journal-volume">Volume 12</span>
+<div class="c-article-section__content"><p>We study growth.</p></div>
+</body></html>
+"""
+
+# The abstract is rendered by a script, so the HTTP response lacks a required selector
+SCRIPT_RENDERED_PAGE = """
+<html><head><title>A Springer article</title></head><body>
+<h1 class="c-article-title">Monetary Policy and Growth</h1>
+<span data-test="journal-volume">Volume 12</span>
+<script src="/abstract.js"></script>
+</body></html>
+"""
+
+PAGES = {
+    '/article': (200, ARTICLE_PAGE),
+    '/rendered-article': (200, SCRIPT_RENDERED_PAGE),
+    '/missing': (404, "<html><head><title>Page not found</title></head><body></body></html>"),
+    '/unavailable': (503, "<html><head><title>Service unavailable</title></head><body></body></html>"),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, html = PAGES.get(self.path, (404, ""))
+        body = html.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture(scope='module')
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host = f'127.0.0.1:{server.server_port}'
+    # The local server needs no politeness delay
+    configure_host_rate(host, rate=1000, burst=100)
+    yield f'http://{host}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def selenium_loads(monkeypatch):
+    # Stands in for the browser: records the fallbacks and returns a rendered copy of the page
+    loads = []
+
+    def load_with_selenium(url, publisher, page_type, wait_time):
+        loads.append((url, publisher, page_type))
+        return PageSnapshot(url, ARTICLE_PAGE, 'selenium'), True
+
+    monkeypatch.setattr(fetchBackend, '_load_with_selenium', load_with_selenium)
+    return loads
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_static_page_is_parsed_from_http(server, selenium_loads):
+    page = fetch_page(f'{server}/article', 'springer', 'article', wait_time=5)
+
+    assert page.source == 'http'
+    assert page.url == f'{server}/article'
+    assert page.text('h1.c-article-title') == 'Monetary Policy and Growth'
+    assert page.text("span[data-test='journal-volume']") == 'Volume 12'
+    assert selenium_loads == []
+
+
+def test_missing_readiness_selector_falls_back_to_selenium(server, selenium_loads):
+    fallbacks = fetchBackend.get_fetch_stats()['selenium_fallbacks']
+
+    page = fetch_page(f'{server}/rendered-article', 'springer', 'article', wait_time=5)
+
+    assert page.source == 'selenium'
+    assert page.text('div.c-article-section__content p') == 'We study growth.'
+    assert selenium_loads == [(f'{server}/rendered-article', 'springer', 'article')]
+    assert fetchBackend.get_fetch_stats()['selenium_fallbacks'] == fallbacks + 1
+
+
+def test_missing_page_is_not_loaded_in_a_browser(server, selenium_loads):
+    page = fetch_page(f'{server}/missing', 'springer', 'article', wait_time=5)
+
+    assert page.source == 'http'
+    assert selenium_loads == []
+
+
+def test_dynamic_page_is_loaded_with_selenium(server, selenium_loads):
+    page = fetch_page(f'{server}/article', 'wiley', 'article', wait_time=5)
+
+    assert page.source == 'selenium'
+    assert selenium_loads == [(f'{server}/article', 'wiley', 'article')]
+
+
+def test_refused_response_is_reported_as_a_failure(server, selenium_loads, monkeypatch):
+    reports = []
+    monkeypatch.setattr(fetchBackend, 'report_success', lambda url, latency: reports.append('success'))
+    monkeypatch.setattr(fetchBackend, 'report_failure', lambda url, blocked=False, retry_after=None:
+                        reports.append('blocked' if blocked else 'failure'))
+
+    page = fetch_page(f'{server}/unavailable', 'springer', 'article', wait_time=5)
+
+    assert page.source == 'selenium'
+    assert reports == ['failure']
+
+
+def test_blocked_page_is_not_retried_again(monkeypatch):
+    monkeypatch.setitem(failureLedger._config, 'backoff_base', 0)
+    calls = []
+
+    def blocked(url):
+        calls.append(url)
+        raise BlockedPage(f"{url} answered with a block page")
+
+    with pytest.raises(BlockedPage):
+        call_with_retries(blocked, 'https://example.org/article')
+    assert len(calls) == 1
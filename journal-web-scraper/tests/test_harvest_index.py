@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the harvest index: article identifiers, filtering of seen articles and seeding from the article store.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import pandas as pd
+import pytest
+from src.helperFunctions import articleStore, harvestIndex
+from src.helperFunctions.articleStore import STORE_COLUMNS, append_articles
+from src.helperFunctions.harvestIndex import HarvestIndex, article_key, seed_from_store
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def harvest_index(tmp_path):
+    harvest_index = HarvestIndex('wiley_J', path=str(tmp_path / 'harvested.sqlite'))
+    yield harvest_index
+    harvest_index.close()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(articleStore, 'STORE_PATH', str(tmp_path / 'article_store'))
+    monkeypatch.setattr(articleStore, '_partition_indexes', {})
+
+    def add(journal_website, journal_name, volume_issues):
+        columns = [column for column in STORE_COLUMNS if column != 'Key']
+        rows = [[journal_website, journal_name, volume_issue, f"Title {i}", "Authors", "Abstract"]
+                for i, volume_issue in enumerate(volume_issues)]
+        append_articles(pd.DataFrame(rows, columns=columns), STORE_COLUMNS)
+
+    return add
+
+
+def use_issue_listing(monkeypatch, issue_numbers):
+    monkeypatch.setattr(harvestIndex, 'get_issue_numbers', lambda publisher, journal_name: issue_numbers)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_article_key_prefers_the_doi():
+    assert article_key("https://onlinelibrary.wiley.com/doi/10.1111/JOFI.13000") == 'doi:10.1111/jofi.13000'
+    assert article_key("https://onlinelibrary.wiley.com/doi/abs/10.1111/jofi.13000/") == 'doi:10.1111/jofi.13000'
+    assert article_key("https://www.aeaweb.org/articles?id=10.1257/aer.20201234") == 'doi:10.1257/aer.20201234'
+    assert (article_key("https://www.aeaweb.org/articles?id=10.1257%2Faer.20201234&from=f")
+            == 'doi:10.1257/aer.20201234')
+
+
+def test_article_key_keeps_the_query_without_a_doi():
+    assert article_key("https://example.org/article?id=1") != article_key("https://example.org/article?id=2")
+    assert article_key("https://example.org/article/?id=1#abstract") == 'example.org/article?id=1'
+
+
+def test_different_aea_articles_are_kept_apart(harvest_index):
+    harvest_index.add(["https://www.aeaweb.org/articles?id=10.1257/aer.20201234"])
+    new = harvest_index.filter_new(["https://www.aeaweb.org/articles?id=10.1257/aer.20201234",
+                                    "https://www.aeaweb.org/articles?id=10.1257/aer.20205678"])
+    assert new == ["https://www.aeaweb.org/articles?id=10.1257/aer.20205678"]
+
+
+def test_filter_new_drops_harvested_and_repeated_links(harvest_index):
+    harvest_index.add(["https://onlinelibrary.wiley.com/doi/10.1111/jofi.1"])
+    new = harvest_index.filter_new(["https://onlinelibrary.wiley.com/doi/abs/10.1111/jofi.1",
+                                    "https://onlinelibrary.wiley.com/doi/10.1111/jofi.2",
+                                    "https://onlinelibrary.wiley.com/doi/full/10.1111/jofi.2"])
+    assert new == ["https://onlinelibrary.wiley.com/doi/10.1111/jofi.2"]
+
+
+def test_seed_marks_issues_already_in_the_store(harvest_index, store, monkeypatch):
+    store('Wiley', 'J', ['Volume 78, Issue 1', 'Volume 78, Issue 2'])
+    use_issue_listing(monkeypatch, {'issue-1': (78, 1), 'issue-2': (78, 2), 'issue-3': (78, 3)})
+    issue_links = {'issue-1': ['a1', 'a2'], 'issue-2': ['a3'], 'issue-3': ['a4'], 'unlisted': ['a5']}
+
+    assert seed_from_store(harvest_index, issue_links, 'wiley', 'J', 'Wiley') == 3
+    assert harvest_index.filter_new(['a1', 'a2', 'a3', 'a4', 'a5']) == ['a4', 'a5']
+
+    # The index is no longer empty, so later runs are not seeded again
+    assert seed_from_store(harvest_index, issue_links, 'wiley', 'J', 'Wiley') == 0
+
+
+def test_seed_without_issue_numbers_only_trusts_older_volumes(harvest_index, store, monkeypatch):
+    store('Springer', 'S', ['Volume 11, Issue X', 'Volume 12, Issue X'])
+    use_issue_listing(monkeypatch, {'11-1': (11, 1), '11-2': (11, 2), '12-1': (12, 1)})
+
+    assert seed_from_store(harvest_index, {'11-1': ['b1'], '11-2': ['b2'], '12-1': ['b3']}, 'springer', 'S',
+                           'Springer') == 2
+    assert harvest_index.filter_new(['b1', 'b2', 'b3']) == ['b3']
+
+
+def test_seed_needs_stored_articles(harvest_index, store, monkeypatch):
+    use_issue_listing(monkeypatch, {'issue-1': (78, 1)})
+    assert seed_from_store(harvest_index, {'issue-1': ['a1']}, 'wiley', 'J', 'Wiley') == 0
+    assert len(harvest_index) == 0
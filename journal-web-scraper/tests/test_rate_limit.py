@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the per-host rate limiting: the token bucket, the additive increase and multiplicative decrease of the hosts'
+rates, the backoff pauses after failures and block pages, and the detection of block pages.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import pytest
+from src.helperFunctions import rateLimit
+from src.helperFunctions.rateLimit import HostController, TokenBucket
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+class FakeClock:
+    """
+    Stands in for the time module: sleeping moves the clock forward instead of waiting.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(rateLimit, 'time', fake_clock)
+    return fake_clock
+
+
+@pytest.fixture
+def rate_control(clock, monkeypatch):
+    # Every test starts from the default settings and without hosts; the backoff jitter always takes its upper bound
+    monkeypatch.setattr(rateLimit, 'RATE_CONTROL', dict(rateLimit.RATE_CONTROL))
+    monkeypatch.setattr(rateLimit, 'HOST_RATE_LIMITS', {})
+    monkeypatch.setattr(rateLimit, 'HOST_MAX_RATES', {})
+    monkeypatch.setattr(rateLimit, '_buckets', {})
+    monkeypatch.setattr(rateLimit, '_controllers', {})
+    monkeypatch.setattr(rateLimit.random, 'uniform', lambda low, high: high)
+    return rateLimit.RATE_CONTROL
+
+
+def controller(rate=1.0, max_rate=2.0):
+    return HostController(TokenBucket(rate, 2), max_rate)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_bucket_allows_a_burst_then_waits_for_tokens(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+    # Tokens refill while the host is idle, but never beyond the burst size
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.5)]
+
+
+def test_rate_change_keeps_the_tokens_accumulated_at_the_old_rate(clock):
+    bucket = TokenBucket(rate=1.0, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 0.5
+    bucket.set_rate(0.1)
+    # Half a token was earned at the old rate, the other half takes five seconds at the new one
+    assert bucket.acquire() == pytest.approx(5.0)
+
+
+def test_fast_pages_raise_the_rate_up_to_the_ceiling(rate_control):
+    host = controller(rate=1.0, max_rate=1.1)
+    host.record_success(1.0)
+    assert host.bucket.rate == pytest.approx(1.05)
+    host.record_success(1.0)
+    host.record_success(1.0)
+    assert host.bucket.rate == pytest.approx(1.1)
+
+
+def test_failures_and_slow_pages_cut_the_rate_down_to_the_floor(rate_control):
+    host = controller(rate=1.0)
+    host.record_failure()
+    assert host.bucket.rate == pytest.approx(0.5)
+
+    # A single slow page is smoothed away; the rate is only cut once pages stay slow
+    host.record_success(1.0)
+    host.record_success(10.0)
+    assert host.bucket.rate == pytest.approx(0.6)
+    host.record_success(30.0)
+    assert host.bucket.rate == pytest.approx(0.3)
+
+    for _ in range(10):
+        host.record_failure()
+    assert host.bucket.rate == rate_control['min_rate']
+
+
+def test_rate_is_kept_without_adaptation(rate_control):
+    rateLimit.configure_rate_control(adaptive=False)
+    host = controller(rate=1.0)
+    host.record_success(1.0)
+    host.record_failure()
+    assert host.bucket.rate == 1.0
+    # The host is still paused after the failure
+    assert host.paused_until > rateLimit.time.monotonic()
+
+
+def test_unknown_rate_control_setting_is_rejected(rate_control):
+    with pytest.raises(ValueError):
+        rateLimit.configure_rate_control(decrease=0.5)
+
+
+def test_backoff_doubles_with_failures_in_a_row(rate_control, clock):
+    host = controller()
+    assert [host.record_failure() for _ in range(3)] == [5.0, 10.0, 20.0]
+    assert [host.record_failure(blocked=True) for _ in range(2)] == [60.0, 120.0]
+    assert host.record_failure(retry_after='30') == 30.0
+
+    # A success starts the count again, and the pause never exceeds backoff_max
+    host.record_success(1.0)
+    assert host.record_failure() == 5.0
+    rate_control['backoff_base'] = 10000.0
+    assert host.record_failure() == rate_control['backoff_max']
+    assert host.stats == {'pages': 9, 'failures': 8, 'blocks': 2, 'backoff_s': pytest.approx(1150.0)}
+
+
+def test_backoff_is_jittered(rate_control, monkeypatch):
+    monkeypatch.setattr(rateLimit.random, 'uniform', lambda low, high: low)
+    assert controller().record_failure() == 2.5
+
+
+def test_throttle_waits_for_the_pause_of_the_host_only(rate_control, clock):
+    rateLimit.configure_host_rate('slow.example.org', rate=1.0, burst=1)
+    rateLimit.configure_host_rate('fast.example.org', rate=1.0, burst=1)
+
+    assert rateLimit.report_failure('https://slow.example.org/a', retry_after=30) == 30.0
+    assert rateLimit.throttle('https://fast.example.org/a') == 0.0
+    assert rateLimit.throttle('https://slow.example.org/b') == pytest.approx(30.0)
+
+    stats = rateLimit.get_rate_stats()
+    assert stats['slow.example.org']['rate'] == pytest.approx(0.5)
+    assert stats['fast.example.org']['rate'] == 1.0
+
+
+def test_hosts_without_a_configured_rate_use_the_defaults(rate_control):
+    bucket = rateLimit.get_host_bucket('new.example.org')
+    assert (bucket.rate, bucket.burst) == (rateLimit.DEFAULT_RATE, rateLimit.DEFAULT_BURST)
+    assert rateLimit.get_host_bucket('new.example.org') is bucket
+
+
+def test_block_pages_are_recognised():
+    assert rateLimit.is_block_page("", 429)
+    assert rateLimit.is_block_page("<html><title>Just a moment...</title></html>", 200)
+    assert rateLimit.is_block_page('<div id="px-captcha"></div>')
+    # Ordinary pages load challenge scripts and CAPTCHA widgets too
+    assert not rateLimit.is_block_page('<title>Article</title><script src="/cdn-cgi/challenge-platform/x.js"></script>'
+                                       '<div class="g-recaptcha"></div>', 200)
+    assert not rateLimit.is_block_page(None, 404)
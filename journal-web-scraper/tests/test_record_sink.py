@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the record sinks: appending to the files of earlier runs, and closing after a journal failed.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+import os
+import pyarrow.parquet as pq
+import pytest
+from src.helperFunctions import recordSink
+from src.helperFunctions.recordSink import CsvSink, JsonLinesSink, ParquetSink, open_journal_sink
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(recordSink, 'DATA_PATH', str(tmp_path))
+    return tmp_path
+
+
+def paper(title, volume_issue="Volume 78, Issue 1"):
+    return [volume_issue, [title, "A. Author", "An abstract."]]
+
+
+def record(title):
+    return {'Journal_Website': 'Wiley', 'Journal_Name': 'J', 'Key': title, 'Volume_Issue': 'Volume 78, Issue 1',
+            'Title': title, 'Authors': 'A. Author', 'Abstract': 'An abstract.'}
+
+
+def write_parquet(path, titles, append=False, batch_size=2):
+    sink = ParquetSink(str(path), batch_size=batch_size, append=append)
+    for title in titles:
+        sink.write(record(title))
+    sink.close()
+
+
+def read_titles(path):
+    return pq.read_table(str(path)).column('Title').to_pylist()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_json_lines_and_csv_append(tmp_path):
+    for append, title in ((False, 'First'), (True, 'Second')):
+        jsonl = JsonLinesSink(str(tmp_path / 'j.jsonl'), append)
+        csv_sink = CsvSink(str(tmp_path / 'j.csv'), append=append)
+        jsonl.write(record(title))
+        csv_sink.write(record(title))
+        jsonl.close()
+        csv_sink.close()
+
+    with open(tmp_path / 'j.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['Title'] for line in f] == ['First', 'Second']
+    with open(tmp_path / 'j.csv', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3 and lines[0].startswith('Journal_Website')
+
+
+def test_parquet_append_keeps_the_rows_of_earlier_runs(tmp_path):
+    path = tmp_path / 'j.parquet'
+    write_parquet(path, ['a', 'b', 'c'])
+    write_parquet(path, ['d'], append=True)
+    assert read_titles(path) == ['a', 'b', 'c', 'd']
+
+    write_parquet(path, ['e'])
+    assert read_titles(path) == ['e']
+    assert os.listdir(tmp_path) == ['j.parquet']
+
+
+def test_failed_parquet_close_leaves_the_previous_file(tmp_path):
+    path = tmp_path / 'j.parquet'
+    write_parquet(path, ['a'])
+
+    sink = ParquetSink(str(path), batch_size=1, append=True)
+    sink.write(record('partial'))
+    sink.close(failed=True)
+
+    assert read_titles(path) == ['a']
+    assert os.listdir(tmp_path) == ['j.parquet']
+
+
+def test_journal_sink_closes_as_failed_when_the_journal_raises(data_path):
+    with open_journal_sink('wiley_J', 'Wiley', 'J', formats=('parquet', 'jsonl')) as journal_sink:
+        journal_sink.write(paper('Kept'))
+
+    with pytest.raises(RuntimeError):
+        with open_journal_sink('wiley_J', 'Wiley', 'J', formats=('parquet', 'jsonl'), append=True) as journal_sink:
+            journal_sink.write(paper('Partial'))
+            raise RuntimeError("browser crashed")
+
+    assert read_titles(data_path / 'wiley_J.parquet') == ['Kept']
+    # Records streamed to the JSON Lines file are kept, like the job journal's checkpoints
+    with open(data_path / 'wiley_J.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['Title'] for line in f] == ['Kept', 'Partial']
+    assert sorted(os.listdir(data_path)) == ['wiley_J.jsonl', 'wiley_J.parquet']
+
+
+def test_unknown_format_closes_the_opened_sinks(data_path):
+    with pytest.raises(ValueError):
+        open_journal_sink('wiley_J', 'Wiley', 'J', formats=('parquet', 'xml'))
+    assert os.listdir(data_path) == []
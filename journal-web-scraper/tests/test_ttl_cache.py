@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the TTL cache behind the latest volume cache and the issue archive: expiry, falling back on the cached value,
+and writes that keep the entries of other processes and leave no temporary files behind.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import json
+import os
+import pytest
+from src.helperFunctions import jsonHelpers, latestVolumeCache, ttlCache
+from src.helperFunctions.ttlCache import TtlCache
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(ttlCache, 'DATA_PATH', str(tmp_path))
+    monkeypatch.setattr(jsonHelpers, 'DATA_PATH', str(tmp_path))
+    return tmp_path
+
+
+def read_file(data_path):
+    with open(data_path / 'cache.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_value_is_cached_until_it_expires(data_path):
+    cache = TtlCache('cache.json', 'volume', default_ttl=60)
+    assert cache.get('wiley/jofi', lambda: 78) == 78
+    assert cache.get('wiley/jofi', lambda: 79) == 78
+    assert cache.get('wiley/jofi', lambda: 79, ttl=0) == 79
+    assert read_file(data_path)['wiley/jofi']['volume'] == 79
+
+
+def test_per_key_ttl_and_refresh(data_path):
+    cache = TtlCache('cache.json', 'volumes', default_ttl=60, ttls={'jstor/jeg': 0})
+    cache.get('jstor/jeg', lambda: {'2': []})
+    assert cache.get('jstor/jeg', lambda: {}, refresh=lambda volumes: dict(volumes, **{'3': []})) == {'2': [], '3': []}
+
+
+def test_failed_refresh_falls_back_on_cached_value(data_path):
+    cache = TtlCache('cache.json', 'volume', default_ttl=0)
+    cache.get('oxford/restud', lambda: 91)
+
+    def broken():
+        raise TimeoutError("page did not load")
+
+    assert cache.get('oxford/restud', broken) == 91
+    with pytest.raises(TimeoutError):
+        cache.get('oxford/qje', broken)
+
+
+def test_writes_keep_entries_of_other_processes(data_path):
+    first = TtlCache('cache.json', 'volume', default_ttl=60)
+    second = TtlCache('cache.json', 'volume', default_ttl=60)
+    first.get('wiley/jofi', lambda: 78)
+    second.get('aea/aer', lambda: 114)
+    first.get('springer/jeg', lambda: 29)
+
+    assert set(read_file(data_path)) == {'wiley/jofi', 'aea/aer', 'springer/jeg'}
+    assert os.listdir(data_path) == ['cache.json']
+
+
+def test_invalidate_forces_a_lookup(data_path):
+    cache = TtlCache('cache.json', 'volume', default_ttl=60)
+    cache.get('wiley/jofi', lambda: 78)
+    cache.invalidate('wiley/jofi')
+    assert read_file(data_path) == {}
+    assert cache.get('wiley/jofi', lambda: 79) == 79
+
+
+def test_latest_volume_without_a_number_is_not_cached(data_path, monkeypatch):
+    monkeypatch.setattr(latestVolumeCache, '_cache', TtlCache('cache.json', 'volume', default_ttl=60))
+    for missing in (None, 0):
+        with pytest.raises(ValueError):
+            latestVolumeCache.get_latest_volume('springer', 'jeg', lambda: missing)
+    assert not os.path.exists(data_path / 'cache.json')
+    assert latestVolumeCache.get_latest_volume('springer', 'jeg', lambda: '29') == 29
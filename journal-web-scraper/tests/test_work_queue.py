@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the SQLite work queue: leases, lease expiry, retries, completion with follow-up tasks and the lease heartbeat.
+
+Run from the project folder with:
+    python -m pytest tests
+"""
+
+# =============================================================================
+# Packages
+# =============================================================================
+import time
+import pytest
+from src.helperFunctions.workQueue import WorkQueue, keep_lease
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'work_queue.sqlite'), lease_seconds=60, max_attempts=2, retry_delay=0)
+    yield queue
+    queue.close()
+
+
+def expire_lease(queue):
+    # Moves every lease into the past instead of waiting for it to run out
+    with queue._transaction() as connection:
+        connection.execute("UPDATE tasks SET lease_expires = ? WHERE status = 'leased'", (time.time() - 1,))
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+def test_enqueue_is_unique_per_kind_and_key(queue):
+    assert queue.enqueue('issue', 'https://example.org/1', {'url': 'https://example.org/1'})
+    assert not queue.enqueue('issue', 'https://example.org/1', {'url': 'https://example.org/1'})
+    assert queue.enqueue('article', 'https://example.org/1', {'url': 'https://example.org/1'})
+    assert queue.counts()['issue']['pending'] == 1
+
+
+def test_leased_task_is_not_leased_twice(queue):
+    queue.enqueue('issue', 'a', {})
+    task = queue.lease('worker-1')
+    assert task['key'] == 'a' and task['attempts'] == 1 and task['worker_id'] == 'worker-1'
+    assert queue.lease('worker-2') is None
+
+
+def test_lease_respects_priority_and_kinds(queue):
+    queue.enqueue('issue', 'low', {})
+    queue.enqueue('issue', 'high', {}, priority=5)
+    queue.enqueue('article', 'paper', {})
+    assert queue.lease('worker-1', kinds=['article'])['key'] == 'paper'
+    assert queue.lease('worker-1')['key'] == 'high'
+
+
+def test_complete_adds_children_and_drains(queue):
+    queue.enqueue('issue', 'a', {})
+    task = queue.lease('worker-1')
+    assert queue.complete(task, result=['paper'], children=[('article', 'p1', {'url': 'p1'}),
+                                                            ('article', 'p2', {'url': 'p2'}, 3)])
+    assert queue.get_done('issue') == [(task['id'], {}, ['paper'])]
+    assert queue.lease('worker-1')['key'] == 'p2'
+    assert not queue.is_drained()
+
+
+def test_expired_lease_is_taken_over(queue):
+    queue.enqueue('issue', 'a', {})
+    first = queue.lease('worker-1')
+    expire_lease(queue)
+
+    second = queue.lease('worker-2')
+    assert second['id'] == first['id'] and second['attempts'] == 2
+
+    # The first worker lost the lease, so neither its result nor its renewals are recorded
+    assert not queue.renew(first)
+    assert not queue.complete(first, result='stale')
+    assert queue.complete(second, result='fresh')
+    assert queue.get_done('issue')[0][2] == 'fresh'
+
+
+def test_expired_lease_fails_after_max_attempts(queue):
+    queue.enqueue('issue', 'a', {})
+    queue.lease('worker-1')
+    expire_lease(queue)
+    queue.lease('worker-2')
+    expire_lease(queue)
+
+    assert queue.lease('worker-3') is None
+    assert queue.counts()['issue']['failed'] == 1
+    assert queue.is_drained()
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.enqueue('issue', 'a', {})
+    queue.fail(queue.lease('worker-1'), 'timeout')
+    assert queue.counts()['issue']['pending'] == 1
+
+    queue.fail(queue.lease('worker-1'), 'timeout')
+    assert queue.counts()['issue']['failed'] == 1
+    assert queue.lease('worker-1') is None
+
+    assert queue.retry_failed() == 1
+    assert queue.lease('worker-1')['attempts'] == 1
+
+
+def test_fail_waits_for_retry_delay(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'work_queue.sqlite'), max_attempts=3, retry_delay=60)
+    try:
+        queue.enqueue('issue', 'a', {})
+        queue.fail(queue.lease('worker-1'), 'timeout')
+        assert queue.lease('worker-1') is None
+        assert not queue.is_drained()
+    finally:
+        queue.close()
+
+
+def test_keep_lease_renews_while_the_task_runs(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'work_queue.sqlite'), lease_seconds=0.3)
+    try:
+        queue.enqueue('issue', 'a', {})
+        task = queue.lease('worker-1')
+        with keep_lease(queue, task):
+            time.sleep(0.6)
+            assert queue.lease('worker-2') is None
+        assert queue.complete(task)
+    finally:
+        queue.close()